@@ -0,0 +1,23 @@
+"""
+Standalone performance benchmarks.
+
+Each module is runnable on its own against the configured database, e.g.::
+
+    $ python -m benchmarks.content_indexes --rows 1000000
+
+They are not collected by pytest.
+"""
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve(strict=True).parent.parent
+
+
+def setup_django(settings_module: str = "config.settings.local") -> None:
+    """Configure Django the same way ``manage.py`` does."""
+    import django
+
+    sys.path.append(str(ROOT_DIR / "udrems"))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
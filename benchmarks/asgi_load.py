@@ -0,0 +1,354 @@
+"""
+Throughput, latency and allocations of ``config.asgi:application``, driven
+in-process by an asyncio ASGI client: no server and no sockets.
+
+Seeds a user with a password, a token and a session (plus ``--users`` more
+rows in the user table) in the configured database, which must therefore not
+be an in-memory SQLite one. Then, per scenario, ``--concurrency`` tasks send
+requests for ``--duration`` seconds:
+
+* ``home``: the home page, anonymous
+* ``users:detail``: the profile page with the session cookie
+* ``api:user-me``: ``/api/users/me/`` with the token
+* ``auth-token``: ``POST /auth-token/`` with username and password, which
+  pays for a password hash every time
+* ``websocket``: connect through ``config.websocket`` with the token, one
+  ping/pong round trip, disconnect
+
+After the timed run each scenario repeats ``--samples`` requests one at a
+time under ``tracemalloc``: ``alloc_kib`` is the peak memory a request
+allocated on top of what was already in use, ``retained_blocks`` the blocks
+still alive after it (leaks and caches show up there).
+
+Results are printed as a table and, with ``--json``, written for diffing
+between commits; ``--compare`` prints the change against an earlier file::
+
+    $ python -m benchmarks.asgi_load --json before.json
+    $ git checkout my-branch
+    $ python -m benchmarks.asgi_load --json after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+from benchmarks import ROOT_DIR, setup_django
+
+USERNAME = "benchmark-asgi-load"
+PASSWORD = "benchmark-asgi-load-password"
+HOST = "localhost"
+
+Scenario = Callable[[], Awaitable[bool]]
+
+
+# client
+# ------------------------------------------------------------------------------
+async def http(
+    app,
+    method: str,
+    path: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: bytes = b"",
+    query_string: str = "",
+) -> int:
+    """Send one request to ``app`` and return the response status."""
+    headers = {"host": HOST, **(headers or {})}
+    if body:
+        headers["content-length"] = str(len(body))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": (HOST, 80),
+    }
+    done = asyncio.Event()
+    sent_body = False
+    status = 0
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    await app(scope, receive, send)
+    done.set()
+    return status
+
+
+async def websocket(app, path: str, query_string: str, messages: List[str]) -> bool:
+    """
+    Connect, send each of ``messages`` and wait for a reply to each, close.
+
+    Returns whether the connection was accepted and every message answered.
+    """
+    scope = {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "scheme": "ws",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"host", HOST.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": (HOST, 80),
+        "subprotocols": [],
+    }
+    inbox: asyncio.Queue = asyncio.Queue()
+    outbox: asyncio.Queue = asyncio.Queue()
+    await inbox.put({"type": "websocket.connect"})
+    task = asyncio.create_task(app(scope, inbox.get, outbox.put))
+    try:
+        if (await outbox.get())["type"] != "websocket.accept":
+            return False
+        for text in messages:
+            await inbox.put({"type": "websocket.receive", "text": text})
+            if (await outbox.get())["type"] != "websocket.send":
+                return False
+        return True
+    finally:
+        await inbox.put({"type": "websocket.disconnect", "code": 1000})
+        await task
+
+
+# scenarios
+# ------------------------------------------------------------------------------
+def seed(users: int) -> Dict[str, str]:
+    from django.conf import settings
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+
+    from udrems.users.models import User
+
+    user, created = User.objects.get_or_create(
+        username=USERNAME, defaults={"name": "Benchmark"}
+    )
+    if created or not user.check_password(PASSWORD):
+        user.set_password(PASSWORD)
+        user.save()
+    token, _ = Token.objects.get_or_create(user=user)
+    existing = User.objects.filter(username__startswith=f"{USERNAME}-").count()
+    User.objects.bulk_create(
+        User(username=f"{USERNAME}-{index}", name=f"Benchmark {index}")
+        for index in range(existing, users)
+    )
+    client = Client()
+    client.force_login(user)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return {
+        "token": token.key,
+        "cookie": f"{settings.SESSION_COOKIE_NAME}={session}",
+        "username": user.username,
+    }
+
+
+def build_scenarios(app, seeded: Dict[str, str]) -> Dict[str, Scenario]:
+    token = {"authorization": f"Token {seeded['token']}"}
+    cookie = {"cookie": seeded["cookie"]}
+    credentials = urlencode({"username": seeded["username"], "password": PASSWORD})
+    form = {"content-type": "application/x-www-form-urlencoded"}
+
+    async def ok(status: Awaitable[int]) -> bool:
+        return await status == 200
+
+    return {
+        "home": lambda: ok(http(app, "GET", "/")),
+        "users:detail": lambda: ok(
+            http(app, "GET", f"/users/{seeded['username']}/", cookie)
+        ),
+        "api:user-me": lambda: ok(http(app, "GET", "/api/users/me/", token)),
+        "auth-token": lambda: ok(
+            http(app, "POST", "/auth-token/", form, credentials.encode())
+        ),
+        "websocket": lambda: websocket(
+            app, "/ws/", urlencode({"token": seeded["token"]}), ["ping"]
+        ),
+    }
+
+
+# measurement
+# ------------------------------------------------------------------------------
+async def worker(scenario: Scenario, deadline: float, samples: List[float]) -> int:
+    errors = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        if await scenario():
+            samples.append(time.perf_counter() - started)
+        else:
+            errors += 1
+    return errors
+
+
+async def load(scenario: Scenario, concurrency: int, duration: float) -> Dict:
+    samples: List[float] = []
+    started = time.perf_counter()
+    deadline = started + duration
+    errors = await asyncio.gather(
+        *(worker(scenario, deadline, samples) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - started
+    if len(samples) < 2:
+        raise RuntimeError(f"Only {len(samples)} successful requests")
+    quantiles = statistics.quantiles(samples, n=100)
+    return {
+        "requests": len(samples),
+        "errors": sum(errors),
+        "rps": len(samples) / elapsed,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def allocations(scenario: Scenario, samples: int) -> Dict:
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            blocks = len(tracemalloc.take_snapshot().traces)
+            tracemalloc.reset_peak()
+            await scenario()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(len(tracemalloc.take_snapshot().traces) - blocks)
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_kib": statistics.median(peaks) / 1024,
+        "retained_blocks": statistics.median(retained),
+    }
+
+
+async def run(scenarios: Dict[str, Scenario], args) -> Dict[str, Dict]:
+    results = {}
+    for name, scenario in scenarios.items():
+        # warm up connections, caches and the hub before measuring
+        await load(scenario, args.concurrency, min(1.0, args.duration))
+        results[name] = await load(scenario, args.concurrency, args.duration)
+        results[name].update(await allocations(scenario, args.samples))
+    return results
+
+
+# reporting
+# ------------------------------------------------------------------------------
+COLUMNS = ("rps", "p50_ms", "p95_ms", "p99_ms", "alloc_kib", "retained_blocks")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def metadata(args) -> Dict:
+    import django
+    from django.db import connection
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "settings": args.settings,
+        "debug": args.debug,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+    }
+
+
+def print_table(results: Dict[str, Dict], baseline: Optional[Dict] = None) -> None:
+    print(f"\n{'scenario':<14}" + "".join(f"{column:>17}" for column in COLUMNS))
+    for name, result in results.items():
+        cells = []
+        for column in COLUMNS:
+            cell = f"{result[column]:.1f}"
+            old = (baseline or {}).get(name, {}).get(column)
+            if old:
+                cell += f" ({(result[column] - old) / old:+.0%})"
+            cells.append(f"{cell:>17}")
+        print(f"{name:<14}" + "".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--scenario", action="append", help="Run only these, repeatable"
+    )
+    parser.add_argument("--settings", default="config.settings.local")
+    parser.add_argument(
+        "--debug", action="store_true", help="Keep DEBUG as the settings have it"
+    )
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run")
+    args = parser.parse_args()
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    setup_django(args.settings)
+    if not args.debug:
+        from django.conf import settings
+
+        # measure what production runs: no query log, no debug toolbar
+        settings.DEBUG = False
+    from config.asgi import application
+
+    scenarios = build_scenarios(application, seed(args.users))
+    unknown = set(args.scenario or ()) - set(scenarios)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.scenario:
+        scenarios = {name: scenarios[name] for name in args.scenario}
+
+    results = asyncio.run(run(scenarios, args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)["results"]
+    print_table(results, baseline)
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump({"meta": metadata(args), "results": results}, stream, indent=2)
+            stream.write("\n")
+
+
+if __name__ == "__main__":
+    main()
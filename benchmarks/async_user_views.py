@@ -0,0 +1,194 @@
+"""
+Latency and throughput of the user API and profile page under uvicorn, served
+by the sync views and by their async variants (``USE_ASYNC_USER_VIEWS``).
+
+Seeds one user with a token and a session in the configured database (which
+therefore must not be an in-memory SQLite one), then for each mode starts
+``uvicorn config.asgi:application`` and keeps ``--concurrency`` keep-alive
+connections busy for ``--duration`` seconds per endpoint::
+
+    $ python -m benchmarks.async_user_views --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks import ROOT_DIR, setup_django
+
+USERNAME = "benchmark-async-user-views"
+
+
+def seed() -> Dict[str, str]:
+    from django.conf import settings
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+
+    from udrems.users.models import User
+
+    user, _ = User.objects.get_or_create(
+        username=USERNAME, defaults={"name": "Benchmark"}
+    )
+    token, _ = Token.objects.get_or_create(user=user)
+    client = Client()
+    client.force_login(user)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return {
+        "token": token.key,
+        "cookie": f"{settings.SESSION_COOKIE_NAME}={session}",
+        "username": user.username,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status
+
+
+async def worker(port: int, request: bytes, deadline: float, samples: List[float]):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            if status != 200:
+                raise RuntimeError(f"Unexpected HTTP {status}")
+            samples.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def load(port: int, request: bytes, concurrency: int, duration: float):
+    samples: List[float] = []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(worker(port, request, deadline, samples) for _ in range(concurrency))
+    )
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    quantiles = statistics.quantiles(samples, n=100)
+    return {
+        "rps": len(samples) / elapsed,
+        "p50": quantiles[49] * 1000,
+        "p99": quantiles[98] * 1000,
+    }
+
+
+def build_requests(seeded: Dict[str, str]) -> Dict[str, bytes]:
+    def request(path: str, header: str) -> bytes:
+        return f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{header}\r\n\r\n".encode()
+
+    token = f"Authorization: Token {seeded['token']}"
+    return {
+        "api:user-me": request("/api/users/me/", token),
+        "api:user-list": request("/api/users/", token),
+        "api:user-detail": request(f"/api/users/{seeded['username']}/", token),
+        "users:detail": request(
+            f"/users/{seeded['username']}/", f"Cookie: {seeded['cookie']}"
+        ),
+    }
+
+
+def wait_for(port: int, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("uvicorn did not start")
+
+
+def run_mode(async_views: bool, requests: Dict[str, bytes], args) -> Dict:
+    port = free_port()
+    env = dict(
+        os.environ,
+        DJANGO_ASYNC_USER_VIEWS=str(async_views),
+        DJANGO_ASYNC_VIEW_THREADS=str(args.threads),
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "config.asgi:application",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=ROOT_DIR,
+        env=env,
+    )
+    try:
+        wait_for(port, process)
+        results = {}
+        for name, request in requests.items():
+            # warm up connections, caches and the pool before measuring
+            asyncio.run(load(port, request, args.concurrency, 1))
+            results[name] = summarize(
+                *asyncio.run(load(port, request, args.concurrency, args.duration))
+            )
+        return results
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--settings", default="config.settings.local")
+    args = parser.parse_args()
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    setup_django(args.settings)
+    requests = build_requests(seed())
+
+    modes = {"sync": run_mode(False, requests, args)}
+    modes["async"] = run_mode(True, requests, args)
+
+    print(f"\n{'endpoint':<18}{'mode':<7}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name in requests:
+        for mode, results in modes.items():
+            row: Tuple = tuple(results[name].values())
+            print(f"{name:<18}{mode:<7}{row[0]:>10.1f}{row[1]:>10.2f}{row[2]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Broker messages and result-backend writes per ``--tasks`` logical tasks.
+
+Runs an in-process worker over the in-memory transport and a cache result
+backend, and counts what each kind of task costs between enqueue and
+completion:
+
+* ``plain``: ``@app.task``, one message and one stored result each
+* ``fire_and_forget``: one message each, no result
+* ``batched``: one message per ``--batch-size`` items, no result
+
+With Redis as both broker and backend every message is an ``LPUSH`` and every
+stored result a ``SETEX`` plus a ``PUBLISH``::
+
+    $ python -m benchmarks.celery_broker_ops --tasks 10000 --batch-size 100
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from unittest import mock
+
+from benchmarks import setup_django
+
+
+class Progress:
+    def __init__(self):
+        self.done = 0
+        self.condition = threading.Condition()
+
+    def add(self, count: int) -> None:
+        with self.condition:
+            self.done += count
+            self.condition.notify_all()
+
+    def wait_for(self, total: int, timeout: float = 300) -> None:
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.done >= total, timeout):
+                raise RuntimeError(f"Only {self.done} of {total} tasks ran")
+
+
+@contextmanager
+def count_calls(owner, attribute: str, counts: Counter, name: str):
+    original = getattr(owner, attribute)
+
+    def wrapper(*args, **kwargs):
+        counts[name] += 1
+        return original(*args, **kwargs)
+
+    with mock.patch.object(owner, attribute, wrapper):
+        yield
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--settings", default="config.settings.local")
+    args = parser.parse_args()
+
+    # Celery lets these variables override the configured URLs
+    os.environ["CELERY_BROKER_URL"] = "memory://"
+    os.environ["CELERY_RESULT_BACKEND"] = "cache+memory://"
+    setup_django(args.settings)
+    import celery.contrib.testing.tasks  # noqa F401 registers celery.ping
+    from celery.backends.cache import CacheBackend
+    from celery.contrib.testing.worker import start_worker
+    from kombu import Producer
+
+    from config.celery_app import app, batched_task, fire_and_forget
+
+    app.conf.task_always_eager = False
+    logging.getLogger("celery").setLevel(logging.WARNING)
+    progress = Progress()
+
+    @app.task(name="benchmarks.plain")
+    def plain(item):
+        progress.add(1)
+
+    @fire_and_forget(name="benchmarks.fire_and_forget")
+    def quiet(item):
+        progress.add(1)
+
+    @batched_task(
+        name="benchmarks.batched", batch_size=args.batch_size, batch_interval=0.05
+    )
+    def batched(items):
+        progress.add(len(items))
+
+    modes = {
+        "plain": plain.delay,
+        "fire_and_forget": quiet.delay,
+        "batched": batched.enqueue,
+    }
+    print(f"{'mode':<17}{'messages':>10}{'results':>10}{'seconds':>10}")
+    with start_worker(app, pool="solo", perform_ping_check=False):
+        for mode, enqueue in modes.items():
+            counts: Counter = Counter()
+            progress.done = 0
+            started = time.perf_counter()
+            with count_calls(Producer, "publish", counts, "messages"), count_calls(
+                CacheBackend, "set", counts, "results"
+            ):
+                for item in range(args.tasks):
+                    enqueue(item)
+                batched.batcher.flush()
+                progress.wait_for(args.tasks)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{mode:<17}{counts['messages']:>10}{counts['results']:>10}"
+                f"{elapsed:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
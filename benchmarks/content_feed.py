@@ -0,0 +1,133 @@
+"""
+Latency of deep pages of the unified content feed.
+
+Seeds ``--rows`` rows per content model inside a transaction, then times
+page 1, 10, 100 and 1000 (``--page-size`` 25) two ways:
+
+* ``keyset``: ``udrems.core.feed.get_page``, one ``UNION ALL`` query plus
+  per-model hydration, following the ``next`` cursors
+* ``merge``: the naive approach, the first ``page * page_size`` rows of all
+  six tables merged in Python and sliced
+
+Everything is rolled back at the end unless ``--keep`` is passed::
+
+    $ python -m benchmarks.content_feed --rows 10000
+"""
+import argparse
+import heapq
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from benchmarks import setup_django
+
+PAGES = (1, 10, 100, 1000)
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def explicit_created(models):
+    """Let ``bulk_create`` keep the ``created`` values it is given."""
+    fields = [model._meta.get_field("created") for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def seed(rows: int, batch_size: int) -> None:
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from udrems.core.models import Image
+    from udrems.core.signals import CONTENT_MODELS
+
+    author = get_user_model().objects.create(username="benchmark-content-feed")
+    image = Image.objects.create(
+        image="images/benchmark.png", image_name="benchmark", image_caption=""
+    )
+    now = timezone.now()
+    with explicit_created(CONTENT_MODELS):
+        for offset, model in enumerate(CONTENT_MODELS):
+            extra = {"is_published": True} if hasattr(model, "is_published") else {}
+            for start in range(0, rows, batch_size):
+                model.objects.bulk_create(
+                    model(
+                        title=f"{model.__name__} {i}",
+                        slug=f"{model._meta.model_name}-{i}",
+                        author=author,
+                        image=image,
+                        # interleave the six tables in the feed
+                        created=now - timedelta(seconds=i * 6 + offset),
+                        **extra,
+                    )
+                    for i in range(start, min(start + batch_size, rows))
+                )
+
+
+def merge_page(page: int, page_size: int) -> list:
+    from udrems.core import feed
+
+    depth = page * page_size
+    streams = [
+        queryset.order_by("-created", "-id")
+        .select_related("author", "image")
+        .prefetch_related("category", "tags", "image__derivatives")[:depth]
+        for queryset in feed.get_sources().values()
+    ]
+    merged = heapq.merge(*streams, key=lambda obj: (obj.created, obj.pk), reverse=True)
+    return list(islice(merged, depth - page_size, depth))
+
+
+def timed(function, *args, **kwargs):
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000, help="per model")
+    parser.add_argument("--batch-size", type=int, default=2_000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--keep", action="store_true", help="commit seeded rows")
+    parser.add_argument("--settings", default="config.settings.local")
+    args = parser.parse_args()
+
+    setup_django(args.settings)
+    from django.db import transaction
+
+    from udrems.core import feed
+
+    deepest = max(page for page in PAGES if page * args.page_size <= args.rows * 6)
+    try:
+        with transaction.atomic():
+            started = time.perf_counter()
+            seed(args.rows, args.batch_size)
+            print(
+                f"seeded {args.rows} rows per model in {time.perf_counter() - started:.1f}s"
+            )
+
+            print(f"\n{'page':>6}{'keyset ms':>12}{'merge ms':>12}")
+            cursor = None
+            for page in range(1, deepest + 1):
+                result, keyset_ms = timed(feed.get_page, cursor, args.page_size)
+                cursor = result.next_cursor
+                if page in PAGES:
+                    _, merge_ms = timed(merge_page, page, args.page_size)
+                    print(f"{page:>6}{keyset_ms:>12.2f}{merge_ms:>12.2f}")
+            if not args.keep:
+                raise Rollback
+    except Rollback:
+        print("\nrolled back seeded rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Query plans for the newest-first content listings, with and without the
+``core`` listing indexes.
+
+Seeds ``--rows`` News rows inside a transaction, then prints the plan and
+timing of the three listing querysets (``objects``, active, published) once
+with the indexes dropped and once with them in place. Everything, including
+the dropped indexes, is rolled back at the end unless ``--keep`` is passed::
+
+    $ python -m benchmarks.content_indexes --rows 1000000
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(rows: int, batch_size: int) -> None:
+    from django.contrib.auth import get_user_model
+
+    from udrems.core.models import Image, News
+
+    author = get_user_model().objects.create(username="benchmark-content-indexes")
+    image = Image.objects.create(
+        image="images/benchmark.png", image_name="benchmark", image_caption=""
+    )
+    for start in range(0, rows, batch_size):
+        News.objects.bulk_create(
+            News(
+                title=f"News {i}",
+                slug=f"news-{i}",
+                author=author,
+                image=image,
+                # ~90% active, ~50% published: the partial indexes stay useful
+                is_active=i % 10 != 0,
+                is_published=i % 2 == 0,
+            )
+            for i in range(start, min(start + batch_size, rows))
+        )
+
+
+def analyze(table: str) -> None:
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+
+
+def report(label: str, querysets: dict, repeat: int) -> None:
+    print(f"\n=== {label} ===")
+    for name, queryset in querysets.items():
+        print(f"\n--- {name}")
+        print(queryset.explain())
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        elapsed = (time.perf_counter() - started) / repeat
+        print(f"avg {elapsed * 1000:.2f} ms over {repeat} runs")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="commit seeded rows")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, transaction
+
+    from udrems.core.models import News
+
+    page = slice(0, args.page_size)
+    querysets = {
+        "News.objects newest first": News.objects.order_by("-created")[page],
+        "active newest first": News.objects.filter(is_active=True).order_by("-created")[
+            page
+        ],
+        "published newest first": News.objects.filter(
+            is_published=True, is_active=True
+        ).order_by("-created")[page],
+    }
+
+    try:
+        with transaction.atomic():
+            started = time.perf_counter()
+            seed(args.rows, args.batch_size)
+            print(f"seeded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+            # plain DDL rather than ``with schema_editor()`` so this also
+            # works inside SQLite's outer transaction
+            editor = connection.schema_editor(atomic=False)
+            indexes = News._meta.indexes
+            with transaction.atomic():
+                for index in indexes:
+                    editor.execute(index.remove_sql(News, editor))
+                analyze(News._meta.db_table)
+                report("without listing indexes", querysets, args.repeat)
+                for index in indexes:
+                    editor.execute(index.create_sql(News, editor))
+
+            analyze(News._meta.db_table)
+            report("with listing indexes", querysets, args.repeat)
+            if not args.keep:
+                raise Rollback
+    except Rollback:
+        print("\nrolled back seeded rows")
+
+
+if __name__ == "__main__":
+    main()
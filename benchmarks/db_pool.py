@@ -0,0 +1,226 @@
+"""
+Open database connections under 1000 concurrent requests, with and without
+``udrems.utils.db_pool``.
+
+``--requests`` requests for ``/api/users/`` (token authentication from the
+cache, one query) are submitted at once to the Django handler, served by
+``--threads`` threads: the executor threads that sync code runs on under the
+async workers. Requests go through the whole handler, so
+``request_started`` and ``request_finished`` close or hand back
+connections as they do in production. Every query sleeps ``--latency-ms``
+first, standing in for the round trip to a database server, so requests
+overlap as they do against PostgreSQL. Each mode runs in a subprocess of its
+own:
+
+* ``persistent``: the configured engine with ``CONN_MAX_AGE = 60``, every
+  thread keeps the connection it opened
+* ``pooled``: the matching pooled engine with ``MAX_SIZE = --pool-size``
+  and ``CONN_MAX_AGE = 0``
+
+``peak`` is the most connections open at once, sampled every millisecond
+while the requests run. The pool's own metrics give the mean wait to borrow
+a connection and the number of borrows that timed out::
+
+    $ python -m benchmarks.db_pool --requests 1000 --threads 100 --pool-size 10
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks import ROOT_DIR, setup_django
+
+MODES = ("persistent", "pooled")
+POOLED_ENGINES = {
+    "django.db.backends.sqlite3": "udrems.utils.db_pool.sqlite3",
+    "django.db.backends.postgresql": "udrems.utils.db_pool.postgresql",
+    "django.db.backends.postgresql_psycopg2": "udrems.utils.db_pool.postgresql",
+}
+
+
+def configure(mode: str, args) -> None:
+    """Adjust the settings before Django opens any connection."""
+    from django.conf import settings
+
+    database = settings.DATABASES["default"]
+    if mode == "persistent":
+        database["CONN_MAX_AGE"] = 60
+    else:
+        database["ENGINE"] = POOLED_ENGINES[database["ENGINE"]]
+        database["CONN_MAX_AGE"] = 0
+        database["POOL"] = {"MAX_SIZE": args.pool_size, "TIMEOUT": args.timeout}
+
+
+class Connections:
+    """Counts open connections the way the mode keeps them, adds latency."""
+
+    def __init__(self, mode: str, latency_ms: float):
+        from django.db.backends.signals import connection_created
+
+        self.mode = mode
+        self.latency = latency_ms / 1000
+        self.wrappers = set()
+        self.peak = 0
+        connection_created.connect(self.created, weak=False)
+
+    def created(self, sender, connection, **kwargs):
+        self.wrappers.add(connection)
+        if self.latency and self.delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self.delay)
+
+    def delay(self, execute, sql, params, many, context):
+        time.sleep(self.latency)
+        return execute(sql, params, many, context)
+
+    def count(self) -> int:
+        if self.mode == "pooled":
+            from udrems.utils import db_pool
+
+            return sum(pool.size for pool in db_pool._pools.values())
+        return sum(wrapper.connection is not None for wrapper in list(self.wrappers))
+
+    def sample(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self.peak = max(self.peak, self.count())
+            time.sleep(0.001)
+
+
+def request(application, token: str, latencies: List[float]) -> int:
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": "/api/users/",
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "localhost",
+        "HTTP_AUTHORIZATION": f"Token {token}",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    statuses = []
+    started = time.perf_counter()
+    response = application(environ, lambda status, headers: statuses.append(status))
+    try:
+        b"".join(response)
+    finally:
+        # sends request_finished, which closes or hands back the connection
+        response.close()
+    latencies.append((time.perf_counter() - started) * 1000)
+    return int(statuses[0].split()[0])
+
+
+def stress(application, token: str, connections: Connections, args) -> Dict:
+    latencies: List[float] = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=connections.sample, args=(stop,))
+    sampler.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        futures = [
+            executor.submit(request, application, token, latencies)
+            for _ in range(args.requests)
+        ]
+        statuses = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+        stop.set()
+        sampler.join()
+        open_after = connections.count()
+    latencies.sort()
+    return {
+        "ok": statuses.count(200),
+        "failed": len(statuses) - statuses.count(200),
+        "rps": args.requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "peak": connections.peak,
+        "open_after": open_after,
+    }
+
+
+def pool_metrics() -> Dict:
+    from udrems.utils import db_pool
+
+    waits = db_pool.wait_seconds._values.get(("default",))
+    count = sum(waits[0]) if waits else 0
+    return {
+        "mean_wait_ms": waits[1] / count * 1000 if count else 0.0,
+        "timeouts": db_pool.timeouts.value(alias="default"),
+    }
+
+
+def run_mode(mode: str, args) -> Dict:
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    configure(mode, args)
+    setup_django(args.settings)
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections as django_connections
+
+    from benchmarks.asgi_load import seed
+
+    settings.DEBUG = False
+    token = seed(users=0)["token"]
+    # seeding ran on this thread, start from nothing open
+    django_connections.close_all()
+    connections = Connections(mode, args.latency_ms)
+    result = stress(WSGIHandler(), token, connections, args)
+    if mode == "pooled":
+        result.update(pool_metrics())
+    return result
+
+
+def print_table(results: Dict[str, Dict]) -> None:
+    columns = ("ok", "failed", "rps", "p50_ms", "p95_ms", "peak", "open_after")
+    columns += ("mean_wait_ms", "timeouts")
+    print(f"{'mode':<12}" + "".join(f"{column:>14}" for column in columns))
+    for mode, result in results.items():
+        cells = []
+        for column in columns:
+            value = result.get(column, "")
+            cells.append(
+                f"{value:>14.1f}" if isinstance(value, float) else f"{value:>14}"
+            )
+        print(f"{mode:<12}" + "".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--mode", choices=MODES, help="Run one mode, print JSON")
+    parser.add_argument("--settings", default="config.settings.local")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args)))
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.db_pool", *sys.argv[1:], "--mode", mode],
+            cwd=ROOT_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+    print_table(results)
+    peak = results["pooled"]["peak"]
+    bounded = "bounded" if peak <= args.pool_size else "NOT bounded"
+    print(f"\npooled: peak {peak} for a pool of {args.pool_size}, {bounded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Latency of other endpoints while ``POST /auth-token/`` is flooded with logins.
+
+Drives ``config.asgi:application`` in-process like ``benchmarks.asgi_load``.
+``--concurrency`` tasks per endpoint request the home page (a sync view) and
+``/api/users/me/`` with a token for ``--duration`` seconds, first alone
+(``quiet``), then while ``--logins`` more tasks log in as fast as they get
+answers (``storm``). Each login pays for an Argon2 hash. Every mode runs in a
+subprocess of its own:
+
+* ``inline``: ``PASSWORD_HASHER_PROCESSES = 0``, Django's behaviour, hashes
+  run on the shared sync thread in the worker's own CPU time
+* ``pooled``: ``udrems.users.hashers`` with ``--processes`` and ``--queue``,
+  and ``USE_ASYNC_USER_VIEWS`` to serve logins from the thread pool
+
+``logins`` counts answered logins; ``busy`` the ones refused with a ``503``.
+The endpoints' p99 should barely move from ``quiet`` to ``storm`` in the
+pooled mode::
+
+    $ python -m benchmarks.login_storm --logins 32 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Awaitable, Dict, List
+from urllib.parse import urlencode
+
+from benchmarks import ROOT_DIR, setup_django
+from benchmarks.asgi_load import PASSWORD, http, load, seed
+
+MODES = ("inline", "pooled")
+ENDPOINTS = ("home", "api:user-me")
+
+
+def configure(mode: str, args) -> None:
+    """Set the environment the settings are read from."""
+    if mode == "inline":
+        os.environ["PASSWORD_HASHER_PROCESSES"] = "0"
+    else:
+        os.environ["PASSWORD_HASHER_PROCESSES"] = str(args.processes)
+        os.environ["PASSWORD_HASHER_QUEUE"] = str(args.queue)
+        os.environ["DJANGO_ASYNC_USER_VIEWS"] = "True"
+
+
+async def storm(app, credentials: bytes, deadline: float, statuses: List[int]):
+    form = {"content-type": "application/x-www-form-urlencoded"}
+    while time.perf_counter() < deadline:
+        status = await http(app, "POST", "/auth-token/", form, credentials)
+        statuses.append(status)
+        if status == 503:
+            await asyncio.sleep(1)
+
+
+async def ok(status: Awaitable[int]) -> bool:
+    return await status == 200
+
+
+async def run(app, seeded: Dict[str, str], args) -> Dict[str, Dict]:
+    token = {"authorization": f"Token {seeded['token']}"}
+    endpoints = {
+        "home": lambda: ok(http(app, "GET", "/")),
+        "api:user-me": lambda: ok(http(app, "GET", "/api/users/me/", token)),
+    }
+    credentials = urlencode(
+        {"username": seeded["username"], "password": PASSWORD}
+    ).encode()
+
+    async def measure(logins: int) -> Dict:
+        deadline = time.perf_counter() + args.duration
+        statuses: List[int] = []
+        results = await asyncio.gather(
+            *(
+                load(endpoint, args.concurrency, args.duration)
+                for endpoint in endpoints.values()
+            ),
+            *(storm(app, credentials, deadline, statuses) for _ in range(logins)),
+        )
+        measured = dict(zip(endpoints, results))
+        measured["logins"] = statuses.count(200)
+        measured["busy"] = statuses.count(503)
+        return measured
+
+    # warm up connections, caches and the hashing processes
+    await measure(min(args.logins, 2))
+    return {"quiet": await measure(0), "storm": await measure(args.logins)}
+
+
+def run_mode(mode: str, args) -> Dict:
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    configure(mode, args)
+    setup_django(args.settings)
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.COMPRESS_ENABLED = False
+    # sync only, it would put every request on the shared sync thread
+    settings.MIDDLEWARE = [
+        name for name in settings.MIDDLEWARE if not name.startswith("debug_toolbar.")
+    ]
+    from config.asgi import application
+
+    seeded = seed(users=0)
+    try:
+        return asyncio.run(run(application, seeded, args))
+    finally:
+        from udrems.users.hashers import close_pool
+
+        close_pool()
+
+
+def print_table(results: Dict[str, Dict]) -> None:
+    print(
+        f"{'mode':<8}{'phase':<7}{'endpoint':<13}"
+        f"{'rps':>9}{'p50_ms':>9}{'p99_ms':>9}{'logins':>8}{'busy':>7}"
+    )
+    for mode, phases in results.items():
+        for phase, measured in phases.items():
+            for endpoint in ENDPOINTS:
+                result = measured[endpoint]
+                print(
+                    f"{mode:<8}{phase:<7}{endpoint:<13}"
+                    f"{result['rps']:>9.1f}{result['p50_ms']:>9.1f}"
+                    f"{result['p99_ms']:>9.1f}"
+                    f"{measured['logins']:>8}{measured['busy']:>7}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=4, help="per endpoint")
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--queue", type=int, default=4)
+    parser.add_argument("--mode", choices=MODES, help="Run one mode, print JSON")
+    parser.add_argument("--settings", default="config.settings.local")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args)))
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.login_storm",
+                *sys.argv[1:],
+                "--mode",
+                mode,
+            ],
+            cwd=ROOT_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+    print_table(results)
+    for mode, phases in results.items():
+        growth = [
+            phases["storm"][endpoint]["p99_ms"] / phases["quiet"][endpoint]["p99_ms"]
+            for endpoint in ENDPOINTS
+        ]
+        print(f"\n{mode}: p99 during the storm x{max(growth):.1f} of quiet", end="")
+    print()
+
+
+if __name__ == "__main__":
+    main()
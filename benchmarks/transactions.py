@@ -0,0 +1,174 @@
+"""
+Round trips and latency saved by serving read paths outside a transaction.
+
+Every route below is requested ``--requests`` times through the Django test
+client, logged in as a synthetic user, in two modes:
+
+* ``selective``: as declared with ``udrems.utils.transactions``
+* ``atomic``: the same view with its declaration removed for the run, i.e.
+  wrapped by ``ATOMIC_REQUESTS`` as before
+
+``round trips`` counts the statements a request sends, plus BEGIN and COMMIT
+for every transaction that ran any. psycopg2 sends those two as separate
+round trips (and nothing for an empty transaction), so on PostgreSQL each
+one saved is worth a network round trip to the database. A local SQLite file
+makes them nearly free, so the latency column mostly shows Python overhead
+there. Routes answered from the cache run no statements in either mode.
+
+Needs synthetic data; a small volume is generated (and kept) when there is
+none, see ``manage.py generate_data``::
+
+    $ python -m benchmarks.transactions --requests 500
+"""
+import argparse
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from benchmarks import setup_django
+
+
+def seed() -> Tuple[object, Dict[str, dict]]:
+    from udrems.core.models import News
+    from udrems.perf.synthetic import USERNAME_PREFIX, Generator, Volume
+    from udrems.users.models import User
+
+    if not User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+        print("generating synthetic data")
+        Generator(seed=1).run(
+            Volume(users=200, tags=50, categories=10, images=200, content=200)
+        )
+    user = User.objects.filter(username__startswith=USERNAME_PREFIX).first()
+    news = News.objects.filter(is_published=True, is_active=True).first()
+    routes = {
+        "home": {},
+        "about": {},
+        "users:detail": {"username": user.username},
+        "api:user-me": {},
+        "api:news-list": {},
+        "api:news-detail": {"pk": news.pk},
+        "api:feed": {},
+    }
+    return user, routes
+
+
+class RoundTrips:
+    """Counts statements and transactions on one connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = 0
+        self.transactions = 0
+        self.in_transaction = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # SQLite sends its BEGIN as a statement, counted below instead
+        if sql != "BEGIN":
+            self.statements += 1
+        if not self.connection.get_autocommit():
+            self.in_transaction = True
+        return execute(sql, params, many, context)
+
+    @property
+    def total(self) -> int:
+        return self.statements + 2 * self.transactions
+
+    @contextmanager
+    def counting(self):
+        commit = self.connection.commit
+        rollback = self.connection.rollback
+
+        def counted(method):
+            def wrapper():
+                if self.in_transaction:
+                    self.transactions += 1
+                    self.in_transaction = False
+                return method()
+
+            return wrapper
+
+        self.connection.commit = counted(commit)
+        self.connection.rollback = counted(rollback)
+        try:
+            with self.connection.execute_wrapper(self):
+                yield self
+        finally:
+            del self.connection.commit, self.connection.rollback
+
+
+@contextmanager
+def atomic_requests(view):
+    """Drop the view's declaration so ``ATOMIC_REQUESTS`` applies again."""
+    declared = view.__dict__.pop("_non_atomic_requests", None)
+    try:
+        yield
+    finally:
+        if declared is not None:
+            view._non_atomic_requests = declared
+
+
+def run(client, url: str, requests: int) -> Tuple[List[float], float]:
+    from django.db import connection
+
+    client.get(url)  # warm caches and connections
+    timings = []
+    counter = RoundTrips(connection)
+    with counter.counting():
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, (url, response.status_code)
+    return timings, counter.total / requests
+
+
+def percentile(timings: List[float], share: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="per route and mode")
+    parser.add_argument("--settings", default="config.settings.local")
+    args = parser.parse_args()
+
+    setup_django(args.settings)
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import resolve, reverse
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["*"]
+    settings.COMPRESS_ENABLED = False
+    user, routes = seed()
+    client = Client()
+    client.force_login(user)
+
+    print(
+        f"{'route':<18}{'mode':<11}{'round trips':>12}"
+        f"{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}"
+    )
+    for name, kwargs in routes.items():
+        url = reverse(name, kwargs=kwargs)
+        view = resolve(url).func
+        results = {"selective": run(client, url, args.requests)}
+        with atomic_requests(view):
+            results["atomic"] = run(client, url, args.requests)
+        for mode, (timings, trips) in results.items():
+            print(
+                f"{name:<18}{mode:<11}{trips:>12.1f}"
+                f"{statistics.mean(timings):>10.2f}"
+                f"{percentile(timings, 0.5):>10.2f}"
+                f"{percentile(timings, 0.95):>10.2f}"
+            )
+        saved = results["atomic"][1] - results["selective"][1]
+        mean_saved = statistics.mean(results["atomic"][0]) - statistics.mean(
+            results["selective"][0]
+        )
+        print(f"{'':<18}{'saved':<11}{saved:>12.1f}{mean_saved:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,26 @@
 from django.conf import settings
+from django.urls import path, re_path
 from rest_framework.routers import DefaultRouter, SimpleRouter
 
-from udrems.users.api.views import UserViewSet
+from udrems.core.api.views import (
+    ArticleViewSet,
+    EventViewSet,
+    FeedView,
+    GalleryViewSet,
+    ImageUploadCompleteView,
+    ImageUploadView,
+    NewsViewSet,
+    ReportViewSet,
+    VideoViewSet,
+)
+from udrems.users.api.views import (
+    ProfilePictureUploadCompleteView,
+    ProfilePictureUploadView,
+    UserViewSet,
+    async_user_detail_view,
+    async_user_list_view,
+    async_user_me_view,
+)
 
 if settings.DEBUG:
     router = DefaultRouter()
@@ -9,7 +28,44 @@ else:
     router = SimpleRouter()
 
 router.register("users", UserViewSet)
+router.register("news", NewsViewSet)
+router.register("events", EventViewSet)
+router.register("articles", ArticleViewSet)
+router.register("videos", VideoViewSet)
+router.register("galleries", GalleryViewSet)
+router.register("reports", ReportViewSet)
 
 
 app_name = "api"
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("feed/", FeedView.as_view(), name="feed"),
+    # direct uploads to the media bucket, see udrems.utils.uploads
+    path("images/uploads/", ImageUploadView.as_view(), name="image-upload"),
+    path(
+        "images/uploads/complete/",
+        ImageUploadCompleteView.as_view(),
+        name="image-upload-complete",
+    ),
+    path(
+        "users/me/profile-picture/",
+        ProfilePictureUploadView.as_view(),
+        name="profile-picture-upload",
+    ),
+    path(
+        "users/me/profile-picture/complete/",
+        ProfilePictureUploadCompleteView.as_view(),
+        name="profile-picture-upload-complete",
+    ),
+]
+
+if settings.USE_ASYNC_USER_VIEWS:
+    # matched before the router's sync user routes, same paths and names
+    urlpatterns = [
+        path("users/", async_user_list_view, name="user-list"),
+        path("users/me/", async_user_me_view, name="user-me"),
+        re_path(
+            r"^users/(?P<username>[^/.]+)/$",
+            async_user_detail_view,
+            name="user-detail",
+        ),
+    ] + urlpatterns
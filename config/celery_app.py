@@ -1,6 +1,8 @@
+import atexit
 import os
+import threading
 
-from celery import Celery
+from celery import Celery, Task
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
@@ -15,3 +17,109 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
+
+
+class FireAndForgetTask(Task):
+    """
+    Base class for tasks whose return value nobody reads.
+
+    ``CELERY_RESULT_BACKEND`` stays configured for the tasks that need it, but
+    these never write a result (or its pub/sub notification) to Redis.
+    """
+
+    ignore_result = True
+
+
+def fire_and_forget(*args, **options):
+    """``@app.task`` for a ``FireAndForgetTask``, with or without arguments."""
+    return app.task(*args, base=FireAndForgetTask, **options)
+
+
+class Batcher:
+    """
+    Coalesces items into one ``task.delay(items)`` per ``size`` items or
+    ``interval`` seconds after the first pending one, whichever comes first.
+    """
+
+    def __init__(self, task, size: int, interval: float):
+        self.task = task
+        self.size = size
+        self.interval = interval
+        self._items: list = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, item) -> None:
+        with self._lock:
+            self._items.append(item)
+            if len(self._items) < self.size:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            items = self._take()
+        self.task.delay(items)
+
+    def flush(self) -> None:
+        with self._lock:
+            items = self._take()
+        if items:
+            self.task.delay(items)
+
+    def _take(self) -> list:
+        items, self._items = self._items, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return items
+
+
+_batchers = []
+_batchers_lock = threading.Lock()
+
+
+@atexit.register
+def flush_batches() -> None:
+    """Send whatever is pending, e.g. before the process exits."""
+    for batcher in list(_batchers):
+        batcher.flush()
+
+
+class BatchedTask(FireAndForgetTask):
+    """
+    A fire-and-forget task that receives a list of items.
+
+    ``task.enqueue(item)`` buffers in the calling process; ``batch_size`` and
+    ``batch_interval`` (seconds) bound how many items and how long the
+    buffer holds before it goes out as a single message.
+    """
+
+    batch_size = 100
+    batch_interval = 0.25
+    _batcher = None
+
+    @property
+    def batcher(self) -> Batcher:
+        if self._batcher is None:
+            with _batchers_lock:
+                if self._batcher is None:
+                    batcher = Batcher(self, self.batch_size, self.batch_interval)
+                    _batchers.append(batcher)
+                    self._batcher = batcher
+        return self._batcher
+
+    def enqueue(self, item) -> None:
+        self.batcher.add(item)
+
+
+def batched_task(*args, **options):
+    """
+    ``@app.task`` for a ``BatchedTask``; the function takes a list of items::
+
+        @batched_task(batch_size=500, batch_interval=1)
+        def send_notifications(user_ids): ...
+
+        send_notifications.enqueue(user.id)
+    """
+    return app.task(*args, base=BatchedTask, **options)
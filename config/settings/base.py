@@ -42,6 +42,16 @@ LOCALE_PATHS = [str(ROOT_DIR / "locale")]
 # https://docs.djangoproject.com/en/dev/ref/settings/#databases
 DATABASES = {"default": env.db("DATABASE_URL")}
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# read replicas, see udrems.utils.replicas; tests read them through default
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+    DATABASES[f"replica_{index}"] = {
+        **env.db_url_config(url),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+# https://docs.djangoproject.com/en/dev/ref/settings/#database-routers
+DATABASE_ROUTERS = ["udrems.utils.replicas.ReplicaRouter"]
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -83,6 +93,7 @@ LOCAL_APPS = [
     "udrems.property",
     "udrems.management",
     "udrems.core",
+    "udrems.perf",
     # Your stuff: custom apps go here
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -112,7 +123,8 @@ LOGIN_URL = "account_login"
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
 PASSWORD_HASHERS = [
     # https://docs.djangoproject.com/en/dev/topics/auth/passwords/#using-argon2-with-django
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    # Argon2 on a process pool, see udrems.users.hashers
+    "udrems.users.hashers.PooledArgon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
@@ -131,14 +143,18 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "udrems.perf.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "udrems.utils.static.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "udrems.perf.slow_queries.QueryOriginMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "udrems.users.authentication.CachedAuthenticationMiddleware",
+    "udrems.users.hashers.PasswordHasherBusyMiddleware",
+    "udrems.utils.replicas.ReplicaPinningMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.common.BrokenLinkEmailsMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -209,6 +225,8 @@ FIXTURE_DIRS = (str(APPS_DIR / "fixtures"),)
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#session-cookie-httponly
 SESSION_COOKIE_HTTPONLY = True
+# https://docs.djangoproject.com/en/dev/ref/settings/#session-engine
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 # https://docs.djangoproject.com/en/dev/ref/settings/#csrf-cookie-httponly
 CSRF_COOKIE_HTTPONLY = True
 # https://docs.djangoproject.com/en/dev/ref/settings/#secure-browser-xss-filter
@@ -257,6 +275,10 @@ LOGGING = {
         }
     },
     "root": {"level": "INFO", "handlers": ["console"]},
+    "loggers": {
+        # slow queries and their plans, see udrems.perf.slow_queries
+        "udrems.perf.slow_queries": {"level": "WARNING", "propagate": True},
+    },
 }
 
 # Celery
@@ -306,7 +328,7 @@ STATICFILES_FINDERS += ["compressor.finders.CompressorFinder"]
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "udrems.users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
 }
@@ -315,3 +337,63 @@ REST_FRAMEWORK = {
 CORS_URLS_REGEX = r"^/api/.*$"
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Seconds serialized core content stays cached, see udrems.core.cache
+CORE_CACHE_TIMEOUT = env.int("CORE_CACHE_TIMEOUT", default=300)
+# udrems.realtime: "memory" fans out within one process, "redis" across workers
+REALTIME_BACKEND = env("REALTIME_BACKEND", default="memory")
+REALTIME_REDIS_URL = env("REDIS_URL", default="redis://localhost:6379/0")
+# messages a client may fall behind before it is disconnected
+REALTIME_QUEUE_SIZE = env.int("REALTIME_QUEUE_SIZE", default=100)
+# dotted path to ``f(user, group) -> bool`` for groups beyond the user's
+# landlord groups, e.g. property groups
+REALTIME_GROUP_AUTHORIZER = env("REALTIME_GROUP_AUTHORIZER", default=None)
+# Serve the user API and profile page from async views backed by a bounded
+# thread pool instead of Django's single sync thread, see udrems.utils.threadpool
+USE_ASYNC_USER_VIEWS = env.bool("DJANGO_ASYNC_USER_VIEWS", default=False)
+ASYNC_VIEW_THREADS = env.int("DJANGO_ASYNC_VIEW_THREADS", default=8)
+# udrems.core.images: thumbnails rendered for every uploaded core Image
+CORE_IMAGE_DERIVATIVE_WIDTHS = env.list(
+    "CORE_IMAGE_DERIVATIVE_WIDTHS", cast=int, default=[320, 640, 1280]
+)
+CORE_IMAGE_DERIVATIVE_FORMATS = env.list(
+    "CORE_IMAGE_DERIVATIVE_FORMATS", default=["webp", "jpeg"]
+)
+CORE_IMAGE_DERIVATIVE_QUALITY = env.int("CORE_IMAGE_DERIVATIVE_QUALITY", default=80)
+# udrems.perf: per-view request cost histograms at /metrics/
+PERF_METRICS_ENABLED = env.bool("PERF_METRICS_ENABLED", default=False)
+# bearer token for scrapers; staff users can always read the metrics
+PERF_METRICS_TOKEN = env("PERF_METRICS_TOKEN", default="")
+# share of requests run under cProfile, dumped to PERF_PROFILE_DIR if set
+PERF_PROFILE_SAMPLE_RATE = env.float("PERF_PROFILE_SAMPLE_RATE", default=0.0)
+PERF_PROFILE_DIR = env("PERF_PROFILE_DIR", default="")
+# udrems.perf.slow_queries: log queries slower than this, 0 turns it off
+SLOW_QUERY_THRESHOLD_MS = env.int("SLOW_QUERY_THRESHOLD_MS", default=0)
+# capture plans of slow SELECTs; ANALYZE runs the query a second time
+SLOW_QUERY_EXPLAIN = env.bool("SLOW_QUERY_EXPLAIN", default=True)
+SLOW_QUERY_EXPLAIN_ANALYZE = env.bool("SLOW_QUERY_EXPLAIN_ANALYZE", default=False)
+# seconds between two plans of the same fingerprint
+SLOW_QUERY_EXPLAIN_INTERVAL = env.int("SLOW_QUERY_EXPLAIN_INTERVAL", default=600)
+# udrems.users.authentication: seconds users and token lookups stay cached
+AUTH_CACHE_TIMEOUT = env.int("AUTH_CACHE_TIMEOUT", default=300)
+# udrems.utils.replicas: apps whose reads may go to DATABASE_REPLICAS
+DATABASE_REPLICA_APPS = env.list("DATABASE_REPLICA_APPS", default=["core", "users"])
+# seconds a client keeps reading from default after it wrote
+REPLICA_STICKY_SECONDS = env.int("REPLICA_STICKY_SECONDS", default=5)
+# replicas lagging more than this leave the rotation until they catch up
+REPLICA_MAX_LAG_SECONDS = env.float("REPLICA_MAX_LAG_SECONDS", default=2.0)
+REPLICA_CHECK_INTERVAL = env.int("REPLICA_CHECK_INTERVAL", default=10)
+# udrems.users.hashers: processes computing Argon2 hashes, 0 hashes inline
+PASSWORD_HASHER_PROCESSES = env.int("PASSWORD_HASHER_PROCESSES", default=2)
+# hashes waiting for a process at most, more are answered with a 503
+PASSWORD_HASHER_QUEUE = env.int("PASSWORD_HASHER_QUEUE", default=4)
+# niceness of the hashing processes: Argon2 hashes on 8 threads each, which
+# at a low niceness still outweigh the web worker for the CPU
+PASSWORD_HASHER_NICE = env.int("PASSWORD_HASHER_NICE", default=19)
+# udrems.utils.uploads: files clients upload straight to the media bucket
+UPLOAD_CONTENT_TYPES = env.list(
+    "UPLOAD_CONTENT_TYPES",
+    default=["image/jpeg", "image/png", "image/webp", "image/gif"],
+)
+UPLOAD_MAX_SIZE = env.int("UPLOAD_MAX_SIZE", default=10 * 1024 * 1024)
+# seconds a presigned upload URL stays valid
+UPLOAD_URL_EXPIRY = env.int("UPLOAD_URL_EXPIRY", default=600)
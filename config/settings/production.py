@@ -21,6 +21,22 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["udrems.com"])
 DATABASES["default"] = env.db("DATABASE_URL")  # noqa F405
 DATABASES["default"]["ATOMIC_REQUESTS"] = True  # noqa F405
 DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)  # noqa F405
+for alias in DATABASE_REPLICAS:  # noqa F405
+    DATABASES[alias]["CONN_MAX_AGE"] = DATABASES["default"]["CONN_MAX_AGE"]  # noqa F405
+# udrems.utils.db_pool: one bounded pool per worker process instead of one
+# connection per thread, for the async workers
+if env.bool("DATABASE_POOL", default=False):
+    for alias in ["default", *DATABASE_REPLICAS]:  # noqa F405
+        DATABASES[alias]["ENGINE"] = "udrems.utils.db_pool.postgresql"  # noqa F405
+        # hand connections back to the pool after every request
+        DATABASES[alias]["CONN_MAX_AGE"] = 0  # noqa F405
+        DATABASES[alias]["POOL"] = {  # noqa F405
+            "MIN_SIZE": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            "MAX_SIZE": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+            "TIMEOUT": env.float("DATABASE_POOL_TIMEOUT", default=10.0),
+            "MAX_LIFETIME": env.float("DATABASE_POOL_MAX_LIFETIME", default=1800.0),
+            "CHECK_AFTER": env.float("DATABASE_POOL_CHECK_AFTER", default=30.0),
+        }
 
 # CACHES
 # ------------------------------------------------------------------------------
@@ -82,6 +98,9 @@ AWS_S3_OBJECT_PARAMETERS = {
 }
 # https://django-storages.readthedocs.io/en/latest/backends/amazon-S3.html#settings
 AWS_S3_REGION_NAME = env("DJANGO_AWS_S3_REGION_NAME", default=None)
+# https://django-storages.readthedocs.io/en/latest/backends/amazon-S3.html#settings
+# MinIO or another S3-compatible service, see udrems.utils.uploads
+AWS_S3_ENDPOINT_URL = env("DJANGO_AWS_S3_ENDPOINT_URL", default=None)
 # https://django-storages.readthedocs.io/en/latest/backends/amazon-S3.html#cloudfront
 AWS_S3_CUSTOM_DOMAIN = env("DJANGO_AWS_S3_CUSTOM_DOMAIN", default=None)
 aws_s3_domain = AWS_S3_CUSTOM_DOMAIN or f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com"
@@ -135,6 +154,8 @@ COMPRESS_ENABLED = env.bool("COMPRESS_ENABLED", default=True)
 COMPRESS_URL = STATIC_URL  # noqa F405
 # https://django-compressor.readthedocs.io/en/latest/settings/#django.conf.settings.COMPRESS_OFFLINE
 COMPRESS_OFFLINE = True  # Offline compression is required when using Whitenoise
+# .br and .gz variants next to the bundles, see udrems.utils.static
+COMPRESS_STORAGE = "udrems.utils.static.PrecompressedCompressorFileStorage"
 # https://django-compressor.readthedocs.io/en/latest/settings/#django.conf.settings.COMPRESS_FILTERS
 COMPRESS_FILTERS = {
     "css": [
@@ -180,6 +201,12 @@ LOGGING = {
             "handlers": ["console"],
             "propagate": False,
         },
+        # slow queries and their plans, see udrems.perf.slow_queries
+        "udrems.perf.slow_queries": {
+            "level": "WARNING",
+            "handlers": ["console"],
+            "propagate": False,
+        },
     },
 }
 
@@ -207,3 +234,5 @@ sentry_sdk.init(
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# every uvicorn worker must reach its own websocket subscribers
+REALTIME_BACKEND = env("REALTIME_BACKEND", default="redis")
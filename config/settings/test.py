@@ -27,3 +27,10 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# a second connection to the test database, udrems.utils.replicas tests route
+# reads to it by listing it in DATABASE_REPLICAS
+DATABASES["replica"] = {  # noqa F405
+    **DATABASES["default"],  # noqa F405
+    "ATOMIC_REQUESTS": False,
+    "TEST": {"MIRROR": "default"},
+}
@@ -7,10 +7,21 @@ from django.views import defaults as default_views
 from django.views.generic import TemplateView
 from rest_framework.authtoken.views import obtain_auth_token
 
+from udrems.perf.views import metrics
+from udrems.users.api.views import async_obtain_auth_token
+from udrems.users.views import async_login_view
+from udrems.utils.transactions import read_only
+
 urlpatterns = [
-    path("", TemplateView.as_view(template_name="pages/home.html"), name="home"),
     path(
-        "about/", TemplateView.as_view(template_name="pages/about.html"), name="about"
+        "",
+        read_only(TemplateView.as_view(template_name="pages/home.html")),
+        name="home",
+    ),
+    path(
+        "about/",
+        read_only(TemplateView.as_view(template_name="pages/about.html")),
+        name="about",
     ),
     # Django Admin, use {% url 'admin:index' %}
     path(settings.ADMIN_URL, admin.site.urls),
@@ -18,6 +29,7 @@ urlpatterns = [
     path("users/", include("udrems.users.urls", namespace="users")),
     path("accounts/", include("allauth.urls")),
     # Your stuff: custom urls includes go here
+    path("metrics/", metrics, name="metrics"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 if settings.DEBUG:
     # Static file serving when using Gunicorn + Uvicorn for local web socket development
@@ -31,6 +43,13 @@ urlpatterns += [
     path("auth-token/", obtain_auth_token),
 ]
 
+if settings.USE_ASYNC_USER_VIEWS:
+    # matched before the sync login views, same paths and names
+    urlpatterns = [
+        path("accounts/login/", async_login_view, name="account_login"),
+        path("auth-token/", async_obtain_auth_token),
+    ] + urlpatterns
+
 if settings.DEBUG:
     # This allows the error pages to be debugged during development, just visit
     # these url in browser to see how these error pages look like.
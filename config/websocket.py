@@ -1,13 +1,5 @@
-async def websocket_application(scope, receive, send):
-    while True:
-        event = await receive()
-
-        if event["type"] == "websocket.connect":
-            await send({"type": "websocket.accept"})
+from udrems.realtime import get_hub
 
-        if event["type"] == "websocket.disconnect":
-            break
 
-        if event["type"] == "websocket.receive":
-            if event["text"] == "ping":
-                await send({"type": "websocket.send", "text": "pong!"})
+async def websocket_application(scope, receive, send):
+    await get_hub().serve(scope, receive, send)
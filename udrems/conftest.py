@@ -1,6 +1,10 @@
 import pytest
+from django.core.cache import cache
 
-from udrems.users.models import User
+from udrems.core.cache import stats as content_cache_stats
+from udrems.core.models import Image
+from udrems.perf import budgets
+from udrems.users.models import ACCOUNT_TYPE_PROFILES, User
 from udrems.users.tests.factories import UserFactory
 
 
@@ -9,6 +13,40 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    content_cache_stats.reset()
+
+
 @pytest.fixture
 def user() -> User:
     return UserFactory()
+
+
+@pytest.fixture
+def query_budget():
+    """``with query_budget("api:user-list"): ...`` fails over the URL's budget."""
+    return budgets.measure
+
+
+@pytest.fixture
+def media_bucket(settings, monkeypatch):
+    """
+    ``MediaRootS3Boto3Storage`` on a moto bucket, storing core images and
+    profile pictures, for direct uploads.
+    """
+    moto = pytest.importorskip("moto")
+    storages = pytest.importorskip("udrems.utils.storages")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    settings.AWS_STORAGE_BUCKET_NAME = "udrems-media"
+    settings.AWS_S3_REGION_NAME = "us-east-1"
+    with moto.mock_s3():
+        storage = storages.MediaRootS3Boto3Storage()
+        storage.bucket.create()
+        monkeypatch.setattr(Image._meta.get_field("image"), "storage", storage)
+        for profile_model in ACCOUNT_TYPE_PROFILES.values():
+            field = profile_model._meta.get_field("profile_picture")
+            monkeypatch.setattr(field, "storage", storage)
+        yield storage
@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedCursorPagination(CursorPagination):
+    """
+    Newest-first cursor pagination for content listings.
+
+    Unlike page-number pagination there is no ``COUNT(*)`` and no ``OFFSET``,
+    so every page costs the same regardless of how deep the client scrolls.
+    """
+
+    ordering = "-created"
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -0,0 +1,124 @@
+from rest_framework import serializers
+
+from udrems.core.models import (
+    Article,
+    Category,
+    Event,
+    Gallery,
+    Image,
+    ImageDerivative,
+    News,
+    Report,
+    Tags,
+    Video,
+)
+from udrems.users.api.serializers import UserSerializer
+from udrems.utils.uploads import UploadCompleteSerializer
+
+
+class ImageDerivativeSerializer(serializers.ModelSerializer):
+    url = serializers.FileField(source="file", read_only=True)
+
+    class Meta:
+        model = ImageDerivative
+        fields = ["url", "format", "width", "height"]
+
+
+class ImageSerializer(serializers.ModelSerializer):
+    derivatives = ImageDerivativeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Image
+        fields = [
+            "id",
+            "image",
+            "image_name",
+            "image_caption",
+            "width",
+            "height",
+            "derivatives",
+        ]
+
+
+class ImageUploadCompleteSerializer(UploadCompleteSerializer):
+    image_name = serializers.CharField(max_length=255)
+    image_caption = serializers.CharField(max_length=255)
+
+
+class CategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ["id", "category"]
+
+
+class TagsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tags
+        fields = ["id", "tag"]
+
+
+class GeneralSerializer(serializers.ModelSerializer):
+    """
+    Base serializer for the concrete ``General`` models.
+
+    The nested relations expect the queryset to come from
+    ``GeneralViewSet.get_queryset`` so that they are served from
+    ``select_related``/``prefetch_related`` caches instead of one query per row.
+    """
+
+    author = UserSerializer(read_only=True)
+    image = ImageSerializer(read_only=True)
+    category = CategorySerializer(many=True, read_only=True)
+    tags = TagsSerializer(many=True, read_only=True)
+
+    class Meta:
+        fields = [
+            "url",
+            "uuid",
+            "title",
+            "slug",
+            "description",
+            "excerpt",
+            "author",
+            "image",
+            "category",
+            "tags",
+            "created",
+            "updated",
+        ]
+
+
+class NewsSerializer(GeneralSerializer):
+    class Meta(GeneralSerializer.Meta):
+        model = News
+        extra_kwargs = {"url": {"view_name": "api:news-detail"}}
+
+
+class EventSerializer(GeneralSerializer):
+    class Meta(GeneralSerializer.Meta):
+        model = Event
+        extra_kwargs = {"url": {"view_name": "api:event-detail"}}
+
+
+class ArticleSerializer(GeneralSerializer):
+    class Meta(GeneralSerializer.Meta):
+        model = Article
+        extra_kwargs = {"url": {"view_name": "api:article-detail"}}
+
+
+class VideoSerializer(GeneralSerializer):
+    class Meta(GeneralSerializer.Meta):
+        model = Video
+        extra_kwargs = {"url": {"view_name": "api:video-detail"}}
+
+
+class GallerySerializer(GeneralSerializer):
+    class Meta(GeneralSerializer.Meta):
+        model = Gallery
+        extra_kwargs = {"url": {"view_name": "api:gallery-detail"}}
+
+
+class ReportSerializer(GeneralSerializer):
+    class Meta(GeneralSerializer.Meta):
+        model = Report
+        extra_kwargs = {"url": {"view_name": "api:report-detail"}}
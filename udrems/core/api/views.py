@@ -0,0 +1,302 @@
+from uuid import UUID
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+from udrems.core import cache, feed, search
+from udrems.core.models import Article, Event, Gallery, Image, News, Report, Video
+from udrems.utils.conditional import make_etag, not_modified, set_validators
+from udrems.utils.transactions import AtomicWritesMixin
+from udrems.utils.uploads import CompleteUploadView, StartUploadView
+
+from .pagination import CreatedCursorPagination
+from .serializers import (
+    ArticleSerializer,
+    EventSerializer,
+    GallerySerializer,
+    ImageSerializer,
+    ImageUploadCompleteSerializer,
+    NewsSerializer,
+    ReportSerializer,
+    VideoSerializer,
+)
+
+
+class CachedContentMixin:
+    """
+    Serve ``list`` and ``retrieve`` payloads from the versioned content cache.
+
+    Keys include scheme, host and full path, since payloads carry absolute
+    URLs and the cursor/page size live in the query string.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(
+            "list",
+            lambda: super(CachedContentMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            "detail",
+            lambda: super(CachedContentMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+    def _cached_response(self, kind, get_response):
+        model = self.queryset.model
+        request = self.request
+        key = cache.content_key(
+            model, kind, request.scheme, request.get_host(), request.get_full_path()
+        )
+        return Response(cache.get_or_compute(model, key, lambda: get_response().data))
+
+
+class ConditionalContentMixin:
+    """
+    ETag / Last-Modified validators for ``list`` and ``retrieve``.
+
+    They come from ``updated`` (``max(updated)`` and the row count for lists)
+    plus the model's cache generation, which also moves when categories, tags
+    or images change. Validators are cached under that generation, so a
+    conditional request usually costs no query at all and a fresh client gets
+    a 304 before anything is serialized.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(
+            self._list_validators,
+            lambda: super(ConditionalContentMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(
+            self._detail_validators,
+            lambda: super(ConditionalContentMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+    def _list_validators(self):
+        queryset = self.get_queryset().order_by()
+        model = queryset.model
+        return cache.get_or_compute(
+            model,
+            cache.content_key(model, "list-validators"),
+            lambda: tuple(queryset.aggregate(Max("updated"), Count("pk")).values()),
+        )
+
+    def _detail_validators(self):
+        queryset = self.get_queryset()
+        model = queryset.model
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            return cache.get_or_compute(
+                model,
+                cache.content_key(model, "detail-validators", pk),
+                lambda: (
+                    queryset.filter(pk=pk).values_list("updated", flat=True).first(),
+                ),
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # a malformed pk, get_object() answers 404 like for a missing row
+            return (None,)
+
+    def _conditional_response(self, get_validators, get_response):
+        last_modified, *rest = get_validators()
+        if last_modified is None:
+            # nothing to validate against: an empty list or a 404
+            return get_response()
+        model = self.queryset.model
+        etag = make_etag(cache.get_generation(model), last_modified, *rest)
+        response = not_modified(self.request, etag, last_modified)
+        if response is None:
+            response = get_response()
+        return set_validators(response, etag, last_modified)
+
+
+class GeneralViewSet(
+    AtomicWritesMixin,
+    ConditionalContentMixin,
+    CachedContentMixin,
+    ReadOnlyModelViewSet,
+):
+    """
+    Read-only listing and detail for a concrete ``General`` model.
+
+    ``author`` and ``image`` are joined into the main query and ``category``,
+    ``tags`` and the image derivatives are prefetched in one query each, so a
+    page costs four queries no matter how many rows it holds.
+
+    ``slug/<slug>/`` and ``uuid/<uuid>/`` serve the same detail, resolved to a
+    primary key through a cached lookup.
+    """
+
+    permission_classes = [AllowAny]
+    pagination_class = CreatedCursorPagination
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .select_related("author", "image")
+            .prefetch_related("category", "tags", "image__derivatives")
+        )
+
+    @action(detail=False, url_path=r"slug/(?P<slug>[-\w]+)")
+    def by_slug(self, request, slug):
+        return self._retrieve_by("slug", slug)
+
+    @action(detail=False, url_path=r"uuid/(?P<uuid>[0-9a-fA-F-]{32,36})")
+    def by_uuid(self, request, uuid):
+        try:
+            value = UUID(uuid)
+        except ValueError:
+            raise NotFound
+        return self._retrieve_by("uuid", value)
+
+    def _retrieve_by(self, field, value):
+        pk = cache.get_pk(self.queryset.model, field, value)
+        if pk is None:
+            raise NotFound
+        self.kwargs[self.lookup_field] = pk
+        return self.retrieve(self.request, pk=pk)
+
+
+class SearchableViewSet(GeneralViewSet):
+    """
+    Adds ``search/?q=`` with ranked prefix matching, see ``udrems.core.search``.
+    """
+
+    search_limit = 20
+    max_search_limit = 50
+
+    def get_queryset(self):
+        # the tsvector is only ever read by the database
+        return super().get_queryset().defer("search_vector")
+
+    @action(detail=False)
+    def search(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This query parameter is required."})
+        try:
+            limit = int(request.query_params.get("limit", self.search_limit))
+        except ValueError:
+            raise ValidationError({"limit": "A valid integer is required."})
+        limit = max(1, min(limit, self.max_search_limit))
+        results = search.search(self.get_queryset(), query)[:limit]
+        serializer = self.get_serializer(results, many=True)
+        return Response(serializer.data)
+
+
+class NewsViewSet(SearchableViewSet):
+    serializer_class = NewsSerializer
+    queryset = News.objects.filter(is_published=True, is_active=True)
+
+
+class EventViewSet(SearchableViewSet):
+    serializer_class = EventSerializer
+    queryset = Event.manager.all()
+
+
+class ArticleViewSet(SearchableViewSet):
+    serializer_class = ArticleSerializer
+    queryset = Article.manager.all()
+
+
+class VideoViewSet(GeneralViewSet):
+    serializer_class = VideoSerializer
+    queryset = Video.objects.filter(is_active=True)
+
+
+class GalleryViewSet(GeneralViewSet):
+    serializer_class = GallerySerializer
+    queryset = Gallery.manager.all()
+
+
+class ReportViewSet(GeneralViewSet):
+    serializer_class = ReportSerializer
+    queryset = Report.manager.all()
+
+
+class FeedView(AtomicWritesMixin, APIView):
+    """
+    ``feed/``: the newest content of every kind in one stream.
+
+    ``?type=news,event`` narrows the kinds, ``?page_size=`` sets the page size
+    and ``next`` links carry the keyset cursor, see ``udrems.core.feed``.
+    """
+
+    permission_classes = [AllowAny]
+    serializer_classes = {
+        News: NewsSerializer,
+        Event: EventSerializer,
+        Article: ArticleSerializer,
+        Video: VideoSerializer,
+        Gallery: GallerySerializer,
+        Report: ReportSerializer,
+    }
+
+    def get(self, request):
+        params = request.query_params
+        kinds = None
+        if params.get("type"):
+            kinds = params["type"].split(",")
+            unknown = set(kinds) - set(feed.KINDS)
+            if unknown:
+                raise ValidationError({"type": f"Unknown types: {sorted(unknown)}"})
+        try:
+            limit = int(params.get("page_size", feed.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({"page_size": "A valid integer is required."})
+        limit = max(1, min(limit, feed.MAX_LIMIT))
+        try:
+            page = feed.get_page(params.get("cursor"), limit, kinds)
+        except feed.InvalidCursor:
+            raise NotFound("Invalid cursor")
+
+        context = {"request": request}
+        results = []
+        for obj in page.items:
+            data = self.serializer_classes[type(obj)](obj, context=context).data
+            results.append({"type": obj._meta.model_name, **data})
+        url = request.build_absolute_uri()
+        next_url = None
+        if page.next_cursor:
+            next_url = replace_query_param(url, "cursor", page.next_cursor)
+        return Response({"next": next_url, "results": results})
+
+
+class ImageUploadView(StartUploadView):
+    """``images/uploads/``: a presigned upload of a core image."""
+
+    permission_classes = [IsAdminUser]
+
+    def get_field(self):
+        return Image._meta.get_field("image")
+
+
+class ImageUploadCompleteView(CompleteUploadView):
+    """``images/uploads/complete/``: the ``Image`` for an uploaded file."""
+
+    permission_classes = [IsAdminUser]
+    serializer_class = ImageUploadCompleteSerializer
+
+    def get_field(self):
+        return Image._meta.get_field("image")
+
+    def complete(self, request, name, data):
+        if Image.objects.filter(image=name).exists():
+            raise ValidationError({"upload": "This upload is already complete."})
+        # the derivatives are rendered from the bucket, see udrems.core.signals
+        image = Image.objects.create(image=name, **data)
+        serializer = ImageSerializer(image, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
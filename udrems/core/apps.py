@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "udrems.core"
+
+    def ready(self):
+        try:
+            import udrems.core.signals  # noqa F401
+        except ImportError:
+            pass
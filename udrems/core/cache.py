@@ -0,0 +1,191 @@
+"""
+Versioned cache for serialized ``core`` content.
+
+Every concrete ``General`` model owns a generation counter in the cache.
+Payload keys embed the current generation, so invalidating everything cached
+for a model is a single ``incr`` (see ``udrems.core.signals``) and never needs
+a key scan; entries of old generations are simply never read again and age
+out with their timeout.
+
+Recomputes are spread out with probabilistic early expiration ("XFetch"), and
+an ``add``-based lock makes sure only one worker refreshes a given key while
+the others keep serving the still-valid value. On a cold miss, e.g. right
+after a generation bump, the others have nothing to serve: they poll for the
+winner's entry for up to ``COLD_WAIT_SECONDS`` and only then compute it
+themselves.
+"""
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = "core"
+# >1 favours earlier recomputes, <1 later ones
+EARLY_EXPIRY_BETA = 1.0
+LOCK_TIMEOUT = 30
+# how long a cold miss waits for the worker holding the lock, and how often
+# it looks for its entry meanwhile
+COLD_WAIT_SECONDS = 5.0
+COLD_POLL_SECONDS = 0.05
+# slug/uuid -> pk mappings never change while the row exists
+LOOKUP_TIMEOUT = 24 * 60 * 60
+
+
+class CacheStats:
+    """Per-process hit/miss counters, keyed by model label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def record(self, label: str, outcome: str) -> None:
+        with self._lock:
+            self._counts[(label, outcome)] += 1
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            counts = dict(self._counts)
+        stats: Dict[str, Dict[str, int]] = {}
+        for (label, outcome), count in counts.items():
+            stats.setdefault(label, {"hit": 0, "miss": 0})[outcome] = count
+        return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+def get_timeout() -> int:
+    return getattr(settings, "CORE_CACHE_TIMEOUT", 300)
+
+
+def generation_key(model) -> str:
+    return f"{KEY_PREFIX}:gen:{model._meta.label_lower}"
+
+
+def get_generation(model) -> int:
+    key = generation_key(model)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed with the clock rather than 0: if the counter is ever evicted,
+        # it must not come back at a value older payloads were stored under.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(model) -> None:
+    key = generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def content_key(model, kind: str, *parts: Any) -> str:
+    """Build a key for ``model`` that is only valid for its current generation."""
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return (
+        f"{KEY_PREFIX}:{model._meta.label_lower}:"
+        f"{get_generation(model)}:{kind}:{digest}"
+    )
+
+
+def _should_recompute(delta: float, expiry: float) -> bool:
+    return time.time() - delta * EARLY_EXPIRY_BETA * math.log(random.random()) >= expiry
+
+
+def _wait_for(key: str):
+    """The entry another worker is computing for ``key``, ``None`` on timeout."""
+    deadline = time.monotonic() + COLD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(COLD_POLL_SECONDS)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_compute(model, key: str, compute: Callable[[], Any]) -> Any:
+    """
+    Return the cached value for ``key``, calling ``compute`` on a miss.
+
+    Entries are stored as ``(value, delta, expiry)`` where ``delta`` is how long
+    ``compute`` took; the closer an entry is to ``expiry`` and the more
+    expensive it is, the likelier a read is to refresh it early.
+    """
+    label = model._meta.label_lower
+    lock = f"{key}:lock"
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expiry = entry
+        if not _should_recompute(delta, expiry):
+            stats.record(label, "hit")
+            return value
+        if not cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+            # somebody else is already refreshing it
+            stats.record(label, "hit")
+            return value
+        locked = True
+    else:
+        locked = cache.add(lock, 1, timeout=LOCK_TIMEOUT)
+        if not locked:
+            # somebody else is already computing it
+            entry = _wait_for(key)
+            if entry is not None:
+                stats.record(label, "hit")
+                return entry[0]
+    stats.record(label, "miss")
+    try:
+        started = time.time()
+        value = compute()
+        delta = time.time() - started
+        timeout = get_timeout()
+        cache.set(key, (value, delta, time.time() + timeout), timeout=timeout)
+    finally:
+        if locked:
+            cache.delete(lock)
+    return value
+
+
+def lookup_key(model, field: str, value: Any) -> str:
+    return f"{KEY_PREFIX}:{model._meta.label_lower}:{field}:{value}"
+
+
+def get_pk(model, field: str, value: Any):
+    """
+    Primary key of the ``model`` row whose unique ``field`` is ``value``.
+
+    Mappings are dropped when their row is deleted (see ``udrems.core.signals``)
+    so a reused slug never resolves to a stale row. Visibility is left to the
+    caller's queryset.
+    """
+    key = lookup_key(model, field, value)
+    pk = cache.get(key)
+    if pk is None:
+        pk = (
+            model._base_manager.filter(**{field: value})
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is not None:
+            cache.set(key, pk, timeout=LOOKUP_TIMEOUT)
+    return pk
+
+
+def forget_pk(instance, *fields: str) -> None:
+    model = type(instance)
+    cache.delete_many(
+        [lookup_key(model, field, getattr(instance, field)) for field in fields]
+    )
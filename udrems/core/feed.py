@@ -0,0 +1,151 @@
+"""
+The "latest" stream across all six content models.
+
+A page is found with a single ``UNION ALL`` over the content tables that
+selects only ``(kind, id, created)``, ordered newest first and cut off with a
+keyset condition instead of an ``OFFSET``, so page 1000 costs what page 1
+does. The rows of the page are then loaded per model in one query each, with
+the relations the serializers need.
+
+Rows are ordered by ``(created, id, kind)``: ``id`` alone is only unique
+within a table, so ``kind`` settles the (unlikely) tie of two rows from
+different tables sharing both.
+"""
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.db import connections
+from django.db.models import CharField, Q, QuerySet, Value
+
+from udrems.core.models import Article, Event, Gallery, News, Report, Video
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+
+Position = Tuple[datetime, int, str]
+
+
+def get_sources() -> Dict[str, QuerySet]:
+    """Published, active rows per kind, as served by the content API."""
+    return {
+        "news": News.objects.filter(is_published=True, is_active=True),
+        "event": Event.manager.all(),
+        "article": Article.manager.all(),
+        "video": Video.objects.filter(is_active=True),
+        "gallery": Gallery.manager.all(),
+        "report": Report.manager.all(),
+    }
+
+
+KINDS = ("news", "event", "article", "video", "gallery", "report")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position: Position) -> str:
+    created, pk, kind = position
+    raw = f"{created.isoformat()}|{pk}|{kind}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Position:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created, pk, kind = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        )
+        position = (datetime.fromisoformat(created), int(pk), kind)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if kind not in KINDS:
+        raise InvalidCursor(cursor)
+    return position
+
+
+def after(position: Position, kind: str) -> Q:
+    """Rows of ``kind`` that come after ``position`` in feed order."""
+    created, pk, position_kind = position
+    condition = Q(created__lt=created) | Q(created=created, id__lt=pk)
+    if kind < position_kind:
+        condition |= Q(created=created, id=pk)
+    return condition
+
+
+@dataclass
+class FeedPage:
+    items: list = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def get_positions(
+    limit: int, position: Optional[Position], kinds: Sequence[str], using: str
+) -> List[Position]:
+    """``(created, id, kind)`` of the next ``limit`` rows, in one query."""
+    slice_branches = connections[using].features.supports_slicing_ordering_in_compound
+    branches = []
+    sources = get_sources()
+    for kind in kinds:
+        queryset = sources[kind].using(using)
+        if position is not None:
+            queryset = queryset.filter(after(position, kind))
+        queryset = queryset.annotate(
+            kind=Value(kind, output_field=CharField())
+        ).values_list("created", "id", "kind")
+        if slice_branches:
+            # lets every branch stop after ``limit`` rows of its own index
+            queryset = queryset.order_by("-created", "-id")[:limit]
+        branches.append(queryset)
+    if not branches:
+        return []
+    union = branches[0].union(*branches[1:], all=True)
+    return list(union.order_by("-created", "-id", "-kind")[:limit])
+
+
+def hydrate(positions: List[Position], using: str) -> list:
+    """Load the rows behind ``positions``, one query (plus prefetches) per kind."""
+    ids: Dict[str, List[int]] = {}
+    for _, pk, kind in positions:
+        ids.setdefault(kind, []).append(pk)
+    sources = get_sources()
+    rows = {}
+    for kind, pks in ids.items():
+        queryset = (
+            sources[kind]
+            .using(using)
+            .filter(pk__in=pks)
+            .select_related("author", "image")
+            .prefetch_related("category", "tags", "image__derivatives")
+        )
+        if hasattr(queryset.model, "search_vector"):
+            queryset = queryset.defer("search_vector")
+        for obj in queryset:
+            rows[(kind, obj.pk)] = obj
+    # a row deleted between the two queries is simply left out
+    return [rows[(kind, pk)] for _, pk, kind in positions if (kind, pk) in rows]
+
+
+def get_page(
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+    kinds: Optional[Sequence[str]] = None,
+    using: str = "default",
+) -> FeedPage:
+    """
+    The ``limit`` newest rows after ``cursor``, across ``kinds`` (all by default).
+
+    Raises ``InvalidCursor`` for a cursor this module did not produce.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    kinds = [kind for kind in KINDS if kinds is None or kind in kinds]
+    positions = get_positions(limit + 1, position, kinds, using)
+    has_next = len(positions) > limit
+    positions = positions[:limit]
+    return FeedPage(
+        items=hydrate(positions, using),
+        next_cursor=encode_cursor(positions[-1]) if has_next else None,
+    )
@@ -0,0 +1,109 @@
+"""
+Resized derivatives of ``core.Image`` uploads.
+
+The original is read from storage once; every configured width is rendered in
+every configured format and written back through the default storage (S3 in
+production). Widths and heights are stored on the rows so ``srcset`` can be
+built without opening any file again.
+"""
+import logging
+import os
+from io import BytesIO
+from typing import List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image as PILImage
+from PIL import ImageOps, features
+
+from udrems.core.models import Image, ImageDerivative
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name, plugin feature to check and save options per format
+PILLOW_FORMATS = {
+    ImageDerivative.WEBP: ("WEBP", "webp", {"method": 4}),
+    ImageDerivative.JPEG: ("JPEG", None, {"optimize": True, "progressive": True}),
+}
+
+
+def get_formats() -> List[str]:
+    """Configured formats this Pillow build can write."""
+    formats = []
+    for format in settings.CORE_IMAGE_DERIVATIVE_FORMATS:
+        _, feature, _ = PILLOW_FORMATS[format]
+        if feature is None or features.check(feature):
+            formats.append(format)
+        else:
+            logger.warning("Pillow was built without %s support", format)
+    return formats
+
+
+def get_widths(original_width: int) -> List[int]:
+    """Configured widths, never upscaling past the original."""
+    widths = sorted(
+        width
+        for width in settings.CORE_IMAGE_DERIVATIVE_WIDTHS
+        if width < original_width
+    )
+    return widths or [original_width]
+
+
+def scaled_height(source: PILImage.Image, width: int) -> int:
+    return max(1, round(source.height * width / source.width))
+
+
+def render(source: PILImage.Image, width: int, format: str) -> bytes:
+    pillow_format, _, options = PILLOW_FORMATS[format]
+    resized = source.resize((width, scaled_height(source, width)), PILImage.LANCZOS)
+    if format == ImageDerivative.JPEG and resized.mode != "RGB":
+        resized = resized.convert("RGB")
+    buffer = BytesIO()
+    resized.save(
+        buffer,
+        pillow_format,
+        quality=settings.CORE_IMAGE_DERIVATIVE_QUALITY,
+        **options,
+    )
+    return buffer.getvalue()
+
+
+def generate_derivatives(image: Image) -> List[ImageDerivative]:
+    """
+    (Re)create every derivative of ``image`` and record its dimensions.
+    """
+    with image.image.open("rb") as file:
+        source = PILImage.open(file)
+        source.load()
+    # camera uploads are often stored sideways with an EXIF rotation
+    source = ImageOps.exif_transpose(source)
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert("RGBA" if "transparency" in source.info else "RGB")
+
+    stem, _ = os.path.splitext(os.path.basename(image.image.name))
+    derivatives = []
+    for width in get_widths(source.width):
+        for format in get_formats():
+            content = render(source, width, format)
+            derivative = ImageDerivative(
+                image=image,
+                format=format,
+                width=width,
+                height=scaled_height(source, width),
+            )
+            derivative.file.save(
+                f"{stem}-{width}w.{format}", ContentFile(content), save=False
+            )
+            derivatives.append(derivative)
+
+    stale = list(image.derivatives.all())
+    with transaction.atomic():
+        ImageDerivative.objects.filter(pk__in=[d.pk for d in stale]).delete()
+        ImageDerivative.objects.bulk_create(derivatives)
+        image.width, image.height = source.size
+        # ``update_fields`` without ``image``: no new round of derivatives
+        image.save(update_fields=["width", "height"])
+    for derivative in stale:
+        derivative.file.delete(save=False)
+    return derivatives
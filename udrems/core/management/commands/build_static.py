@@ -0,0 +1,55 @@
+import re
+
+from compressor.cache import get_offline_manifest, get_offline_manifest_filename
+from compressor.conf import settings as compressor_settings
+from compressor.storage import default_storage as compressor_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from udrems.utils.static import is_bundle
+
+
+class Command(BaseCommand):
+    help = (
+        "Collect the static files and render the {% compress %} blocks of the "
+        "templates offline, with Brotli and gzip variants, so requests only "
+        "look files up in manifests. Run it before the web workers start."
+    )
+
+    def handle(self, *args, **options):
+        compress = compressor_settings.COMPRESS_ENABLED
+        if compress and not compressor_settings.COMPRESS_OFFLINE:
+            raise CommandError(
+                "COMPRESS_OFFLINE is off, requests would compress the "
+                "{% compress %} blocks themselves"
+            )
+        verbosity = options["verbosity"]
+        call_command("collectstatic", interactive=False, verbosity=verbosity)
+        if not compress:
+            self.stdout.write("COMPRESS_ENABLED is off, no bundles to build")
+            return
+        call_command("compress", force=True, verbosity=verbosity)
+
+        bundles = self.bundles()
+        missing = [name for name in bundles if not compressor_storage.exists(name)]
+        if missing:
+            raise CommandError(f"Bundles missing after compress: {missing}")
+        variants = {
+            suffix: sum(compressor_storage.exists(name + suffix) for name in bundles)
+            for suffix in (".br", ".gz")
+        }
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built {len(bundles)} bundles ({variants['.br']} .br, "
+                f"{variants['.gz']} .gz) listed in {get_offline_manifest_filename()}"
+            )
+        )
+
+    def bundles(self):
+        """Names of the bundles the offline manifest links to."""
+        # the manifest keeps a placeholder where COMPRESS_URL goes
+        url = re.escape(compressor_settings.COMPRESS_URL_PLACEHOLDER)
+        names = set()
+        for html in get_offline_manifest().values():
+            names.update(re.findall(rf'(?:href|src)="{url}([^"?]+)', html))
+        return sorted(name for name in names if is_bundle(name))
@@ -0,0 +1,69 @@
+# Generated by Django 3.2.11 on 2026-10-18 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-created'], name='core_article_created'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created'], name='core_article_active'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-created'], name='core_event_created'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created'], name='core_event_active'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_published', True)), fields=['-created'], name='core_event_published'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(fields=['-created'], name='core_gallery_created'),
+        ),
+        migrations.AddIndex(
+            model_name='gallery',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created'], name='core_gallery_active'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-created'], name='core_news_created'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created'], name='core_news_active'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_published', True)), fields=['-created'], name='core_news_published'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['-created'], name='core_report_created'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created'], name='core_report_active'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['-created'], name='core_video_created'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created'], name='core_video_active'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.11 on 2026-10-18 11:12
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from udrems.core import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor.connection, backfill=True)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_content_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(install_search, uninstall_search),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.11 on 2026-10-18 11:40
+
+import uuid
+
+from django.db import migrations, models
+
+from udrems.core.slugs import unique_slug
+
+MODELS = ['news', 'event', 'article', 'video', 'gallery', 'report']
+
+
+def backfill_slugs(apps, schema_editor):
+    for model_name in MODELS:
+        model = apps.get_model('core', model_name)
+        queryset = model.objects.using(schema_editor.connection.alias)
+        for obj in queryset.filter(slug__isnull=True).only('pk', 'title').order_by('pk'):
+            obj.slug = unique_slug(queryset, obj.title, model_name)
+            obj.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name=model_name,
+            name='slug',
+            field=models.SlugField(editable=False, max_length=255, null=True),
+        )
+        for model_name in MODELS
+    ] + [
+        migrations.RunPython(backfill_slugs, migrations.RunPython.noop),
+    ] + [
+        migrations.AlterField(
+            model_name=model_name,
+            name='slug',
+            field=models.SlugField(editable=False, max_length=255, unique=True),
+        )
+        for model_name in MODELS
+    ] + [
+        migrations.AlterField(
+            model_name=model_name,
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        )
+        for model_name in MODELS
+    ]
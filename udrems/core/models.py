@@ -18,9 +18,12 @@ inherited by all models in core package
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
 from django.urls import reverse
 
+from udrems.core.slugs import unique_slug
+
 
 class GeneralManager(models.Manager):
     def get_queryset(self):
@@ -56,6 +59,19 @@ class NewsAndBlogModelManager(models.Model):
         abstract = True
 
 
+class SearchableModel(models.Model):
+    """
+    Abstract Model
+
+    ``search_vector`` is maintained by the database, see ``udrems.core.search``.
+    """
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
 class TimeStamp(models.Model):
     """
     ! TimeStamp Model
@@ -74,7 +90,9 @@ class General(models.Model):
     """
 
     title = models.CharField(max_length=255)
-    uuid = models.UUIDField(default=uuid.uuid4, editable=False)
+    # generated from ``title`` on the first save, see ``udrems.core.slugs``
+    slug = models.SlugField(max_length=255, unique=True, editable=False)
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
@@ -85,8 +103,20 @@ class General(models.Model):
     def __str__(self):
         return self.title
 
-    def slug(self):
-        return self.title.replace(" ", "-")
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+        queryset = type(self)._base_manager.all()
+        for attempt in range(3):
+            self.slug = unique_slug(queryset, self.title, self._meta.model_name)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # lost a race for the slug, anything else is re-raised
+                if not queryset.filter(slug=self.slug).exists() or attempt == 2:
+                    self.slug = ""
+                    raise
 
     def excerpt(self):
         return self.description[:100]
@@ -94,6 +124,24 @@ class General(models.Model):
     class Meta:
         abstract = True
         verbose_name_plural = "General"
+        # newest-first listings: one index for ``objects`` and a partial one
+        # matching ``GeneralManager`` so inactive rows never enter the scan
+        indexes = [
+            models.Index(fields=["-created"], name="%(app_label)s_%(class)s_created"),
+            models.Index(
+                fields=["-created"],
+                name="%(app_label)s_%(class)s_active",
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
+
+# partial index matching ``NewsAndEventsManager`` for models with ``is_published``
+published_index = models.Index(
+    fields=["-created"],
+    name="%(app_label)s_%(class)s_published",
+    condition=models.Q(is_published=True, is_active=True),
+)
 
 
 # image models for adding multiple images to a model
@@ -105,15 +153,76 @@ class Image(models.Model):
     image = models.ImageField(upload_to="images/")
     image_name = models.CharField(max_length=255)
     image_caption = models.CharField(max_length=255)
+    # filled in with the derivatives, see ``udrems.core.images``
+    width = models.PositiveIntegerField(null=True, editable=False)
+    height = models.PositiveIntegerField(null=True, editable=False)
 
     def __str__(self):
         return self.image_name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # lets ``udrems.core.signals`` tell a new upload from any other save
+        instance._loaded_image_name = instance.__dict__.get("image")
+        return instance
+
+    @property
+    def image_changed(self) -> bool:
+        loaded = getattr(self, "_loaded_image_name", None)
+        return self._state.adding or str(loaded or "") != self.image.name
+
+    def srcset(self, format: str = "jpeg") -> str:
+        """
+        ``srcset`` attribute value for the derivatives in ``format``.
+
+        Uses prefetched ``derivatives`` when available, see
+        ``GeneralViewSet.get_queryset``.
+        """
+        return ", ".join(
+            f"{derivative.file.url} {derivative.width}w"
+            for derivative in sorted(self.derivatives.all(), key=lambda d: d.width)
+            if derivative.format == format
+        )
+
     class Meta:
         # abstract = True
         verbose_name_plural = "Images"
 
 
+class ImageDerivative(models.Model):
+    """
+    ! Image Derivative Model
+
+    A resized copy of an ``Image`` in one format, generated by
+    ``udrems.core.tasks.generate_image_derivatives``.
+    """
+
+    WEBP = "webp"
+    JPEG = "jpeg"
+    FORMAT = [(WEBP, "WebP"), (JPEG, "JPEG")]
+
+    image = models.ForeignKey(
+        Image, related_name="derivatives", on_delete=models.CASCADE
+    )
+    format = models.CharField(max_length=4, choices=FORMAT)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.ImageField(upload_to="images/derivatives/")
+
+    def __str__(self):
+        return f"{self.image} {self.width}w {self.format}"
+
+    class Meta:
+        verbose_name_plural = "Image Derivatives"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["image", "format", "width"],
+                name="core_imagederivative_unique",
+            )
+        ]
+
+
 class Tags(TimeStamp):
     """
     ! Tags Model
@@ -144,7 +253,7 @@ class Category(TimeStamp):
         verbose_name_plural = "Categories"
 
 
-class News(TimeStamp, General):
+class News(TimeStamp, General, SearchableModel):
     """
     ! News Model
     """
@@ -157,11 +266,12 @@ class News(TimeStamp, General):
     def get_absolute_url(self) -> str:
         return reverse("core:news-detail", kwargs={"pk": self.pk})
 
-    class Meta:
+    class Meta(General.Meta):
         verbose_name_plural = "News"
+        indexes = General.Meta.indexes + [published_index]
 
 
-class Event(TimeStamp, General, NewsAndBlogModelManager):
+class Event(TimeStamp, General, NewsAndBlogModelManager, SearchableModel):
     """
     ! Event Model
     """
@@ -174,11 +284,12 @@ class Event(TimeStamp, General, NewsAndBlogModelManager):
     def get_absolute_url(self) -> str:
         return reverse("core:event-detail", kwargs={"pk": self.pk})
 
-    class Meta:
+    class Meta(General.Meta):
         verbose_name_plural = "Events"
+        indexes = General.Meta.indexes + [published_index]
 
 
-class Article(TimeStamp, General, GeneralModelManager):
+class Article(TimeStamp, General, GeneralModelManager, SearchableModel):
     """
     ! Article Model
     """
@@ -189,7 +300,7 @@ class Article(TimeStamp, General, GeneralModelManager):
     def get_absolute_url(self) -> str:
         return reverse("core:article-detail", kwargs={"pk": self.pk})
 
-    class Meta:
+    class Meta(General.Meta):
         verbose_name_plural = "Articles"
 
 
@@ -204,7 +315,7 @@ class Video(TimeStamp, General):
     def get_absolute_url(self) -> str:
         return reverse("core:video-detail", kwargs={"pk": self.pk})
 
-    class Meta:
+    class Meta(General.Meta):
         verbose_name_plural = "Videos"
 
 
@@ -219,7 +330,7 @@ class Gallery(TimeStamp, General, GeneralModelManager):
     def get_absolute_url(self) -> str:
         return reverse("core:gallery-detail", kwargs={"pk": self.pk})
 
-    class Meta:
+    class Meta(General.Meta):
         verbose_name_plural = "Galleries"
 
 
@@ -234,5 +345,5 @@ class Report(TimeStamp, General, GeneralModelManager):
     def get_absolute_url(self) -> str:
         return reverse("core:report-detail", kwargs={"pk": self.pk})
 
-    class Meta:
+    class Meta(General.Meta):
         verbose_name_plural = "Reports"
@@ -0,0 +1,180 @@
+"""
+Full-text search over ``title`` and ``description`` of searchable content.
+
+PostgreSQL keeps a weighted ``tsvector`` in ``search_vector``, maintained by a
+``BEFORE INSERT OR UPDATE`` trigger (so ``bulk_create`` and ``update()`` are
+covered too) and backed by a GIN index. SQLite, used for local runs and tests,
+gets an external-content FTS5 table per model kept in sync by triggers.
+
+Either way a search is a single indexed query: prefix matching on every term,
+ranked by title hits first.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, QuerySet
+from django.db.models.expressions import RawSQL
+
+TEXT_SEARCH_CONFIG = "english"
+# weights for title and description in the SQLite ``bm25()`` ranking
+BM25_WEIGHTS = (10.0, 1.0)
+
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+PG_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION core_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def get_searchable_models():
+    from udrems.core.models import Article, Event, News
+
+    return [News, Event, Article]
+
+
+def terms(query: str) -> list:
+    return TERM_RE.findall(query.lower())
+
+
+def _fts_table(model) -> str:
+    return f"{model._meta.db_table}_fts"
+
+
+def install(connection, backfill: bool = False) -> None:
+    """
+    Create the triggers and indexes backing search; safe to call repeatedly.
+    """
+    if connection.vendor == "postgresql":
+        _install_postgresql(connection, backfill)
+    elif connection.vendor == "sqlite":
+        _install_sqlite(connection, backfill)
+
+
+def uninstall(connection) -> None:
+    with connection.cursor() as cursor:
+        for model in get_searchable_models():
+            table = model._meta.db_table
+            if connection.vendor == "postgresql":
+                cursor.execute(f"DROP TRIGGER IF EXISTS {table}_search ON {table}")
+                cursor.execute(f"DROP INDEX IF EXISTS {table}_search")
+            elif connection.vendor == "sqlite":
+                for suffix in ("ai", "ad", "au"):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {_fts_table(model)}")
+        if connection.vendor == "postgresql":
+            cursor.execute("DROP FUNCTION IF EXISTS core_search_vector_update()")
+
+
+def _install_postgresql(connection, backfill: bool) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(PG_FUNCTION)
+        for model in get_searchable_models():
+            table = model._meta.db_table
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_search ON {table}")
+            cursor.execute(
+                f"CREATE TRIGGER {table}_search "
+                f"BEFORE INSERT OR UPDATE OF title, description ON {table} "
+                "FOR EACH ROW EXECUTE PROCEDURE core_search_vector_update()"
+            )
+            if backfill:
+                # fires the trigger for every existing row
+                cursor.execute(f"UPDATE {table} SET title = title")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_search "
+                f"ON {table} USING gin (search_vector)"
+            )
+
+
+def _install_sqlite(connection, backfill: bool) -> None:
+    with connection.cursor() as cursor:
+        for model in get_searchable_models():
+            table = model._meta.db_table
+            fts = _fts_table(model)
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"title, description, content='{table}', content_rowid='id', "
+                "tokenize='porter unicode61')"
+            )
+            # Table rebuilds during later SQLite migrations drop these, which
+            # is why ``install`` also runs on ``post_migrate``.
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ai "
+                f"AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, title, description) "
+                "VALUES (new.id, new.title, new.description); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_fts_ad "
+                f"AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, description) "
+                "VALUES ('delete', old.id, old.title, old.description); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_fts_au "
+                f"AFTER UPDATE OF title, description ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, description) "
+                "VALUES ('delete', old.id, old.title, old.description); "
+                f"INSERT INTO {fts}(rowid, title, description) "
+                "VALUES (new.id, new.title, new.description); END"
+            )
+            if backfill:
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def search(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Filter ``queryset`` to rows matching every term of ``query`` as a prefix,
+    annotated with ``rank`` and ordered best match first.
+    """
+    words = terms(query)
+    if not words:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _search_postgresql(queryset, words)
+    if vendor == "sqlite":
+        return _search_sqlite(queryset, words)
+    raise NotImplementedError(f"No search backend for {vendor}")
+
+
+def _search_postgresql(queryset: QuerySet, words: list) -> QuerySet:
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    search_query = SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        config=TEXT_SEARCH_CONFIG,
+        search_type="raw",
+    )
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-created")
+    )
+
+
+def _search_sqlite(queryset: QuerySet, words: list) -> QuerySet:
+    table = queryset.model._meta.db_table
+    fts = _fts_table(queryset.model)
+    match = " ".join(f'"{word}"*' for word in words)
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    # bm25() is lower-is-better, so negate it to match the PostgreSQL ordering
+    rank = RawSQL(
+        f"SELECT -bm25({fts}, {weights}) FROM {fts} "
+        f"WHERE {fts} MATCH %s AND {fts}.rowid = {table}.id",
+        [match],
+        output_field=FloatField(),
+    )
+    return (
+        queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+        )
+        .annotate(rank=rank)
+        .order_by("-rank", "-created")
+    )
@@ -0,0 +1,117 @@
+"""
+Signals for invalidating the ``core`` content cache.
+
+"""
+
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from udrems.core import search
+from udrems.core.cache import bump_generation, forget_pk
+from udrems.core.models import (
+    Article,
+    Category,
+    Event,
+    Gallery,
+    Image,
+    News,
+    Report,
+    Tags,
+    Video,
+)
+from udrems.core.tasks import generate_image_derivatives
+from udrems.users.models import User
+
+CONTENT_MODELS = (News, Event, Article, Video, Gallery, Report)
+
+
+def invalidate_content(sender, instance, **kwargs):
+    """
+    Invalidate everything cached for the content model that changed.
+    """
+    bump_generation(type(instance))
+
+
+def forget_lookups(sender, instance, **kwargs):
+    """
+    Drop the cached slug/uuid lookups of a deleted row.
+    """
+    forget_pk(instance, "slug", "uuid")
+
+
+def invalidate_content_relations(sender, instance, action, reverse, model, **kwargs):
+    """
+    Invalidate cached content when its categories or tags change.
+    """
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # e.g. ``category.news_set.add(...)``: only the content side is cached
+        bump_generation(model)
+    else:
+        bump_generation(type(instance))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tags)
+@receiver(post_delete, sender=Tags)
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+def invalidate_all_content(sender, **kwargs):
+    """
+    Categories, tags and images are nested in every content payload.
+    """
+    for model in CONTENT_MODELS:
+        bump_generation(model)
+
+
+@receiver(post_save, sender=User)
+def invalidate_authored_content(sender, instance, created, update_fields, **kwargs):
+    """
+    Authors are nested in every content payload too. Other user saves, e.g.
+    ``last_login`` on every login, keep the cache.
+    """
+    if update_fields is not None and not set(update_fields) & set(User.PUBLIC_FIELDS):
+        return
+    if not created and instance.public_fields_changed:
+        invalidate_all_content(sender)
+    instance._loaded_public_fields = instance.public_fields
+
+
+@receiver(post_save, sender=Image)
+def queue_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    """
+    Render thumbnails for new uploads once the row is committed.
+    """
+    if update_fields is not None and "image" not in update_fields:
+        return
+    changed = instance.image and instance.image_changed
+    # later saves of this object compare against what is stored now
+    instance._loaded_image_name = instance.image.name
+    if not changed:
+        return
+    image_id = instance.pk
+    transaction.on_commit(lambda: generate_image_derivatives.delay(image_id))
+
+
+for content_model in CONTENT_MODELS:
+    post_save.connect(invalidate_content, sender=content_model)
+    post_delete.connect(invalidate_content, sender=content_model)
+    post_delete.connect(forget_lookups, sender=content_model)
+    for through in (content_model.category.through, content_model.tags.through):
+        m2m_changed.connect(invalidate_content_relations, sender=through)
+
+
+@receiver(post_migrate)
+def reinstall_sqlite_search(sender, using, **kwargs):
+    """
+    SQLite drops a table's triggers whenever a migration rebuilds it.
+    """
+    connection = connections[using]
+    if sender.name != "udrems.core" or connection.vendor != "sqlite":
+        return
+    tables = connection.introspection.table_names()
+    if all(model._meta.db_table in tables for model in search.get_searchable_models()):
+        search.install(connection)
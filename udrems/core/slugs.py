@@ -0,0 +1,28 @@
+"""
+Unique, persisted slugs for ``General`` content.
+
+A slug is derived from the title once, when a row is first saved, and never
+changes afterwards so public URLs stay valid. Clashes get a ``-2``, ``-3``...
+suffix; ``General.save`` retries if a concurrent insert takes the same slug
+between the check and the write.
+"""
+from django.utils.text import slugify
+
+# leaves room for a numeric suffix within ``SlugField(max_length=255)``
+MAX_BASE_LENGTH = 240
+
+
+def base_slug(title: str, fallback: str) -> str:
+    return slugify(title)[:MAX_BASE_LENGTH].strip("-") or fallback
+
+
+def unique_slug(queryset, title: str, fallback: str = "item") -> str:
+    """First free slug for ``title`` among the rows of ``queryset``."""
+    base = base_slug(title, fallback)
+    taken = set(queryset.filter(slug__startswith=base).values_list("slug", flat=True))
+    if base not in taken:
+        return base
+    suffix = 2
+    while f"{base}-{suffix}" in taken:
+        suffix += 1
+    return f"{base}-{suffix}"
@@ -0,0 +1,13 @@
+from config.celery_app import fire_and_forget
+from udrems.core.images import generate_derivatives
+from udrems.core.models import Image
+
+
+@fire_and_forget()
+def generate_image_derivatives(image_id: int):
+    """Render the configured thumbnails of an uploaded ``Image``."""
+    image = Image.objects.filter(pk=image_id).first()
+    if image is None:
+        # deleted before the worker got to it
+        return 0
+    return len(generate_derivatives(image))
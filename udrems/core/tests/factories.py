@@ -0,0 +1,100 @@
+from typing import Any, Sequence
+
+from factory import Faker, SubFactory, post_generation
+from factory.django import DjangoModelFactory, ImageField
+
+from udrems.core.models import (
+    Article,
+    Category,
+    Event,
+    Gallery,
+    Image,
+    News,
+    Report,
+    Tags,
+    Video,
+)
+from udrems.users.tests.factories import UserFactory
+
+
+class ImageFactory(DjangoModelFactory):
+
+    image = ImageField(color="blue")
+    image_name = Faker("file_name", category="image")
+    image_caption = Faker("sentence")
+
+    class Meta:
+        model = Image
+
+
+class CategoryFactory(DjangoModelFactory):
+
+    category = Faker("word")
+
+    class Meta:
+        model = Category
+
+
+class TagsFactory(DjangoModelFactory):
+
+    tag = Faker("word")
+
+    class Meta:
+        model = Tags
+
+
+class GeneralFactory(DjangoModelFactory):
+
+    title = Faker("sentence", nb_words=4)
+    description = Faker("paragraph")
+    author = SubFactory(UserFactory)
+    image = SubFactory(ImageFactory)
+
+    @post_generation
+    def category(self, create: bool, extracted: Sequence[Any], **kwargs):
+        if create and extracted:
+            self.category.add(*extracted)
+
+    @post_generation
+    def tags(self, create: bool, extracted: Sequence[Any], **kwargs):
+        if create and extracted:
+            self.tags.add(*extracted)
+
+    class Meta:
+        abstract = True
+
+
+class NewsFactory(GeneralFactory):
+
+    is_published = True
+
+    class Meta:
+        model = News
+
+
+class EventFactory(GeneralFactory):
+
+    is_published = True
+
+    class Meta:
+        model = Event
+
+
+class ArticleFactory(GeneralFactory):
+    class Meta:
+        model = Article
+
+
+class VideoFactory(GeneralFactory):
+    class Meta:
+        model = Video
+
+
+class GalleryFactory(GeneralFactory):
+    class Meta:
+        model = Gallery
+
+
+class ReportFactory(GeneralFactory):
+    class Meta:
+        model = Report
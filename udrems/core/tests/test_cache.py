@@ -0,0 +1,194 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from udrems.core import cache
+from udrems.core.models import Article, News
+from udrems.core.tests.factories import (
+    CategoryFactory,
+    ImageFactory,
+    NewsFactory,
+    TagsFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def selects(queries) -> list:
+    return [query for query in queries if query["sql"].startswith("SELECT")]
+
+
+class TestGeneration:
+    def test_save_bumps_only_that_model(self):
+        image = ImageFactory()
+        news_generation = cache.get_generation(News)
+        article_generation = cache.get_generation(Article)
+
+        NewsFactory(image=image)
+
+        assert cache.get_generation(News) > news_generation
+        assert cache.get_generation(Article) == article_generation
+
+    def test_delete_bumps(self):
+        news = NewsFactory()
+        generation = cache.get_generation(News)
+
+        news.delete()
+
+        assert cache.get_generation(News) > generation
+
+    @pytest.mark.parametrize("relation", ["category", "tags"])
+    def test_m2m_change_bumps(self, relation: str):
+        news = NewsFactory()
+        related = CategoryFactory() if relation == "category" else TagsFactory()
+        generation = cache.get_generation(News)
+
+        getattr(news, relation).add(related)
+
+        assert cache.get_generation(News) > generation
+
+    def test_reverse_m2m_change_bumps(self):
+        news = NewsFactory()
+        category = CategoryFactory()
+        generation = cache.get_generation(News)
+
+        category.news_set.add(news)
+
+        assert cache.get_generation(News) > generation
+
+    def test_category_change_bumps_all_content(self):
+        category = CategoryFactory()
+        generation = cache.get_generation(Article)
+
+        category.category = "renamed"
+        category.save()
+
+        assert cache.get_generation(Article) > generation
+
+    def test_author_rename_bumps_all_content(self):
+        author = NewsFactory().author
+        author.refresh_from_db()
+        generation = cache.get_generation(Article)
+
+        author.name = "Renamed"
+        author.save()
+
+        assert cache.get_generation(Article) > generation
+
+    def test_other_user_saves_keep_content(self):
+        author = NewsFactory().author
+        author.refresh_from_db()
+        generation = cache.get_generation(News)
+
+        author.save(update_fields=["last_login"])
+        author.is_active = False
+        author.save()
+
+        assert cache.get_generation(News) == generation
+
+    def test_key_changes_with_generation(self):
+        key = cache.content_key(News, "list", "/api/news/")
+
+        cache.bump_generation(News)
+
+        assert cache.content_key(News, "list", "/api/news/") != key
+
+
+class TestGetOrCompute:
+    def test_counts_hits_and_misses(self):
+        key = cache.content_key(News, "detail", 1)
+
+        assert cache.get_or_compute(News, key, lambda: "payload") == "payload"
+        assert cache.get_or_compute(News, key, lambda: "other") == "payload"
+
+        assert cache.stats.as_dict() == {"core.news": {"hit": 1, "miss": 1}}
+
+    def test_single_early_recompute(self, monkeypatch):
+        key = cache.content_key(News, "detail", 1)
+        cache.get_or_compute(News, key, lambda: "old")
+        monkeypatch.setattr(cache, "_should_recompute", lambda delta, expiry: True)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            # a concurrent reader while this refresh holds the lock
+            assert cache.get_or_compute(News, key, lambda: "stampede") == "old"
+            return "new"
+
+        assert cache.get_or_compute(News, key, compute) == "new"
+        assert calls == [1]
+
+    def test_single_compute_after_bump(self):
+        cache.get_or_compute(News, cache.content_key(News, "list", "/"), lambda: "old")
+        cache.bump_generation(News)
+        key = cache.content_key(News, "list", "/")
+        readers = 8
+        barrier = threading.Barrier(readers)
+        calls, values = [], []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "new"
+
+        def read():
+            barrier.wait()
+            values.append(cache.get_or_compute(News, key, compute))
+
+        threads = [threading.Thread(target=read) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [1]
+        assert values == ["new"] * readers
+        assert cache.get_or_compute(News, key, lambda: "other") == "new"
+
+    def test_cold_miss_computes_after_waiting(self, monkeypatch):
+        monkeypatch.setattr(cache, "COLD_WAIT_SECONDS", 0.1)
+        key = cache.content_key(News, "detail", 1)
+        # a worker that died while holding the lock
+        cache.cache.add(f"{key}:lock", 1)
+
+        assert cache.get_or_compute(News, key, lambda: "payload") == "payload"
+
+
+class TestCachedContentViewSet:
+    def test_list_is_served_from_cache(self):
+        client = APIClient()
+        NewsFactory.create_batch(2)
+        client.get(reverse("api:news-list"))
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse("api:news-list"))
+
+        assert len(response.data["results"]) == 2
+        assert selects(context.captured_queries) == []
+
+    def test_write_invalidates_list(self):
+        client = APIClient()
+        NewsFactory()
+        client.get(reverse("api:news-list"))
+
+        NewsFactory()
+        response = client.get(reverse("api:news-list"))
+
+        assert len(response.data["results"]) == 2
+
+    def test_detail_is_served_from_cache(self):
+        client = APIClient()
+        news = NewsFactory()
+        url = reverse("api:news-detail", kwargs={"pk": news.pk})
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+
+        assert response.data["title"] == news.title
+        assert selects(context.captured_queries) == []
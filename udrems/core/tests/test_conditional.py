@@ -0,0 +1,108 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from udrems.core.tests.factories import NewsFactory, TagsFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client() -> APIClient:
+    return APIClient()
+
+
+class TestConditionalContent:
+    def test_detail_sends_validators(self, api_client: APIClient):
+        news = NewsFactory()
+
+        response = api_client.get(reverse("api:news-detail", kwargs={"pk": news.pk}))
+
+        assert response.status_code == 200
+        assert response["ETag"].startswith('"')
+        assert "Last-Modified" in response
+
+    def test_detail_not_modified(
+        self, api_client: APIClient, django_assert_num_queries
+    ):
+        news = NewsFactory()
+        url = reverse("api:news-detail", kwargs={"pk": news.pk})
+        etag = api_client.get(url)["ETag"]
+
+        # validators are served from the content cache
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_if_modified_since(self, api_client: APIClient):
+        news = NewsFactory()
+        url = reverse("api:news-detail", kwargs={"pk": news.pk})
+        last_modified = api_client.get(url)["Last-Modified"]
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 304
+
+    def test_save_changes_etag(self, api_client: APIClient):
+        news = NewsFactory()
+        url = reverse("api:news-detail", kwargs={"pk": news.pk})
+        etag = api_client.get(url)["ETag"]
+
+        news.title = "Updated"
+        news.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_author_rename_changes_etag(self, api_client: APIClient):
+        news = NewsFactory()
+        url = reverse("api:news-detail", kwargs={"pk": news.pk})
+        etag = api_client.get(url)["ETag"]
+
+        news.author.name = "Renamed"
+        news.author.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data["author"]["name"] == "Renamed"
+
+    def test_tag_change_changes_list_etag(self, api_client: APIClient):
+        news = NewsFactory()
+        url = reverse("api:news-list")
+        etag = api_client.get(url)["ETag"]
+
+        news.tags.add(TagsFactory())
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+
+    def test_list_not_modified(self, api_client: APIClient):
+        NewsFactory.create_batch(2)
+        url = reverse("api:news-list")
+        etag = api_client.get(url)["ETag"]
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_delete_changes_list_etag(self, api_client: APIClient):
+        first, _ = NewsFactory.create_batch(2)
+        url = reverse("api:news-list")
+        etag = api_client.get(url)["ETag"]
+
+        first.delete()
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_missing_detail_is_still_404(self, api_client: APIClient):
+        response = api_client.get(reverse("api:news-detail", kwargs={"pk": 0}))
+
+        assert response.status_code == 404
+        assert "ETag" not in response
+
+    def test_malformed_pk_is_404(self, api_client: APIClient):
+        response = api_client.get(reverse("api:news-detail", kwargs={"pk": "abc"}))
+
+        assert response.status_code == 404
+        assert "ETag" not in response
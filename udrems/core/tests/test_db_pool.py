@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from django.db import transaction
+from django.db.utils import ConnectionHandler
+
+from udrems.utils import db_pool
+from udrems.utils.db_pool import ConnectionPool, PoolTimeout, close_pools
+
+
+class Opener:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        connection = sqlite3.connect(":memory:", check_same_thread=False)
+        self.opened.append(connection)
+        return connection
+
+
+def make_pool(check=lambda connection: None, reset=lambda connection: True, **options):
+    return ConnectionPool("test", Opener(), check, reset, options)
+
+
+class TestConnectionPool:
+    def test_reuses_connections(self):
+        pool = make_pool()
+
+        first = pool.borrow()
+        pool.release(first)
+
+        assert pool.borrow() is first
+        assert len(pool.connect.opened) == 1
+
+    def test_size_stays_bounded(self):
+        pool = make_pool(MAX_SIZE=3)
+        peak = []
+
+        def work():
+            connection = pool.borrow()
+            peak.append(pool.size)
+            time.sleep(0.01)
+            pool.release(connection)
+
+        threads = [threading.Thread(target=work) for _ in range(30)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(peak) == 30
+        assert max(peak) <= 3
+        assert len(pool.connect.opened) == 3
+        assert pool.idle == 3 and pool.in_use == 0
+
+    def test_timeout(self):
+        pool = make_pool(MAX_SIZE=1, TIMEOUT=0.01)
+        pool.borrow()
+        before = db_pool.timeouts.value(alias="test")
+
+        with pytest.raises(PoolTimeout):
+            pool.borrow()
+
+        assert db_pool.timeouts.value(alias="test") == before + 1
+
+    def test_waiters_get_released_connections(self):
+        pool = make_pool(MAX_SIZE=1, TIMEOUT=5)
+        connection = pool.borrow()
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.borrow()))
+        waiter.start()
+        while not pool.waiting:
+            time.sleep(0.001)
+
+        assert db_pool.waiting_gauge.value(alias="test") == 1
+        pool.release(connection)
+        waiter.join()
+
+        assert borrowed == [connection]
+        assert db_pool.waiting_gauge.value(alias="test") == 0
+
+    def test_broken_connections_are_replaced(self):
+        def check(connection):
+            connection.execute("SELECT 1")
+
+        pool = make_pool(check=check, CHECK_AFTER=0)
+        first = pool.borrow()
+        pool.release(first)
+        first.close()
+
+        second = pool.borrow()
+
+        assert second is not first
+        second.execute("SELECT 1")
+        assert pool.size == 1
+
+    def test_check_only_after_idle_time(self):
+        checked = []
+        pool = make_pool(check=checked.append, CHECK_AFTER=60)
+
+        pool.release(pool.borrow())
+        pool.borrow()
+
+        assert checked == []
+
+    def test_lifetime(self):
+        pool = make_pool(MAX_LIFETIME=0)
+        first = pool.borrow()
+        pool.release(first)
+
+        assert pool.borrow() is not first
+        assert pool.size == 1
+
+    def test_unusable_connections_are_closed(self):
+        pool = make_pool(reset=lambda connection: False)
+        connection = pool.borrow()
+
+        pool.release(connection)
+
+        assert pool.size == 0
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+    def test_fill(self):
+        pool = make_pool(MIN_SIZE=2)
+
+        pool.fill()
+
+        assert pool.idle == 2
+
+    def test_in_use_gauge(self):
+        pool = make_pool()
+        connection = pool.borrow()
+
+        assert db_pool.connections_gauge.value(alias="test", state="in_use") == 1
+
+        pool.release(connection)
+
+        assert db_pool.connections_gauge.value(alias="test", state="in_use") == 0
+        assert db_pool.connections_gauge.value(alias="test", state="idle") == 1
+
+    def test_bad_sizes(self):
+        with pytest.raises(ValueError):
+            make_pool(MIN_SIZE=3, MAX_SIZE=2)
+
+
+@pytest.mark.django_db
+class TestPooledBackend:
+    @pytest.fixture
+    def handler(self, tmp_path):
+        handler = ConnectionHandler(
+            {
+                "default": {"ENGINE": "django.db.backends.sqlite3"},
+                "pooled": {
+                    "ENGINE": "udrems.utils.db_pool.sqlite3",
+                    "NAME": str(tmp_path / "pooled.sqlite3"),
+                    "POOL": {"MAX_SIZE": 2, "TIMEOUT": 5},
+                },
+            }
+        )
+        yield handler
+        handler.close_all()
+        close_pools()
+
+    def query(self, handler):
+        with handler["pooled"].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            return cursor.fetchone()[0]
+
+    def test_close_returns_the_connection(self, handler):
+        wrapper = handler["pooled"]
+        self.query(handler)
+        raw = wrapper.connection
+
+        wrapper.close()
+        self.query(handler)
+
+        assert wrapper.connection is raw
+        assert db_pool.get_pool(wrapper).size == 1
+
+    def test_threads_share_the_pool(self, handler):
+        results = []
+
+        def request():
+            # what a request does with CONN_MAX_AGE = 0
+            results.append(self.query(handler))
+            time.sleep(0.01)
+            handler["pooled"].close()
+
+        threads = [threading.Thread(target=request) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [1] * 20
+        assert db_pool.get_pool(handler["pooled"]).size <= 2
+
+    def test_closed_in_a_transaction_is_discarded(self, handler, monkeypatch):
+        monkeypatch.setattr(transaction, "get_connection", handler.__getitem__)
+        wrapper = handler["pooled"]
+        with transaction.atomic(using="pooled"):
+            self.query(handler)
+            wrapper.close()
+            assert wrapper.closed_in_transaction
+
+        assert db_pool.get_pool(wrapper).size == 0
+
+    def test_new_pool_after_fork(self, handler, monkeypatch):
+        wrapper = handler["pooled"]
+        pool = db_pool.get_pool(wrapper)
+
+        monkeypatch.setattr(db_pool.os, "getpid", lambda: pool.pid + 1)
+
+        assert db_pool.get_pool(wrapper) is not pool
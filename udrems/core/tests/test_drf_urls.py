@@ -0,0 +1,28 @@
+import pytest
+from django.urls import resolve, reverse
+
+from udrems.core.tests.factories import NewsFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "basename, prefix",
+    [
+        ("news", "news"),
+        ("event", "events"),
+        ("article", "articles"),
+        ("video", "videos"),
+        ("gallery", "galleries"),
+        ("report", "reports"),
+    ],
+)
+def test_content_list(basename: str, prefix: str):
+    assert reverse(f"api:{basename}-list") == f"/api/{prefix}/"
+    assert resolve(f"/api/{prefix}/").view_name == f"api:{basename}-list"
+
+
+def test_news_detail():
+    news = NewsFactory()
+    assert reverse("api:news-detail", kwargs={"pk": news.pk}) == f"/api/news/{news.pk}/"
+    assert resolve(f"/api/news/{news.pk}/").view_name == "api:news-detail"
@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from udrems.core.tests.factories import (
+    ArticleFactory,
+    CategoryFactory,
+    EventFactory,
+    NewsFactory,
+    TagsFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client() -> APIClient:
+    return APIClient()
+
+
+class TestGeneralViewSet:
+    def test_list_is_paginated_by_cursor(self, api_client: APIClient):
+        NewsFactory.create_batch(3)
+
+        response = api_client.get(reverse("api:news-list"), {"page_size": 2})
+
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 2
+        assert "cursor=" in response.data["next"]
+        assert "count" not in response.data
+
+    def test_list_is_newest_first(self, api_client: APIClient):
+        older, newer = ArticleFactory(), ArticleFactory()
+
+        response = api_client.get(reverse("api:article-list"))
+
+        uuids = [item["uuid"] for item in response.data["results"]]
+        assert uuids == [str(newer.uuid), str(older.uuid)]
+
+    def test_list_query_count_is_constant(
+        self, api_client: APIClient, django_assert_num_queries
+    ):
+        categories = CategoryFactory.create_batch(2)
+        tags = TagsFactory.create_batch(3)
+        NewsFactory.create_batch(10, category=categories, tags=tags)
+
+        # rows joined with author/image, then one prefetch each for category,
+        # tags and image derivatives, and the aggregate behind the (not yet
+        # cached) ETag; reads run outside a transaction
+        with django_assert_num_queries(5):
+            response = api_client.get(reverse("api:news-list"))
+
+        assert len(response.data["results"]) == 10
+        assert len(response.data["results"][0]["tags"]) == 3
+
+    def test_retrieve(self, api_client: APIClient):
+        news = NewsFactory(title="Open house on Friday")
+
+        response = api_client.get(reverse("api:news-detail", kwargs={"pk": news.pk}))
+
+        assert response.status_code == 200
+        assert response.data["title"] == "Open house on Friday"
+        assert response.data["slug"] == "open-house-on-friday"
+        assert response.data["author"]["username"] == news.author.username
+
+    def test_unpublished_are_hidden(self, api_client: APIClient):
+        EventFactory(is_published=False)
+
+        response = api_client.get(reverse("api:event-list"))
+
+        assert response.data["results"] == []
+
+    def test_is_read_only(self, api_client: APIClient):
+        response = api_client.post(reverse("api:news-list"), {"title": "x"})
+
+        assert response.status_code == 405
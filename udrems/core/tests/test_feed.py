@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from udrems.core import feed
+from udrems.core.tests.factories import (
+    ArticleFactory,
+    EventFactory,
+    GalleryFactory,
+    ImageFactory,
+    NewsFactory,
+    ReportFactory,
+    VideoFactory,
+)
+from udrems.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+FACTORIES = [
+    NewsFactory,
+    EventFactory,
+    ArticleFactory,
+    VideoFactory,
+    GalleryFactory,
+    ReportFactory,
+]
+
+
+def create_at(factory, created, **kwargs):
+    obj = factory(**kwargs)
+    type(obj).objects.filter(pk=obj.pk).update(created=created)
+    return obj
+
+
+@pytest.fixture
+def content():
+    """Three rows of every kind, with rows of different kinds sharing ``created``."""
+    author, image = UserFactory(), ImageFactory()
+    now = timezone.now()
+    rows = []
+    for step in range(3):
+        for index, factory in enumerate(FACTORIES):
+            created = now - timedelta(minutes=step * 10 + index % 2)
+            rows.append(create_at(factory, created, author=author, image=image))
+    return rows
+
+
+def walk(page_size, **kwargs):
+    seen, cursor = [], None
+    while True:
+        page = feed.get_page(cursor, page_size, **kwargs)
+        seen.extend(page.items)
+        if page.next_cursor is None:
+            return seen
+        cursor = page.next_cursor
+
+
+class TestGetPage:
+    def test_newest_first_across_kinds(self, content):
+        page = feed.get_page(limit=100)
+
+        keys = [(obj.created, obj.pk, obj._meta.model_name) for obj in page.items]
+        assert keys == sorted(keys, reverse=True)
+        assert len(page.items) == len(content)
+        assert page.next_cursor is None
+
+    @pytest.mark.parametrize("page_size", [1, 4, 7])
+    def test_pages_cover_every_row_once(self, content, page_size):
+        items = walk(page_size)
+
+        assert [(type(obj), obj.pk) for obj in items] == [
+            (type(obj), obj.pk) for obj in feed.get_page(limit=100).items
+        ]
+
+    def test_kinds(self, content):
+        items = walk(2, kinds=["news", "report"])
+
+        assert {obj._meta.model_name for obj in items} == {"news", "report"}
+        assert len(items) == 6
+
+    def test_hidden_rows_are_left_out(self):
+        NewsFactory(is_published=False)
+        ArticleFactory(is_active=False)
+        visible = EventFactory()
+
+        assert feed.get_page().items == [visible]
+
+    def test_one_union_query_per_page(self, content):
+        with CaptureQueriesContext(connection) as queries:
+            feed.get_page(limit=5)
+
+        selects = [query["sql"] for query in queries]
+        assert sum("UNION ALL" in sql for sql in selects) == 1
+
+    def test_invalid_cursor(self):
+        with pytest.raises(feed.InvalidCursor):
+            feed.get_page("not-a-cursor")
+
+
+class TestFeedView:
+    def test_list(self, content):
+        client = APIClient()
+
+        response = client.get(reverse("api:feed"), {"page_size": 4})
+
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 4
+        assert response.data["results"][0]["type"] in feed.KINDS
+        response = client.get(response.data["next"])
+        assert len(response.data["results"]) == 4
+
+    def test_unknown_type(self):
+        response = APIClient().get(reverse("api:feed"), {"type": "news,blog"})
+
+        assert response.status_code == 400
+
+    def test_invalid_cursor(self):
+        response = APIClient().get(reverse("api:feed"), {"cursor": "bogus"})
+
+        assert response.status_code == 404
@@ -0,0 +1,139 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from PIL import Image as PILImage
+
+from udrems.core import images
+from udrems.core.models import Image, ImageDerivative
+from udrems.core.tasks import generate_image_derivatives
+from udrems.core.tests.factories import ImageFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.CORE_IMAGE_DERIVATIVE_WIDTHS = [100, 200, 2000]
+    settings.CORE_IMAGE_DERIVATIVE_FORMATS = ["jpeg"]
+
+
+def png(width: int, height: int) -> ContentFile:
+    buffer = BytesIO()
+    PILImage.new("RGBA", (width, height), (0, 128, 255, 128)).save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name="upload.png")
+
+
+class TestGenerateDerivatives:
+    def test_renders_configured_widths_without_upscaling(self):
+        image = ImageFactory(image=png(400, 300))
+
+        generate_image_derivatives(image.pk)
+
+        image.refresh_from_db()
+        assert (image.width, image.height) == (400, 300)
+        derivatives = image.derivatives.order_by("width")
+        assert [(d.width, d.height, d.format) for d in derivatives] == [
+            (100, 75, "jpeg"),
+            (200, 150, "jpeg"),
+        ]
+        with derivatives[0].file.open("rb") as file:
+            stored = PILImage.open(file)
+            assert (stored.format, stored.size) == ("JPEG", (100, 75))
+
+    def test_small_original_keeps_its_own_width(self):
+        image = ImageFactory(image=png(50, 20))
+
+        generate_image_derivatives(image.pk)
+
+        assert [d.width for d in image.derivatives.all()] == [50]
+
+    def test_regenerating_replaces_rows_and_files(self):
+        image = ImageFactory(image=png(400, 300))
+        generate_image_derivatives(image.pk)
+        old_files = [d.file for d in image.derivatives.all()]
+
+        generate_image_derivatives(image.pk)
+
+        assert image.derivatives.count() == 2
+        assert not any(file.storage.exists(file.name) for file in old_files)
+
+    def test_skips_formats_pillow_cannot_write(self, settings, monkeypatch):
+        settings.CORE_IMAGE_DERIVATIVE_FORMATS = ["webp", "jpeg"]
+        monkeypatch.setattr(images.features, "check", lambda feature: False)
+
+        assert images.get_formats() == ["jpeg"]
+
+    def test_missing_image(self):
+        assert generate_image_derivatives(0) == 0
+
+    def test_srcset(self):
+        image = ImageFactory(image=png(400, 300))
+        generate_image_derivatives(image.pk)
+
+        image = Image.objects.prefetch_related("derivatives").get(pk=image.pk)
+
+        urls = [d.file.url for d in image.derivatives.order_by("width")]
+        assert image.srcset() == f"{urls[0]} 100w, {urls[1]} 200w"
+        assert image.srcset(ImageDerivative.WEBP) == ""
+
+
+class TestQueueing:
+    def test_upload_queues_task_on_commit(
+        self, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        queued = []
+        monkeypatch.setattr(generate_image_derivatives, "delay", queued.append)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            image = ImageFactory(image=png(400, 300))
+
+        assert queued == [image.pk]
+
+    def test_other_saves_do_not_queue(
+        self, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        image = ImageFactory(image=png(400, 300))
+        image = Image.objects.get(pk=image.pk)
+        queued = []
+        monkeypatch.setattr(generate_image_derivatives, "delay", queued.append)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            image.image_caption = "New caption"
+            image.save()
+            image.save(update_fields=["width", "height"])
+
+        assert queued == []
+
+    def test_saving_a_created_image_again_does_not_queue(
+        self, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        queued = []
+        monkeypatch.setattr(generate_image_derivatives, "delay", queued.append)
+        with django_capture_on_commit_callbacks(execute=True):
+            image = Image.objects.create(
+                image=png(400, 300), image_name="Hall", image_caption="Hall"
+            )
+        queued.clear()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            image.image_caption = "New caption"
+            image.save()
+
+        assert queued == []
+
+    def test_replacing_the_file_of_a_created_image_queues(
+        self, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        image = Image.objects.create(
+            image=png(400, 300), image_name="Hall", image_caption="Hall"
+        )
+        queued = []
+        monkeypatch.setattr(generate_image_derivatives, "delay", queued.append)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            image.image = png(200, 100)
+            image.save()
+
+        assert queued == [image.pk]
@@ -0,0 +1,180 @@
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import OperationalError, connections, transaction
+from django.http import HttpResponse
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from udrems.core.models import News, Tags
+from udrems.core.tests.factories import TagsFactory
+from udrems.users.models import User
+from udrems.utils.replicas import (
+    COOKIE_NAME,
+    Pinning,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+    monitor,
+    primary,
+    state,
+)
+
+# outside the TestCase transaction, which would pin every read
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+
+
+@pytest.fixture(autouse=True)
+def replica(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ["replica"]
+    lags = {"replica": 0.0}
+    monkeypatch.setattr(monitor, "measure_lag", lambda alias: lags[alias])
+    monitor.reset()
+    yield lags
+    monitor.reset()
+
+
+@pytest.fixture
+def pinning():
+    token = state.set(Pinning())
+    yield state.get()
+    state.reset(token)
+
+
+router = ReplicaRouter()
+
+
+class TestReplicaRouter:
+    def test_reads_go_to_the_replica(self):
+        assert router.db_for_read(News) == "replica"
+        assert router.db_for_read(User) == "replica"
+
+    def test_other_apps_stay_on_default(self):
+        assert router.db_for_read(Token) is None
+
+    def test_no_replicas(self, settings):
+        settings.DATABASE_REPLICAS = []
+
+        assert router.db_for_read(News) is None
+
+    def test_transactions_pin(self):
+        with transaction.atomic():
+            assert router.db_for_read(News) == "default"
+
+    def test_writes_pin_the_rest_of_the_request(self, pinning: Pinning):
+        assert router.db_for_read(News) == "replica"
+        assert router.db_for_write(News) == "default"
+        assert router.db_for_read(News) == "default"
+
+    def test_primary(self):
+        with primary():
+            assert router.db_for_read(News) == "default"
+        assert router.db_for_read(News) == "replica"
+
+    def test_lagging_replica_leaves_the_rotation(self, settings, replica):
+        replica["replica"] = settings.REPLICA_MAX_LAG_SECONDS + 1
+
+        assert router.db_for_read(News) == "default"
+
+    def test_replica_rejoins_after_the_next_check(self, settings, replica):
+        settings.REPLICA_CHECK_INTERVAL = 0
+        replica["replica"] = settings.REPLICA_MAX_LAG_SECONDS + 1
+        assert router.db_for_read(News) == "default"
+
+        replica["replica"] = 0.0
+        assert router.db_for_read(News) == "replica"
+
+    def test_unreachable_replica_leaves_the_rotation(self, monkeypatch):
+        def unreachable(alias):
+            raise OperationalError("connection refused")
+
+        monkeypatch.setattr(monitor, "measure_lag", unreachable)
+
+        assert router.db_for_read(News) == "default"
+
+    def test_migrations_skip_replicas(self):
+        assert router.allow_migrate("replica", "core") is False
+        assert router.allow_migrate("default", "core") is None
+
+
+class TestReplicaPinningMiddleware:
+    def middleware(self, view):
+        def get_response(request):
+            view(request)
+            return HttpResponse()
+
+        return ReplicaPinningMiddleware(get_response)
+
+    def test_write_sets_a_cookie(self, rf):
+        response = self.middleware(lambda request: TagsFactory())(rf.post("/"))
+
+        assert response.cookies[COOKIE_NAME]["max-age"] == 5
+
+    def test_cookie_pins_the_next_requests(self, rf):
+        response = self.middleware(lambda request: TagsFactory())(rf.post("/"))
+        request = rf.get("/")
+        request.COOKIES[COOKIE_NAME] = response.cookies[COOKIE_NAME].value
+        routed = []
+
+        self.middleware(lambda request: routed.append(router.db_for_read(News)))(
+            request
+        )
+
+        assert routed == ["default"]
+
+    def test_forged_cookie(self, rf):
+        request = rf.get("/")
+        request.COOKIES[COOKIE_NAME] = "9999999999.0"
+        routed = []
+
+        self.middleware(lambda request: routed.append(router.db_for_read(News)))(
+            request
+        )
+
+        assert routed == ["replica"]
+
+    def test_user_pins_without_cookies(self, rf, user: User):
+        def write(request):
+            request.user = user
+            TagsFactory()
+
+        self.middleware(write)(rf.post("/"))
+        routed = []
+
+        def read(request):
+            routed.append(router.db_for_read(News))
+            # authenticated later, e.g. by a DRF token
+            request.user = user
+            routed.append(router.db_for_read(News))
+
+        self.middleware(read)(rf.get("/"))
+
+        assert routed == ["replica", "default"]
+
+    def test_reads_do_not_pin(self, rf):
+        response = self.middleware(lambda request: list(News.objects.all()))(
+            rf.get("/")
+        )
+
+        assert COOKIE_NAME not in response.cookies
+
+    def test_async_write_sets_a_cookie(self, rf):
+        @sync_to_async
+        def view(request):
+            TagsFactory()
+            return HttpResponse()
+
+        response = async_to_sync(ReplicaPinningMiddleware(view))(rf.post("/"))
+
+        assert response.cookies[COOKIE_NAME]["max-age"] == 5
+
+
+def test_reads_run_on_the_replica_connection():
+    TagsFactory()
+
+    with CaptureQueriesContext(connections["replica"]) as queries:
+        assert Tags.objects.count() == 1
+    assert len(queries) == 1
+
+    with CaptureQueriesContext(connections["replica"]) as queries:
+        with primary():
+            assert Tags.objects.count() == 1
+    assert len(queries) == 0
@@ -0,0 +1,90 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from udrems.core import search
+from udrems.core.models import Article, News
+from udrems.core.tests.factories import ArticleFactory, NewsFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def titles(queryset) -> list:
+    return [item.title for item in queryset]
+
+
+class TestSearch:
+    def test_prefix_match_on_every_term(self):
+        NewsFactory(title="Apartment viewing schedule", description="")
+        NewsFactory(title="Apartment prices", description="")
+
+        results = search.search(News.objects.all(), "apart sched")
+
+        assert titles(results) == ["Apartment viewing schedule"]
+
+    def test_title_ranks_above_description(self):
+        NewsFactory(title="Quarterly report", description="Mentions a garden")
+        NewsFactory(title="Garden party", description="Bring snacks")
+
+        results = search.search(News.objects.all(), "garden")
+
+        assert titles(results) == ["Garden party", "Quarterly report"]
+
+    def test_tracks_updates_and_deletes(self):
+        news = NewsFactory(title="Old headline", description="")
+        news.title = "Fresh headline"
+        news.save()
+        deleted = NewsFactory(title="Fresh but gone", description="")
+        deleted.delete()
+
+        assert titles(search.search(News.objects.all(), "old")) == []
+        assert titles(search.search(News.objects.all(), "fresh")) == ["Fresh headline"]
+
+    def test_covers_bulk_create(self):
+        news = NewsFactory.build(title="Bulk loaded", description="")
+        news.author.save()
+        news.image.save()
+        News.objects.bulk_create([news])
+
+        assert titles(search.search(News.objects.all(), "bulk")) == ["Bulk loaded"]
+
+    def test_respects_queryset_filters(self):
+        ArticleFactory(title="Visible lease guide", description="")
+        ArticleFactory(title="Hidden lease guide", description="", is_active=False)
+
+        results = search.search(Article.manager.all(), "lease")
+
+        assert titles(results) == ["Visible lease guide"]
+
+    def test_ignores_query_syntax(self):
+        NewsFactory(title="Roof repairs", description="")
+
+        assert titles(search.search(News.objects.all(), 'roof" *(:')) == [
+            "Roof repairs"
+        ]
+        assert titles(search.search(News.objects.all(), "  ")) == []
+
+
+class TestSearchViewSet:
+    def test_search(self):
+        NewsFactory(title="Pool maintenance", description="")
+        NewsFactory(title="Parking rules", description="")
+
+        response = APIClient().get(reverse("api:news-search"), {"q": "poo"})
+
+        assert response.status_code == 200
+        assert [item["title"] for item in response.data] == ["Pool maintenance"]
+
+    def test_search_requires_query(self):
+        response = APIClient().get(reverse("api:news-search"))
+
+        assert response.status_code == 400
+
+    def test_search_limit(self):
+        NewsFactory.create_batch(3, title="Lobby notice", description="")
+
+        response = APIClient().get(
+            reverse("api:news-search"), {"q": "lobby", "limit": 2}
+        )
+
+        assert len(response.data) == 2
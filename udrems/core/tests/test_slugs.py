@@ -0,0 +1,111 @@
+import uuid
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from udrems.core import cache, models
+from udrems.core.models import Article, News
+from udrems.core.slugs import unique_slug
+from udrems.core.tests.factories import ArticleFactory, EventFactory, NewsFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSlugs:
+    def test_generated_from_title(self):
+        assert NewsFactory(title="Rent Review: 2022!").slug == "rent-review-2022"
+
+    def test_collisions_get_a_suffix(self):
+        slugs = [NewsFactory(title="Open house").slug for _ in range(3)]
+
+        assert slugs == ["open-house", "open-house-2", "open-house-3"]
+
+    def test_unique_per_model(self):
+        assert NewsFactory(title="Notice").slug == ArticleFactory(title="Notice").slug
+
+    def test_fallback_for_titles_without_ascii(self):
+        assert NewsFactory(title="???").slug == "news"
+
+    def test_kept_when_the_title_changes(self):
+        news = NewsFactory(title="Draft")
+        news.title = "Final"
+        news.save()
+
+        news.refresh_from_db()
+        assert news.slug == "draft"
+
+    def test_lost_race_retries(self, monkeypatch):
+        NewsFactory(title="Open house")
+        # the first check misses the row above, as a concurrent insert would
+        candidates = iter(["open-house", "open-house-2"])
+        monkeypatch.setattr(models, "unique_slug", lambda *args: next(candidates))
+
+        assert NewsFactory(title="Open house").slug == "open-house-2"
+
+    def test_unique_slug_ignores_unrelated_prefixes(self):
+        NewsFactory(title="Open house party")
+
+        assert unique_slug(News.objects.all(), "Open house") == "open-house"
+
+
+class TestLookupRoutes:
+    def test_by_slug(self):
+        news = NewsFactory(title="Open house")
+
+        response = APIClient().get(
+            reverse("api:news-by-slug", kwargs={"slug": "open-house"})
+        )
+
+        assert response.status_code == 200
+        assert response.data["uuid"] == str(news.uuid)
+
+    def test_by_uuid(self):
+        article = ArticleFactory()
+
+        response = APIClient().get(
+            reverse("api:article-by-uuid", kwargs={"uuid": str(article.uuid)})
+        )
+
+        assert response.status_code == 200
+        assert response.data["slug"] == article.slug
+
+    @pytest.mark.parametrize(
+        "route, kwargs",
+        [
+            ("api:news-by-slug", {"slug": "missing"}),
+            ("api:news-by-uuid", {"uuid": str(uuid.uuid4())}),
+            ("api:news-by-uuid", {"uuid": "0" * 35}),
+        ],
+    )
+    def test_missing(self, route, kwargs):
+        assert APIClient().get(reverse(route, kwargs=kwargs)).status_code == 404
+
+    def test_hidden_rows(self):
+        event = EventFactory(is_published=False)
+
+        response = APIClient().get(
+            reverse("api:event-by-slug", kwargs={"slug": event.slug})
+        )
+
+        assert response.status_code == 404
+
+
+class TestLookupCache:
+    def test_cached(self, django_assert_num_queries):
+        article = ArticleFactory()
+        assert cache.get_pk(Article, "slug", article.slug) == article.pk
+
+        with django_assert_num_queries(0):
+            assert cache.get_pk(Article, "slug", article.slug) == article.pk
+
+    def test_forgotten_on_delete(self):
+        old = ArticleFactory(title="Notice")
+        ArticleFactory()  # keeps the next id from reusing the deleted one
+        old_pk = cache.get_pk(Article, "slug", "notice")
+        old.delete()
+
+        new = ArticleFactory(title="Notice")
+
+        assert new.slug == "notice" and new.pk != old_pk
+        assert cache.get_pk(Article, "slug", "notice") == new.pk
@@ -0,0 +1,140 @@
+import gzip
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from compressor import cache as compressor_cache
+from compressor import storage as compressor_storage
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils.functional import empty
+
+from udrems.utils.static import WhiteNoiseMiddleware, is_bundle
+
+STYLES = "".join(f".rule-{index} {{ margin: {index}px; }}\n" for index in range(200))
+
+
+@pytest.fixture
+def built(settings, tmp_path):
+    """``build_static`` run with the production static settings."""
+    sources = tmp_path / "src"
+    (sources / "css").mkdir(parents=True)
+    (sources / "js").mkdir()
+    # what npm run build leaves for the templates
+    (sources / "css" / "project.css").write_text(STYLES)
+    (sources / "js" / "vendors.js").write_text("var vendors = 1;\n" * 100)
+    (sources / "js" / "project.js").write_text("var project = 1;\n" * 100)
+
+    root = str(tmp_path / "staticfiles")
+    settings.STATICFILES_DIRS = [str(sources), *settings.STATICFILES_DIRS]
+    settings.STATIC_ROOT = root
+    settings.STATICFILES_STORAGE = (
+        "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    )
+    settings.COMPRESS_ROOT = root
+    settings.COMPRESS_URL = settings.STATIC_URL
+    settings.COMPRESS_ENABLED = True
+    settings.COMPRESS_OFFLINE = True
+    settings.COMPRESS_STORAGE = "udrems.utils.static.PrecompressedCompressorFileStorage"
+    compressor_storage.default_storage._wrapped = empty
+    compressor_cache._offline_manifest = None
+
+    call_command("build_static", verbosity=0)
+    yield tmp_path / "staticfiles"
+
+    compressor_storage.default_storage._wrapped = empty
+    compressor_cache._offline_manifest = None
+    # compress rewrites the blocks of the templates it parsed, including the
+    # cached ones later tests render
+    for engine in engines.all():
+        for loader in engine.engine.template_loaders:
+            loader.reset()
+
+
+def bundles(root):
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in (root / "CACHE").rglob("*")
+        if is_bundle(path.relative_to(root).as_posix())
+    )
+
+
+def serve(url, encoding):
+    middleware = WhiteNoiseMiddleware(lambda request: HttpResponse(status=404))
+    return middleware(RequestFactory().get(url, HTTP_ACCEPT_ENCODING=encoding))
+
+
+class TestBuildStatic:
+    def test_builds_bundles_with_variants(self, built):
+        names = bundles(built)
+
+        assert [name.split("/")[1] for name in names] == ["css", "js", "js"]
+        for name in names:
+            assert (built / f"{name}.gz").exists()
+            assert (
+                gzip.decompress((built / f"{name}.gz").read_bytes())
+                == (built / name).read_bytes()
+            )
+        assert (built / "staticfiles.json").exists()
+        assert (built / "CACHE" / "manifest.json").exists()
+
+    def test_bundles_are_minified(self, built):
+        css = next(name for name in bundles(built) if name.endswith(".css"))
+
+        assert len((built / css).read_text()) < len(STYLES)
+
+    @pytest.mark.django_db
+    def test_pages_link_the_bundles(self, built, client):
+        response = client.get(reverse("home"))
+
+        for name in bundles(built):
+            assert f"/static/{name}".encode() in response.content
+
+    def test_bundles_are_served_precompressed_forever(self, built):
+        name = bundles(built)[0]
+
+        response = serve(f"/static/{name}", "gzip, deflate")
+
+        assert response.status_code == 200
+        assert response["Content-Encoding"] == "gzip"
+        assert response["Cache-Control"] == "max-age=315360000, public, immutable"
+
+    def test_collected_files_are_served_forever(self, built):
+        paths = json.loads((built / "staticfiles.json").read_text())["paths"]
+
+        response = serve("/static/css/project.css", "")
+        hashed = serve(f"/static/{paths['css/project.css']}", "")
+
+        assert "immutable" not in response["Cache-Control"]
+        assert "immutable" in hashed["Cache-Control"]
+
+    def test_refuses_online_compression(self, settings):
+        settings.COMPRESS_ENABLED = True
+        settings.COMPRESS_OFFLINE = False
+
+        with pytest.raises(CommandError, match="COMPRESS_OFFLINE"):
+            call_command("build_static", verbosity=0)
+
+
+def test_is_bundle():
+    assert is_bundle("CACHE/css/output.1a2b3c4d5e6f.css")
+    assert not is_bundle("CACHE/css/output.css")
+    assert not is_bundle("css/project.1a2b3c4d5e6f.css")
+
+
+def test_awaits_async_requests(rf):
+    async def view(request):
+        return HttpResponse("async")
+
+    middleware = WhiteNoiseMiddleware(view)
+
+    assert async_to_sync(middleware)(rf.get("/")).content == b"async"
+
+
+def test_sync_requests(rf):
+    middleware = WhiteNoiseMiddleware(lambda request: HttpResponse("sync"))
+
+    assert middleware(rf.get("/")).content == b"sync"
@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from udrems.core.models import Tags
+from udrems.core.tests.factories import NewsFactory
+from udrems.users.models import User
+from udrems.utils.transactions import AtomicWritesMixin, read_only, transactional
+
+pytestmark = pytest.mark.django_db
+
+
+def savepoints(queries) -> int:
+    # the test transaction turns the request's BEGIN into a SAVEPOINT
+    return sum(query["sql"].startswith("SAVEPOINT") for query in queries)
+
+
+@pytest.fixture
+def api_client(user: User) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class TestDeclarations:
+    def test_read_only(self, settings):
+        def view(request):
+            pass
+
+        assert read_only(view) is view
+        assert view._non_atomic_requests == set(settings.DATABASES)
+
+    def test_transactional(self, rf):
+        def view(request):
+            return Tags.objects.count()
+
+        view = transactional(view)
+
+        with CaptureQueriesContext(connection) as queries:
+            view(rf.get("/"))
+
+        assert view._non_atomic_requests
+        assert savepoints(queries) == 1
+
+
+class TestViews:
+    def test_pages_skip_the_transaction(self, client, settings):
+        settings.COMPRESS_ENABLED = False
+
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(reverse("home")).status_code == 200
+
+        assert savepoints(queries) == 0
+
+    def test_api_reads_skip_the_transaction(self, api_client: APIClient):
+        NewsFactory()
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(reverse("api:news-list"))
+            api_client.get(reverse("api:user-me"))
+
+        assert savepoints(queries) == 0
+
+    def test_api_writes_are_atomic(self, api_client: APIClient, user: User):
+        url = reverse("api:user-detail", kwargs={"username": user.username})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.patch(url, {"name": "Renamed"}, format="json")
+
+        assert response.status_code == 200
+        assert savepoints(queries) == 1
+
+    def test_undeclared_views_keep_atomic_requests(self, client, user: User):
+        client.force_login(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            client.post(reverse("users:update"), {"name": "Renamed"})
+
+        assert savepoints(queries) == 1
+
+
+class TagView(AtomicWritesMixin, APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        Tags.objects.create(tag="rolled back")
+        raise ValidationError("nope")
+
+
+def test_error_responses_roll_back(monkeypatch):
+    # without ATOMIC_REQUESTS DRF leaves the transaction alone
+    monkeypatch.setitem(connection.settings_dict, "ATOMIC_REQUESTS", False)
+
+    response = TagView.as_view()(APIRequestFactory().post("/"))
+
+    assert response.status_code == 400
+    assert not Tags.objects.exists()
+
+
+def test_error_responses_need_the_mixin(monkeypatch):
+    monkeypatch.setitem(connection.settings_dict, "ATOMIC_REQUESTS", False)
+
+    class PlainTagView(APIView):
+        permission_classes = [AllowAny]
+        post = TagView.post
+
+    PlainTagView.as_view()(APIRequestFactory().post("/"))
+
+    assert Tags.objects.exists()
@@ -0,0 +1,199 @@
+from io import BytesIO
+
+import pytest
+import requests
+from django.core import signing
+from django.urls import reverse
+from PIL import Image as PILImage
+from rest_framework.test import APIClient
+
+from udrems.core.models import Image
+from udrems.users.models import User
+from udrems.users.tests.factories import UserFactory
+from udrems.utils.uploads import (
+    COMPLETE_WITHIN_SECONDS,
+    SALT,
+    UploadError,
+    finish_upload,
+    upload_name,
+)
+
+pytestmark = pytest.mark.django_db
+
+field = Image._meta.get_field("image")
+
+
+def png(width: int = 40, height: int = 30) -> bytes:
+    buffer = BytesIO()
+    PILImage.new("RGB", (width, height), (0, 128, 255)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def ticket(user: User, **overrides) -> str:
+    upload = {
+        "field": "core.Image.image",
+        "name": "images/0/photo.png",
+        "content_type": "image/png",
+        "size": 100,
+        "user": user.pk,
+    }
+    return signing.dumps({**upload, **overrides}, salt=SALT)
+
+
+@pytest.fixture
+def staff() -> User:
+    return UserFactory(is_staff=True, account_type="staff")
+
+
+@pytest.fixture
+def api_client(staff: User) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(staff)
+    return client
+
+
+def start(client: APIClient, content: bytes, **data):
+    request = {"filename": "photo.png", "content_type": "image/png"}
+    request["size"] = len(content)
+    request.update(data)
+    return client.post(reverse("api:image-upload"), request, format="json")
+
+
+def complete(client: APIClient, upload: dict):
+    return client.post(
+        reverse("api:image-upload-complete"),
+        {"upload": upload["upload"], "image_name": "Hall", "image_caption": "Hall"},
+        format="json",
+    )
+
+
+def send(upload: dict, content: bytes) -> None:
+    if upload["method"] == "PUT":
+        response = requests.put(upload["url"], data=content, headers=upload["headers"])
+    else:
+        response = requests.post(
+            upload["url"], data=upload["fields"], files={"file": content}
+        )
+    response.raise_for_status()
+
+
+def upload_key(upload: dict) -> str:
+    return signing.loads(upload["upload"], salt=SALT)["name"]
+
+
+class TestImageUpload:
+    def test_needs_the_s3_storage(self, api_client: APIClient):
+        response = start(api_client, png())
+
+        assert response.status_code == 400
+        assert "S3" in response.data["upload"]
+
+    def test_rejects_other_content_types(self, api_client: APIClient):
+        response = start(api_client, b"%PDF", content_type="application/pdf")
+
+        assert response.status_code == 400
+        assert "not allowed" in response.data["upload"]
+
+    def test_rejects_large_files(self, api_client: APIClient, settings):
+        settings.UPLOAD_MAX_SIZE = 10
+
+        response = start(api_client, png())
+
+        assert response.status_code == 400
+
+    def test_is_for_staff(self, user: User):
+        client = APIClient()
+        client.force_authenticate(user)
+
+        assert start(client, png()).status_code == 403
+
+
+class TestDirectImageUpload:
+    @pytest.mark.parametrize("method", ["POST", "PUT"])
+    def test_creates_the_image(self, api_client: APIClient, media_bucket, method):
+        content = png()
+        upload = start(api_client, content, method=method).data
+        send(upload, content)
+
+        response = complete(api_client, upload)
+
+        assert response.status_code == 201
+        image = Image.objects.get(pk=response.data["id"])
+        assert image.image.name.startswith("images/")
+        assert image.image.name.endswith("/photo.png")
+        assert media_bucket.size(image.image.name) == len(content)
+
+    def test_completes_once(self, api_client: APIClient, media_bucket):
+        content = png()
+        upload = start(api_client, content).data
+        send(upload, content)
+        complete(api_client, upload)
+
+        response = complete(api_client, upload)
+
+        assert response.status_code == 400
+        assert Image.objects.count() == 1
+
+    def test_rejects_missing_files(self, api_client: APIClient, media_bucket):
+        upload = start(api_client, png()).data
+
+        response = complete(api_client, upload)
+
+        assert response.status_code == 400
+        assert "not been uploaded" in response.data["upload"]
+
+    def test_deletes_files_that_are_not_images(
+        self, api_client: APIClient, media_bucket
+    ):
+        content = b"<script>alert(1)</script>"
+        upload = start(api_client, content, method="PUT").data
+        send(upload, content)
+
+        response = complete(api_client, upload)
+
+        assert response.status_code == 400
+        assert not Image.objects.exists()
+        assert not media_bucket.exists(upload_key(upload))
+
+    def test_deletes_files_larger_than_announced(
+        self, api_client: APIClient, media_bucket
+    ):
+        # S3 does not check the size of a PUT
+        upload = start(api_client, png(), method="PUT").data
+        send(upload, png(400, 300))
+
+        response = complete(api_client, upload)
+
+        assert response.status_code == 400
+        assert not media_bucket.exists(upload_key(upload))
+
+
+class TestFinishUpload:
+    def test_rejects_forged_tickets(self, user: User):
+        with pytest.raises(UploadError, match="invalid"):
+            finish_upload(field, user, ticket(user) + "x")
+
+    def test_rejects_expired_tickets(self, user: User, settings):
+        settings.UPLOAD_URL_EXPIRY = -COMPLETE_WITHIN_SECONDS - 1
+
+        with pytest.raises(UploadError, match="expired"):
+            finish_upload(field, user, ticket(user))
+
+    def test_rejects_tickets_of_other_users(self, user: User):
+        with pytest.raises(UploadError, match="not for this upload"):
+            finish_upload(field, user, ticket(UserFactory()))
+
+    def test_rejects_tickets_for_other_fields(self, user: User):
+        other = ticket(user, field="users.TenantProfile.profile_picture")
+
+        with pytest.raises(UploadError, match="not for this upload"):
+            finish_upload(field, user, other)
+
+
+def test_upload_name():
+    name = upload_name(field, "../../etc/" + "x" * 200 + ".png")
+
+    assert name.startswith("images/")
+    assert name.endswith("x.png")
+    assert len(name) == field.max_length
+    assert ".." not in name
@@ -0,0 +1,112 @@
+"""
+Per-request accounting of database queries and cache lookups.
+
+The active ``RequestCost`` lives in a context variable, so concurrent
+requests never share one. Connections get an execute wrapper and cache
+backends are wrapped at class level, once each; they only count while a
+``RequestCost`` is active in the calling context, whatever thread that is.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+@dataclass
+class RequestCost:
+    queries: int = 0
+    query_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+current: ContextVar[Optional[RequestCost]] = ContextVar("request_cost", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    cost = current.get()
+    if cost is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        cost.queries += 1
+        cost.query_seconds += time.perf_counter() - started
+
+
+def _instrument(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def instrument_connections() -> None:
+    """
+    Count queries into the active cost on every connection, including those
+    of ``udrems.utils.threadpool`` threads and of Django's sync thread under
+    ASGI: views there run with a copy of the request's context.
+    """
+    connection_created.connect(_instrument, dispatch_uid="request-cost")
+    for connection in connections.all():
+        _instrument(None, connection)
+
+
+@contextmanager
+def record(cost: RequestCost):
+    """Account queries and cache lookups into ``cost``."""
+    token = current.set(cost)
+    try:
+        yield cost
+    finally:
+        current.reset(token)
+
+
+_MISSING = object()
+
+
+def _count(hits: int, misses: int) -> None:
+    cost = current.get()
+    if cost is not None:
+        cost.cache_hits += hits
+        cost.cache_misses += misses
+
+
+def _wrap_get(get):
+    def wrapper(self, key, default=None, *args, **kwargs):
+        value = get(self, key, _MISSING, *args, **kwargs)
+        if value is _MISSING:
+            _count(0, 1)
+            return default
+        _count(1, 0)
+        return value
+
+    wrapper._request_cost = True
+    return wrapper
+
+
+def _wrap_get_many(get_many):
+    def wrapper(self, keys, *args, **kwargs):
+        keys = list(keys)
+        found = get_many(self, keys, *args, **kwargs)
+        _count(len(found), len(keys) - len(found))
+        return found
+
+    wrapper._request_cost = True
+    return wrapper
+
+
+def instrument_caches() -> None:
+    """Count hits and misses of ``get``/``get_many`` on every configured cache."""
+    for alias in caches:
+        backend_class = type(caches[alias])
+        if not getattr(backend_class.get, "_request_cost", False):
+            backend_class.get = _wrap_get(backend_class.get)
+        # the generic ``BaseCache.get_many`` goes through ``get`` already
+        get_many = backend_class.__dict__.get("get_many")
+        if get_many is not None and not getattr(get_many, "_request_cost", False):
+            backend_class.get_many = _wrap_get_many(get_many)
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+
+class PerfConfig(AppConfig):
+    name = "udrems.perf"
+    verbose_name = _("Performance")
+
+    def ready(self):
+        if settings.SLOW_QUERY_THRESHOLD_MS:
+            from udrems.perf import slow_queries
+
+            slow_queries.install()
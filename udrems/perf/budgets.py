@@ -0,0 +1,154 @@
+"""
+Query and time budgets per URL name, enforced by the test suite.
+
+Every API route and page declares the most queries (and optionally the most
+milliseconds) one request may cost in ``BUDGETS``. Tests measure a request
+with the ``query_budget`` fixture::
+
+    def test_list(client, query_budget):
+        with query_budget("api:user-list"):
+            client.get(reverse("api:user-list"))
+
+A request over budget fails the test and lists the queries it repeated,
+which is what an N+1 in a serializer looks like. Transaction control
+(savepoints from ``ATOMIC_REQUESTS``) is not counted: it is not work the
+view chose to do.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from udrems.perf.slow_queries import normalize
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int
+    milliseconds: Optional[float] = None
+
+
+def _content_budgets(basename: str, search: bool = True) -> Dict[str, Budget]:
+    # list: rows joined with author/image, prefetches of category, tags and
+    # image derivatives, and the aggregate behind the list ETag
+    budgets = {
+        f"api:{basename}-list": Budget(5),
+        # the row, its prefetches and the aggregate behind the detail ETag
+        f"api:{basename}-detail": Budget(5),
+        # slug/uuid -> pk lookup, then the same as detail
+        f"api:{basename}-by-slug": Budget(6),
+        f"api:{basename}-by-uuid": Budget(6),
+    }
+    if search:
+        # one ranked query and the prefetches, no validators
+        budgets[f"api:{basename}-search"] = Budget(4)
+    return budgets
+
+
+# logged-in requests load the user behind the session, unless it is cached
+# already (see udrems.users.authentication); the session comes from the cache
+SESSION = 1
+
+BUDGETS: Dict[str, Budget] = {
+    "home": Budget(0),
+    "about": Budget(0),
+    "metrics": Budget(SESSION),
+    "users:detail": Budget(SESSION + 1),
+    "users:redirect": Budget(SESSION),
+    "users:update": Budget(SESSION),
+    "api:user-list": Budget(SESSION + 1),
+    "api:user-detail": Budget(SESSION + 1),
+    "api:user-me": Budget(SESSION),
+    # the UNION of all kinds, then rows and their three prefetches per kind
+    "api:feed": Budget(1 + 4 * 6),
+    # direct uploads: presigning costs no queries, completing checks the
+    # bucket, then the row is saved (and the image serialized with its
+    # derivatives, the profile fetched first)
+    "api:image-upload": Budget(SESSION),
+    "api:image-upload-complete": Budget(SESSION + 3),
+    "api:profile-picture-upload": Budget(SESSION),
+    "api:profile-picture-upload-complete": Budget(SESSION + 3),
+    **_content_budgets("news"),
+    **_content_budgets("event"),
+    **_content_budgets("article"),
+    **_content_budgets("video", search=False),
+    **_content_budgets("gallery", search=False),
+    **_content_budgets("report", search=False),
+}
+
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class Usage:
+    url_name: str
+    budget: Budget
+    queries: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+    def duplicates(self) -> List[Tuple[str, int]]:
+        """Normalized queries run more than once, most repeated first."""
+        counts = Counter(normalize(sql) for sql in self.queries)
+        return [(sql, count) for sql, count in counts.most_common() if count > 1]
+
+    def problems(self) -> List[str]:
+        problems = []
+        if len(self.queries) > self.budget.queries:
+            problems.append(
+                f"{len(self.queries)} queries, budget is {self.budget.queries}"
+            )
+        limit = self.budget.milliseconds
+        if limit is not None and self.milliseconds > limit:
+            problems.append(f"{self.milliseconds:.0f} ms, budget is {limit:.0f} ms")
+        return problems
+
+    def report(self) -> str:
+        lines = [f"{self.url_name} is over budget: {', '.join(self.problems())}"]
+        duplicates = self.duplicates()
+        if duplicates:
+            lines.append("Repeated queries:")
+            lines.extend(f"  {count}x {sql}" for sql, count in duplicates)
+        else:
+            lines.append("Queries:")
+            lines.extend(f"  {sql}" for sql in self.queries)
+        return "\n".join(lines)
+
+    def check(self) -> None:
+        if self.problems():
+            raise BudgetExceeded(self.report())
+
+
+def is_counted(sql: str) -> bool:
+    return not sql.lstrip().upper().startswith(TRANSACTION_CONTROL)
+
+
+@contextmanager
+def measure(url_name: str, budget: Optional[Budget] = None, using: str = "default"):
+    """Fail with ``BudgetExceeded`` if the block costs more than allowed."""
+    if budget is None:
+        try:
+            budget = BUDGETS[url_name]
+        except KeyError:
+            raise KeyError(f"No budget declared for {url_name!r} in BUDGETS")
+    usage = Usage(url_name, budget)
+    context = CaptureQueriesContext(connections[using])
+    started = time.perf_counter()
+    with context:
+        yield usage
+    usage.seconds = time.perf_counter() - started
+    usage.queries = [
+        query["sql"] for query in context.captured_queries if is_counted(query["sql"])
+    ]
+    usage.check()
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from udrems.perf.synthetic import USERNAME_PREFIX, Generator, Volume
+from udrems.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with deterministic synthetic users, profiles and "
+        "their relationships, tags, categories, images and content for "
+        "benchmarks. The same seed and counts always produce the same rows."
+    )
+
+    def add_arguments(self, parser):
+        defaults = Volume()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument(
+            "--content",
+            type=int,
+            default=defaults.content,
+            help="Rows per content model",
+        )
+        parser.add_argument("--images", type=int, default=defaults.images)
+        parser.add_argument("--tags", type=int, default=defaults.tags)
+        parser.add_argument("--categories", type=int, default=defaults.categories)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--password",
+            help="Usable password for every user, unusable passwords by default",
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if (
+            User.objects.using(using)
+            .filter(username__startswith=USERNAME_PREFIX)
+            .exists()
+        ):
+            raise CommandError(
+                f"Users named {USERNAME_PREFIX}* exist already, generate into an "
+                "empty database so the data matches the seed"
+            )
+        volume = Volume(
+            users=options["users"],
+            tags=options["tags"],
+            categories=options["categories"],
+            images=options["images"],
+            content=options["content"],
+        )
+        generator = Generator(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            using=using,
+            password=options["password"],
+            progress=self.progress,
+        )
+        try:
+            counts = generator.run(volume)
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {sum(counts.values())} rows in {len(counts)} tables"
+            )
+        )
+
+    def progress(self, label: str, count: int, elapsed: float) -> None:
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(f"{label}: {count} rows in {elapsed:.1f}s ({rate:.0f}/s)")
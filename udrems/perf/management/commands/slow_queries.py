@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from udrems.perf import slow_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "List the slowest query fingerprints recorded by the slow-query log, "
+        "with the views and tasks that issued them and their last plan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument(
+            "--order-by",
+            choices=["total", "count", "max"],
+            default="total",
+            help="Rank by total time (default), executions or the slowest one",
+        )
+        parser.add_argument(
+            "--plans", action="store_true", help="Show the captured plans"
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Forget everything recorded so far"
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            slow_queries.clear_stats()
+            self.stdout.write(self.style.SUCCESS("Cleared the slow-query log"))
+            return
+
+        entries = slow_queries.get_stats(options["order_by"])[: options["limit"]]
+        if not entries:
+            self.stdout.write("No slow queries recorded")
+            return
+        for entry in entries:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{entry['fingerprint']}  {entry['count']}x  "
+                    f"total {entry['total'] * 1000:.0f} ms  "
+                    f"max {entry['max'] * 1000:.0f} ms"
+                )
+            )
+            self.stdout.write(f"  {entry['sql']}")
+            origins = sorted(entry["origins"].items(), key=lambda item: -item[1])
+            for source, count in origins:
+                self.stdout.write(f"  {count}x {source}")
+            if options["plans"] and entry["plan"]:
+                for line in entry["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
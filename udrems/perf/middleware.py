@@ -0,0 +1,140 @@
+"""
+Opt-in per-request cost accounting, enabled with ``PERF_METRICS_ENABLED``.
+
+Every request records wall time, database query count and time, cache hits
+and misses and response size into histograms labelled with the resolved view
+name, served in Prometheus format by ``udrems.perf.views.metrics``. A
+``PERF_PROFILE_SAMPLE_RATE`` share of requests also runs under cProfile.
+
+Queries and cache lookups are counted on whatever thread the view runs,
+``udrems.utils.threadpool`` workers included. Under ASGI the middleware
+stays asynchronous, so it does not put requests on Django's sync thread.
+"""
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import random
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from udrems.perf import accounting
+from udrems.perf.metrics import QUERY_BUCKETS, SIZE_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+UNRESOLVED = "<unresolved>"
+
+LABELS = ("view", "method")
+requests_total = registry.counter(
+    "udrems_http_requests", "Requests by view, method and status.", LABELS + ("status",)
+)
+request_seconds = registry.histogram(
+    "udrems_http_request_duration_seconds", "Wall time per request.", LABELS
+)
+db_queries = registry.histogram(
+    "udrems_http_request_db_queries",
+    "Database queries per request.",
+    LABELS,
+    buckets=QUERY_BUCKETS,
+)
+db_seconds = registry.histogram(
+    "udrems_http_request_db_duration_seconds",
+    "Time spent in database queries per request.",
+    LABELS,
+)
+cache_hits = registry.counter(
+    "udrems_http_request_cache_hits", "Cache lookups that found a value.", LABELS
+)
+cache_misses = registry.counter(
+    "udrems_http_request_cache_misses", "Cache lookups that found nothing.", LABELS
+)
+response_bytes = registry.histogram(
+    "udrems_http_response_size_bytes",
+    "Response body size, streaming responses excluded.",
+    LABELS,
+    buckets=SIZE_BUCKETS,
+)
+
+
+def view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED
+    return match.view_name or match._func_path
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERF_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PERF_PROFILE_SAMPLE_RATE
+        accounting.instrument_connections()
+        accounting.instrument_caches()
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        cost = accounting.RequestCost()
+        profiler = None
+        if self.sample_rate and random.random() < self.sample_rate:
+            profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with accounting.record(cost):
+            if profiler is not None:
+                response = profiler.runcall(self.get_response, request)
+            else:
+                response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        labels = self.observe(request, response, cost, elapsed)
+        if profiler is not None:
+            self.save_profile(profiler, labels["view"], elapsed)
+        return response
+
+    async def __acall__(self, request):
+        # cProfile only sees the thread it runs on, and the event loop
+        # interleaves requests on it: requests served asynchronously are not
+        # sampled for profiles
+        cost = accounting.RequestCost()
+        started = time.perf_counter()
+        with accounting.record(cost):
+            response = await self.get_response(request)
+        self.observe(request, response, cost, time.perf_counter() - started)
+        return response
+
+    def observe(self, request, response, cost, elapsed: float) -> dict:
+        labels = {"view": view_name(request), "method": request.method}
+        requests_total.inc(status=str(response.status_code), **labels)
+        request_seconds.observe(elapsed, **labels)
+        db_queries.observe(cost.queries, **labels)
+        db_seconds.observe(cost.query_seconds, **labels)
+        cache_hits.inc(cost.cache_hits, **labels)
+        cache_misses.inc(cost.cache_misses, **labels)
+        if not response.streaming:
+            response_bytes.observe(len(response.content), **labels)
+        return labels
+
+    def save_profile(self, profiler: cProfile.Profile, view: str, elapsed: float):
+        directory = settings.PERF_PROFILE_DIR
+        if directory:
+            name = re.sub(r"[^\w.-]+", "_", view)
+            path = Path(directory) / f"{name}-{time.time_ns()}.prof"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+            return
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(20)
+        logger.info(
+            "Profile of %s (%.1f ms)\n%s", view, elapsed * 1000, output.getvalue()
+        )
@@ -0,0 +1,310 @@
+"""
+Slow-query log with plans captured out-of-band.
+
+Once installed (``PerfConfig.ready`` does so when ``SLOW_QUERY_THRESHOLD_MS``
+is set) every database connection runs its queries through ``record``. A
+query over the threshold is logged with its fingerprint, the normalized SQL
+that identifies it regardless of parameters, and with the view or Celery
+task that issued it.
+
+Per-fingerprint totals are kept in the default cache, shared by all workers,
+for the ``slow_queries`` management command. A ``SELECT`` also gets its plan
+captured by a background thread on its own connection, at most once per
+fingerprint every ``SLOW_QUERY_EXPLAIN_INTERVAL`` seconds, so the query that
+was slow never waits for its ``EXPLAIN``. With
+``SLOW_QUERY_EXPLAIN_ANALYZE`` the plan is ``EXPLAIN ANALYZE`` where the
+database supports it, which runs the query once more. Only plain ``SELECT``s
+taking no row locks are run again; ``WITH`` queries, whose CTEs may write,
+and ``SELECT ... FOR UPDATE/SHARE`` get a plain ``EXPLAIN``.
+"""
+import asyncio
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+
+from udrems.perf.middleware import view_name
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "perf:slow-query"
+INDEX_KEY = f"{KEY_PREFIX}:index"
+# totals outlive any deploy, but not forever
+STATS_TIMEOUT = 7 * 24 * 60 * 60
+MAX_FINGERPRINTS = 500
+
+origin: ContextVar[str] = ContextVar("query_origin", default="")
+
+_explaining = threading.local()
+
+
+# fingerprints
+# ------------------------------------------------------------------------------
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(sql: str) -> str:
+    """``sql`` with literals and placeholder lists collapsed."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    sql = _ROWS.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.md5(normalize(sql).encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+# aggregation
+# ------------------------------------------------------------------------------
+def stats_key(digest: str) -> str:
+    return f"{KEY_PREFIX}:{digest}"
+
+
+def add_to_stats(digest: str, sql: str, seconds: float, source: str) -> None:
+    """
+    Fold one slow execution into the shared per-fingerprint totals.
+
+    A plain read-modify-write: concurrent workers may occasionally lose an
+    increment, which is fine for finding offenders.
+    """
+    key = stats_key(digest)
+    entry = cache.get(key)
+    if entry is None:
+        entry = {
+            "fingerprint": digest,
+            "sql": normalize(sql),
+            "count": 0,
+            "total": 0.0,
+            "max": 0.0,
+            "origins": {},
+            "plan": None,
+        }
+        index = cache.get(INDEX_KEY) or []
+        if digest not in index and len(index) < MAX_FINGERPRINTS:
+            cache.set(INDEX_KEY, index + [digest], timeout=STATS_TIMEOUT)
+    entry["count"] += 1
+    entry["total"] += seconds
+    entry["max"] = max(entry["max"], seconds)
+    entry["origins"][source] = entry["origins"].get(source, 0) + 1
+    cache.set(key, entry, timeout=STATS_TIMEOUT)
+
+
+def set_plan(digest: str, plan: str) -> None:
+    key = stats_key(digest)
+    entry = cache.get(key)
+    if entry is not None:
+        entry["plan"] = plan
+        cache.set(key, entry, timeout=STATS_TIMEOUT)
+
+
+def get_stats(order_by: str = "total") -> List[Dict]:
+    """Totals of every recorded fingerprint, worst first."""
+    index = cache.get(INDEX_KEY) or []
+    entries = cache.get_many([stats_key(digest) for digest in index]).values()
+    return sorted(entries, key=lambda entry: entry[order_by], reverse=True)
+
+
+def clear_stats() -> None:
+    index = cache.get(INDEX_KEY) or []
+    cache.delete_many([INDEX_KEY] + [stats_key(digest) for digest in index])
+
+
+# EXPLAIN
+# ------------------------------------------------------------------------------
+_LOCKING = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE
+)
+
+
+def can_analyze(sql: str) -> bool:
+    """Whether running ``sql`` once more under ``EXPLAIN ANALYZE`` is harmless."""
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return False
+    return not _LOCKING.search(_STRING.sub("?", sql))
+
+
+def explain(alias: str, sql: str, params, analyze: bool) -> str:
+    connection = connections[alias]
+    analyze = analyze and can_analyze(sql)
+    try:
+        prefix = connection.ops.explain_query_prefix(analyze=True) if analyze else None
+    except ValueError:
+        # e.g. SQLite has no EXPLAIN ANALYZE
+        prefix = None
+    if prefix is None:
+        prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f"{prefix} {sql}", params)
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor)
+
+
+class Explainer:
+    """Runs ``EXPLAIN`` for queued queries on a daemon thread."""
+
+    def __init__(self, maxsize: int = 100):
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._last: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, alias: str, digest: str, sql: str, params) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(digest)
+            if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+                return False
+            self._last[digest] = now
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self.run, name="slow-query-explain", daemon=True
+                )
+                self._thread.start()
+        try:
+            self.queue.put_nowait((alias, digest, sql, params))
+        except queue.Full:
+            return False
+        return True
+
+    def run(self) -> None:
+        _explaining.active = True
+        while True:
+            alias, digest, sql, params = self.queue.get()
+            try:
+                self.explain(alias, digest, sql, params)
+            finally:
+                self.queue.task_done()
+
+    def explain(self, alias: str, digest: str, sql: str, params) -> None:
+        try:
+            plan = explain(alias, sql, params, settings.SLOW_QUERY_EXPLAIN_ANALYZE)
+        except Exception:
+            logger.warning("Could not explain slow query %s", digest, exc_info=True)
+            return
+        finally:
+            close_old_connections()
+        logger.warning("Plan for slow query %s:\n%s", digest, plan)
+        set_plan(digest, plan)
+
+
+explainer = Explainer()
+
+
+# recording
+# ------------------------------------------------------------------------------
+def is_explainable(sql: str) -> bool:
+    return sql.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+def record(execute, sql, params, many, context):
+    """``execute_wrapper`` logging queries slower than the threshold."""
+    if getattr(_explaining, "active", False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        if seconds * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            on_slow_query(context["connection"].alias, sql, params, many, seconds)
+
+
+def on_slow_query(alias: str, sql: str, params, many: bool, seconds: float) -> None:
+    digest = fingerprint(sql)
+    source = origin.get() or "<unknown>"
+    logger.warning(
+        "Slow query %s took %.1f ms in %s: %s",
+        digest,
+        seconds * 1000,
+        source,
+        normalize(sql),
+    )
+    try:
+        add_to_stats(digest, sql, seconds, source)
+    except Exception:
+        logger.warning("Could not record slow query %s", digest, exc_info=True)
+    if settings.SLOW_QUERY_EXPLAIN and not many and is_explainable(sql):
+        explainer.submit(alias, digest, sql, params)
+
+
+def instrument(sender, connection, **kwargs):
+    if record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record)
+
+
+def install() -> None:
+    """Record slow queries on every connection, including already open ones."""
+    connection_created.connect(instrument, dispatch_uid="slow-query-log")
+    for connection in connections.all():
+        instrument(None, connection)
+    task_prerun.connect(task_started, dispatch_uid="slow-query-origin")
+    task_postrun.connect(task_finished, dispatch_uid="slow-query-origin")
+
+
+# origins
+# ------------------------------------------------------------------------------
+class QueryOriginMiddleware:
+    """Tags queries with the name of the view that runs them."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_THRESHOLD_MS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            # awaited by the handler as is, rather than run on the sync thread
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = origin.set(f"{request.method} {request.path}")
+        try:
+            return self.get_response(request)
+        finally:
+            origin.reset(token)
+
+    async def __acall__(self, request):
+        # views run with a copy of this context, wherever their thread
+        token = origin.set(f"{request.method} {request.path}")
+        try:
+            return await self.get_response(request)
+        finally:
+            origin.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        origin.set(f"view:{view_name(request)}")
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        origin.set(f"view:{view_name(request)}")
+
+
+def task_started(sender=None, task=None, **kwargs):
+    task.request.query_origin_token = origin.set(f"task:{task.name}")
+
+
+def task_finished(sender=None, task=None, **kwargs):
+    token = getattr(task.request, "query_origin_token", None)
+    if token is not None:
+        origin.reset(token)
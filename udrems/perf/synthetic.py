@@ -0,0 +1,480 @@
+"""
+Deterministic synthetic data at benchmark volumes.
+
+``Generator(seed).run(volume)`` writes users of every account type with
+their profiles, landlord/tenant/property manager relationships, tags,
+categories, images and rows of every content model, the same rows for the
+same seed and volume. Each table gets its own ``random.Random`` derived from
+the seed, so changing one count does not reshuffle the others.
+
+Rows are built as unsaved instances with explicit primary keys, so no id has
+to be read back, and written in batches: with ``COPY`` on PostgreSQL,
+``bulk_create`` elsewhere. Neither sends ``post_save``, so no slugs are
+computed, no profiles are created by ``udrems.users.signals`` and no image
+derivatives are queued. Images point at files that do not exist.
+
+Timestamps are spread over the ``days`` before a fixed ``until``, not
+before now, so reruns agree.
+"""
+import io
+import random
+import time
+import uuid
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from udrems.core.models import Category, Image, Tags
+from udrems.core.signals import CONTENT_MODELS
+from udrems.users.models import (
+    LandlordProfile,
+    PropertyManagerProfile,
+    TenantProfile,
+    User,
+)
+
+USERNAME_PREFIX = "synthetic-"
+UNTIL = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+ACCOUNT_TYPE_WEIGHTS = {
+    "tenant": 70,
+    "landlord": 15,
+    "property_manager": 10,
+    "staff": 5,
+}
+
+WORDS = (
+    "apartment balcony basement building city community contract deposit "
+    "district elevator estate family garage garden heating house inspection "
+    "kitchen landlord lease maintenance manager meeting neighbour notice office "
+    "owner parking payment property renovation rent repair residence roof room "
+    "safety schedule service storage street studio suite tenant town utility "
+    "vacancy view water window winter yard"
+).split()
+FIRST_NAMES = (
+    "Ada Amir Ana Ben Carla Chen Dara Eli Emma Femi Hana Ivan Jon Kai Lea Luis "
+    "Maya Nia Omar Priya Rosa Sam Tariq Uma Vera Yuki Zoe"
+).split()
+LAST_NAMES = (
+    "Abe Baker Costa Diaz Evans Fischer Garcia Haddad Ito Jensen Kim Lopez "
+    "Mensah Novak Okafor Patel Quinn Rossi Silva Tanaka Umar Weber Yilmaz Zhou"
+).split()
+CITIES = ("Accra", "Berlin", "Lagos", "Lisbon", "Nairobi", "Osaka", "Toronto")
+COUNTRIES = ("Canada", "Germany", "Ghana", "Japan", "Kenya", "Nigeria", "Portugal")
+
+
+@dataclass
+class Volume:
+    users: int = 10_000
+    tags: int = 500
+    categories: int = 50
+    images: int = 10_000
+    #: rows per content model
+    content: int = 10_000
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def cents(amount: int) -> Decimal:
+    return Decimal(amount).scaleb(-2)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_value(value) -> str:
+    """``value`` in the text format of PostgreSQL's ``COPY``."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(COPY_ESCAPES)
+
+
+@contextmanager
+def explicit_timestamps(models):
+    """Let ``bulk_create`` keep the ``created``/``updated`` values it is given."""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Generator:
+    def __init__(
+        self,
+        seed: int = 0,
+        batch_size: int = 5000,
+        using: str = "default",
+        password: Optional[str] = None,
+        days: int = 3 * 365,
+        progress: Optional[Callable[[str, int, float], None]] = None,
+    ):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.using = using
+        # one hash shared by every user, hashing millions would take hours
+        self.password = make_password(password) if password else None
+        self.days = days
+        self.progress = progress
+        self.connection = connections[using]
+        self.copy = self.connection.vendor == "postgresql"
+        self.counts: Dict[str, int] = {}
+        self.models: Dict[str, type] = {}
+
+    def rng(self, name: str) -> random.Random:
+        return random.Random(f"{self.seed}:{name}")
+
+    def timestamp(self, rng: random.Random) -> datetime:
+        return UNTIL - timedelta(seconds=rng.randrange(self.days * 24 * 60 * 60))
+
+    def first_id(self, model) -> int:
+        queryset = model._base_manager.using(self.using)
+        return (queryset.aggregate(last=Max("pk"))["last"] or 0) + 1
+
+    # writing
+    # --------------------------------------------------------------------------
+    def insert(self, model, objs: Iterable) -> int:
+        started = time.perf_counter()
+        count = 0
+        for batch in chunked(objs, self.batch_size):
+            if self.copy:
+                self.copy_batch(model, batch)
+            else:
+                model._base_manager.using(self.using).bulk_create(batch)
+            count += len(batch)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + count
+        self.models[label] = model
+        if self.progress is not None:
+            self.progress(label, count, time.perf_counter() - started)
+        return count
+
+    def copy_batch(self, model, batch: List) -> None:
+        connection = self.connection
+        fields = [
+            field
+            for field in model._meta.concrete_fields
+            if not (field.primary_key and batch[0].pk is None)
+        ]
+        buffer = io.StringIO()
+        for obj in batch:
+            values = (
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+                for field in fields
+            )
+            buffer.write("\t".join(map(copy_value, values)) + "\n")
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN", buffer
+            )
+
+    def link(self, model, name: str, pairs: Iterable) -> int:
+        """Insert ``(source id, target id)`` pairs into ``model.<name>``'s table."""
+        field = model._meta.get_field(name)
+        through = field.remote_field.through
+        source = f"{field.m2m_field_name()}_id"
+        target = f"{field.m2m_reverse_field_name()}_id"
+        return self.insert(
+            through, (through(**{source: a, target: b}) for a, b in pairs)
+        )
+
+    def reset_sequences(self) -> None:
+        """Move sequences past the explicit ids ``COPY`` wrote."""
+        models = list(self.models.values())
+        statements = self.connection.ops.sequence_reset_sql(no_style(), models)
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    # tables
+    # --------------------------------------------------------------------------
+    def users(self, count: int) -> Dict[str, array]:
+        """
+        Create users and their profiles.
+
+        Returns the new ids by account type, profile ids for the types that
+        have a profile and user ids under ``"user"``.
+        """
+        rng = self.rng("users")
+        first = self.first_id(User)
+        types = list(ACCOUNT_TYPE_WEIGHTS)
+        weights = list(ACCOUNT_TYPE_WEIGHTS.values())
+        account_types = rng.choices(types, weights, k=count)
+
+        def build():
+            for offset, account_type in enumerate(account_types):
+                first_name = rng.choice(FIRST_NAMES)
+                last_name = rng.choice(LAST_NAMES)
+                joined = self.timestamp(rng)
+                username = f"{USERNAME_PREFIX}{first + offset:08d}"
+                yield User(
+                    id=first + offset,
+                    username=username,
+                    email=f"{username}@example.com",
+                    first_name=first_name,
+                    last_name=last_name,
+                    name=f"{first_name} {last_name}",
+                    account_type=account_type,
+                    is_staff=account_type == "staff",
+                    date_joined=joined,
+                    updated=joined,
+                    password=self.password
+                    or UNUSABLE_PASSWORD_PREFIX + "%040x" % rng.getrandbits(160),
+                )
+
+        self.insert(User, build())
+
+        ids = {"user": array("q", range(first, first + count))}
+        for account_type, model in (
+            ("landlord", LandlordProfile),
+            ("tenant", TenantProfile),
+            ("property_manager", PropertyManagerProfile),
+        ):
+            user_ids = [
+                first + offset
+                for offset, value in enumerate(account_types)
+                if value == account_type
+            ]
+            ids[account_type] = self.profiles(model, user_ids)
+        return ids
+
+    def profiles(self, model, user_ids: List[int]) -> array:
+        rng = self.rng(model._meta.model_name)
+        first = self.first_id(model)
+        ids = array("q", range(first, first + len(user_ids)))
+
+        def build():
+            for pk, user_id in zip(ids, user_ids):
+                yield model(
+                    id=pk,
+                    user_id=user_id,
+                    phone_number=f"+1555{rng.randrange(10 ** 7):07d}",
+                    address=f"{rng.randrange(1, 999)} {rng.choice(WORDS).title()} St",
+                    city=rng.choice(CITIES),
+                    state="",
+                    zip_code=f"{rng.randrange(10 ** 5):05d}",
+                    country=rng.choice(COUNTRIES),
+                    balance=cents(rng.randrange(500_000)),
+                    outstanding_balance=cents(
+                        rng.choice((0, 0, 0, rng.randrange(100_000)))
+                    ),
+                )
+
+        self.insert(model, build())
+        return ids
+
+    def relationships(self, ids: Dict[str, array]) -> None:
+        """
+        Tenants rent from one or two landlords, landlords hire up to two
+        property managers, and those managers manage the landlords' tenants.
+
+        Every relationship is written from both sides, as the profile models
+        keep a separate table per side.
+        """
+        landlords = ids["landlord"]
+        tenants = ids["tenant"]
+        managers = ids["property_manager"]
+        rng = self.rng("relationships")
+
+        managers_of: Dict[int, tuple] = {}
+        if managers:
+            for landlord in landlords:
+                managers_of[landlord] = tuple(
+                    rng.sample(managers, min(len(managers), rng.choice((0, 1, 1, 2))))
+                )
+        landlord_managers = [
+            (landlord, manager)
+            for landlord, hired in managers_of.items()
+            for manager in hired
+        ]
+        self.link(LandlordProfile, "property_managers", landlord_managers)
+        self.link(
+            PropertyManagerProfile,
+            "landlords",
+            ((manager, landlord) for landlord, manager in landlord_managers),
+        )
+
+        rented = []
+        if landlords:
+            for tenant in tenants:
+                count = min(len(landlords), 2 if rng.random() < 0.1 else 1)
+                rented.extend(
+                    (tenant, landlord) for landlord in rng.sample(landlords, count)
+                )
+        self.link(TenantProfile, "landlords", rented)
+        self.link(
+            LandlordProfile,
+            "tenants",
+            ((landlord, tenant) for tenant, landlord in rented),
+        )
+
+        managed = sorted(
+            {
+                (tenant, manager)
+                for tenant, landlord in rented
+                for manager in managers_of.get(landlord, ())
+            }
+        )
+        self.link(TenantProfile, "property_managers", managed)
+        self.link(
+            PropertyManagerProfile,
+            "tenants",
+            ((manager, tenant) for tenant, manager in managed),
+        )
+
+    def labels(self, model, field: str, count: int) -> array:
+        first = self.first_id(model)
+        ids = array("q", range(first, first + count))
+        rng = self.rng(model._meta.model_name)
+
+        def build():
+            for pk in ids:
+                created = self.timestamp(rng)
+                yield model(
+                    id=pk,
+                    created=created,
+                    updated=created,
+                    **{field: f"{rng.choice(WORDS)}-{pk}"},
+                )
+
+        self.insert(model, build())
+        return ids
+
+    def images(self, count: int) -> array:
+        first = self.first_id(Image)
+        ids = array("q", range(first, first + count))
+        rng = self.rng("images")
+
+        def build():
+            for pk in ids:
+                width = rng.choice((640, 800, 1280, 1920))
+                yield Image(
+                    id=pk,
+                    image=f"images/synthetic/{pk}.jpg",
+                    image_name=f"{pk}.jpg",
+                    image_caption=sentence(rng, 6),
+                    width=width,
+                    height=width * 2 // 3,
+                )
+
+        self.insert(Image, build())
+        return ids
+
+    def content(
+        self,
+        model,
+        count: int,
+        authors: array,
+        images: array,
+        categories: array,
+        tags: array,
+    ) -> None:
+        rng = self.rng(model._meta.model_name)
+        first = self.first_id(model)
+        ids = range(first, first + count)
+        has_published = any(f.name == "is_published" for f in model._meta.fields)
+        name = model._meta.model_name
+
+        def build():
+            for pk in ids:
+                title = sentence(rng, rng.randint(3, 8))
+                created = self.timestamp(rng)
+                extra = {"is_published": rng.random() < 0.9} if has_published else {}
+                yield model(
+                    id=pk,
+                    title=title,
+                    slug=f"{name}-{pk}",
+                    uuid=uuid.UUID(int=rng.getrandbits(128), version=4),
+                    author_id=rng.choice(authors),
+                    description=" ".join(
+                        sentence(rng, rng.randint(8, 16)) + "."
+                        for _ in range(rng.randint(1, 5))
+                    ),
+                    is_active=rng.random() < 0.98,
+                    image_id=rng.choice(images),
+                    created=created,
+                    updated=created + timedelta(seconds=rng.randrange(86_400)),
+                    **extra,
+                )
+
+        self.insert(model, build())
+
+        links = self.rng(f"{name}:labels")
+        if categories:
+            self.link(
+                model,
+                "category",
+                (
+                    (pk, category)
+                    for pk in ids
+                    for category in links.sample(
+                        categories, min(len(categories), links.randint(1, 2))
+                    )
+                ),
+            )
+        if tags:
+            self.link(
+                model,
+                "tags",
+                (
+                    (pk, tag)
+                    for pk in ids
+                    for tag in links.sample(tags, min(len(tags), links.randint(0, 4)))
+                ),
+            )
+
+    # everything
+    # --------------------------------------------------------------------------
+    def run(self, volume: Volume) -> Dict[str, int]:
+        """Write ``volume`` in one transaction, return rows written per table."""
+        if volume.content and not (volume.users and volume.images):
+            raise ValueError("Content needs at least one user and one image")
+        models = [User, Category, Tags, *CONTENT_MODELS]
+        with transaction.atomic(using=self.using), explicit_timestamps(models):
+            ids = self.users(volume.users)
+            self.relationships(ids)
+            categories = self.labels(Category, "category", volume.categories)
+            tags = self.labels(Tags, "tag", volume.tags)
+            images = self.images(volume.images)
+            for model in CONTENT_MODELS:
+                self.content(
+                    model, volume.content, ids["user"], images, categories, tags
+                )
+            if self.copy:
+                self.reset_sequences()
+        return self.counts
@@ -0,0 +1,178 @@
+import pytest
+from django.db import transaction
+from django.urls import URLResolver, get_resolver, reverse
+
+from udrems.core.tests.factories import (
+    ArticleFactory,
+    CategoryFactory,
+    EventFactory,
+    GalleryFactory,
+    NewsFactory,
+    ReportFactory,
+    TagsFactory,
+    VideoFactory,
+)
+from udrems.perf import budgets
+from udrems.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+# enough rows that a per-row query cannot hide under the budget
+ROWS = 10
+
+CONTENT = {
+    "news": NewsFactory,
+    "event": EventFactory,
+    "article": ArticleFactory,
+    "video": VideoFactory,
+    "gallery": GalleryFactory,
+    "report": ReportFactory,
+}
+SEARCHABLE = ("news", "event", "article")
+# namespaces and names the budgets must cover, see ``test_every_route_has_a_budget``
+NAMESPACES = ("api", "users")
+PAGES = ("home", "about", "metrics")
+
+
+def create_content(factory):
+    categories = CategoryFactory.create_batch(2)
+    tags = TagsFactory.create_batch(3)
+    return factory.create_batch(ROWS, category=categories, tags=tags)
+
+
+def url_names(resolver=None, namespace=""):
+    for pattern in (resolver or get_resolver()).url_patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = f"{namespace}{pattern.namespace}:" if pattern.namespace else ""
+            yield from url_names(pattern, prefix or namespace)
+        elif pattern.name:
+            yield f"{namespace}{pattern.name}"
+
+
+def test_every_route_has_a_budget():
+    names = {
+        name
+        for name in url_names()
+        if name in PAGES or name.partition(":")[0] in NAMESPACES
+    }
+    assert names - set(budgets.BUDGETS) == set()
+
+
+class TestContentBudgets:
+    @pytest.fixture(params=CONTENT, autouse=True)
+    def kind(self, request):
+        return request.param
+
+    @pytest.fixture
+    def items(self, kind):
+        return create_content(CONTENT[kind])
+
+    def test_list(self, client, kind, items, query_budget):
+        with query_budget(f"api:{kind}-list"):
+            response = client.get(reverse(f"api:{kind}-list"))
+        assert len(response.json()["results"]) == ROWS
+
+    def test_detail(self, client, kind, items, query_budget):
+        url = reverse(f"api:{kind}-detail", kwargs={"pk": items[0].pk})
+        with query_budget(f"api:{kind}-detail"):
+            assert client.get(url).status_code == 200
+
+    def test_by_slug(self, client, kind, items, query_budget):
+        url = reverse(f"api:{kind}-by-slug", kwargs={"slug": items[0].slug})
+        with query_budget(f"api:{kind}-by-slug"):
+            assert client.get(url).status_code == 200
+
+    def test_by_uuid(self, client, kind, items, query_budget):
+        url = reverse(f"api:{kind}-by-uuid", kwargs={"uuid": items[0].uuid})
+        with query_budget(f"api:{kind}-by-uuid"):
+            assert client.get(url).status_code == 200
+
+
+@pytest.mark.parametrize("kind", SEARCHABLE)
+def test_search(client, kind, query_budget):
+    items = create_content(CONTENT[kind])
+    word = items[0].title.split()[0].strip(".")
+    with query_budget(f"api:{kind}-search"):
+        response = client.get(reverse(f"api:{kind}-search"), {"q": word})
+    assert response.status_code == 200
+
+
+def test_feed(client, query_budget):
+    for factory in CONTENT.values():
+        create_content(factory)
+    with query_budget("api:feed"):
+        response = client.get(reverse("api:feed"), {"page_size": 50})
+    assert len(response.json()["results"]) == 50
+
+
+@pytest.fixture
+def pages(settings):
+    # the stylesheet is only built for deployment
+    settings.COMPRESS_ENABLED = False
+
+
+@pytest.mark.parametrize("name", ["home", "about"])
+def test_page(client, pages, name, query_budget):
+    with query_budget(name):
+        assert client.get(reverse(name)).status_code == 200
+
+
+class TestUserBudgets:
+    @pytest.fixture
+    def user(self, client):
+        UserFactory.create_batch(ROWS)
+        user = UserFactory()
+        client.force_login(user)
+        return user
+
+    def test_api_list(self, client, user, query_budget):
+        with query_budget("api:user-list"):
+            assert client.get(reverse("api:user-list")).status_code == 200
+
+    def test_api_detail(self, client, user, query_budget):
+        url = reverse("api:user-detail", kwargs={"username": user.username})
+        with query_budget("api:user-detail"):
+            assert client.get(url).status_code == 200
+
+    def test_api_me(self, client, user, query_budget):
+        with query_budget("api:user-me"):
+            assert client.get(reverse("api:user-me")).status_code == 200
+
+    def test_detail(self, client, user, pages, query_budget):
+        url = reverse("users:detail", kwargs={"username": user.username})
+        with query_budget("users:detail"):
+            assert client.get(url).status_code == 200
+
+    def test_redirect(self, client, user, query_budget):
+        with query_budget("users:redirect"):
+            assert client.get(reverse("users:redirect")).status_code == 302
+
+
+class TestMeasure:
+    def test_reports_repeated_queries(self, user):
+        with pytest.raises(budgets.BudgetExceeded) as raised:
+            with budgets.measure("x", budgets.Budget(queries=2)):
+                for pk in range(3):
+                    type(user).objects.filter(pk=pk).first()
+
+        message = str(raised.value)
+        assert "3 queries, budget is 2" in message
+        assert "3x SELECT" in message
+
+    def test_time_budget(self, monkeypatch):
+        ticks = iter([0.0, 0.5])
+        monkeypatch.setattr(budgets.time, "perf_counter", lambda: next(ticks))
+        with pytest.raises(budgets.BudgetExceeded, match="500 ms, budget is 100 ms"):
+            with budgets.measure("x", budgets.Budget(queries=0, milliseconds=100)):
+                pass
+
+    def test_ignores_savepoints(self, user):
+        with budgets.measure("x", budgets.Budget(queries=1)) as usage:
+            with transaction.atomic():
+                type(user).objects.count()
+        assert len(usage.queries) == 1
+
+    def test_undeclared(self):
+        with pytest.raises(KeyError, match="No budget"):
+            with budgets.measure("nope"):
+                pass
@@ -0,0 +1,56 @@
+from udrems.perf.metrics import Registry
+
+
+def test_render_counter_and_histogram():
+    registry = Registry()
+    requests = registry.counter("app_requests", "Requests.", ["view"])
+    seconds = registry.histogram("app_seconds", "Time.", ["view"], buckets=[0.1, 1])
+
+    requests.inc(view='say "hi"')
+    seconds.observe(0.05, view="home")
+    seconds.observe(0.5, view="home")
+    seconds.observe(5, view="home")
+
+    assert registry.render().splitlines() == [
+        "# HELP app_requests Requests.",
+        "# TYPE app_requests counter",
+        'app_requests_total{view="say \\"hi\\""} 1',
+        "# HELP app_seconds Time.",
+        "# TYPE app_seconds histogram",
+        'app_seconds_bucket{view="home",le="0.1"} 1',
+        'app_seconds_bucket{view="home",le="1"} 2',
+        'app_seconds_bucket{view="home",le="+Inf"} 3',
+        'app_seconds_count{view="home"} 3',
+        'app_seconds_sum{view="home"} 5.55',
+    ]
+
+
+def test_render_gauge():
+    registry = Registry()
+    connections = registry.gauge("app_connections", "Connections.", ["state"])
+
+    connections.set(3, state="idle")
+    connections.set(1, state="idle")
+
+    assert registry.render().splitlines() == [
+        "# HELP app_connections Connections.",
+        "# TYPE app_connections gauge",
+        'app_connections{state="idle"} 1',
+    ]
+
+
+def test_register_returns_existing_metric():
+    registry = Registry()
+
+    first = registry.counter("app_requests", "Requests.")
+
+    assert registry.counter("app_requests", "Requests.") is first
+
+
+def test_clear():
+    registry = Registry()
+    registry.counter("app_requests", "Requests.").inc()
+
+    registry.clear()
+
+    assert "app_requests_total" not in registry.render()
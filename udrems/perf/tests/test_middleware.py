@@ -0,0 +1,116 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, HttpResponseNotFound
+from django.urls import reverse
+
+from udrems.core.tests.factories import NewsFactory
+from udrems.perf import middleware
+from udrems.perf.metrics import registry
+from udrems.users.models import User
+from udrems.utils.threadpool import pooled_view
+from udrems.utils.transactions import read_only
+
+pytestmark = pytest.mark.django_db
+
+LABELS = {"view": "api:news-list", "method": "GET"}
+
+
+@pytest.fixture(autouse=True)
+def enabled(settings):
+    settings.PERF_METRICS_ENABLED = True
+    settings.PERF_METRICS_TOKEN = "scrape-token"
+    settings.PERF_PROFILE_SAMPLE_RATE = 0
+    registry.clear()
+    yield
+    registry.clear()
+
+
+class TestPerformanceMiddleware:
+    def test_records_cost_per_view(self, client):
+        NewsFactory.create_batch(2)
+
+        client.get(reverse("api:news-list"))
+        client.get(reverse("api:news-list"))
+
+        assert middleware.requests_total.value(status="200", **LABELS) == 2
+        assert middleware.request_seconds.count(**LABELS) == 2
+        assert middleware.response_bytes.count(**LABELS) == 2
+        # the second request is served from the content cache
+        assert middleware.cache_hits.value(**LABELS) >= 1
+        assert middleware.cache_misses.value(**LABELS) >= 1
+        _, queries = middleware.db_queries._values[("api:news-list", "GET")]
+        assert queries > 0
+
+    def test_unresolved(self, rf):
+        performance = middleware.PerformanceMiddleware(
+            lambda request: HttpResponseNotFound()
+        )
+
+        performance(rf.get("/does-not-exist/"))
+
+        assert (
+            middleware.requests_total.value(
+                view=middleware.UNRESOLVED, method="GET", status="404"
+            )
+            == 1
+        )
+
+    def test_profile_sampling(self, client, settings, tmp_path):
+        settings.PERF_PROFILE_SAMPLE_RATE = 1
+        settings.PERF_PROFILE_DIR = str(tmp_path)
+
+        client.get(reverse("api:news-list"))
+
+        assert [path.name.split("-")[0] for path in tmp_path.iterdir()] == ["api_news"]
+
+    def test_disabled(self, client, settings):
+        settings.PERF_METRICS_ENABLED = False
+
+        client.get(reverse("api:news-list"))
+
+        assert middleware.requests_total.value(status="200", **LABELS) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncPerformanceMiddleware:
+    def test_counts_queries_of_pooled_views(self, rf):
+        def view(request):
+            User.objects.count()
+            return HttpResponse("pooled")
+
+        performance = middleware.PerformanceMiddleware(pooled_view(read_only(view)))
+        request = rf.get("/pooled/")
+        request.resolver_match = None
+
+        response = async_to_sync(performance)(request)
+
+        assert response.content == b"pooled"
+        labels = {"view": middleware.UNRESOLVED, "method": "GET"}
+        assert middleware.requests_total.value(status="200", **labels) == 1
+        _, queries = middleware.db_queries._values[(middleware.UNRESOLVED, "GET")]
+        assert queries == 1
+
+
+class TestMetricsView:
+    def test_token(self, client):
+        client.get(reverse("api:news-list"))
+
+        response = client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token"
+        )
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert (
+            'udrems_http_requests_total{view="api:news-list",method="GET",status="200"} 1'
+            in response.content.decode()
+        )
+
+    def test_staff(self, admin_client):
+        assert admin_client.get(reverse("metrics")).status_code == 200
+
+    @pytest.mark.parametrize("authorization", ["", "Bearer wrong"])
+    def test_anonymous(self, client, authorization):
+        response = client.get(reverse("metrics"), HTTP_AUTHORIZATION=authorization)
+
+        assert response.status_code == 404
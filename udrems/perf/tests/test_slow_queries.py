@@ -0,0 +1,210 @@
+import asyncio
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+
+from udrems.core.models import News
+from udrems.core.tests.factories import NewsFactory
+from udrems.perf import slow_queries
+from udrems.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def slow(settings):
+    # every query counts as slow
+    settings.SLOW_QUERY_THRESHOLD_MS = -1
+    settings.SLOW_QUERY_EXPLAIN = False
+    settings.SLOW_QUERY_EXPLAIN_ANALYZE = False
+    settings.SLOW_QUERY_EXPLAIN_INTERVAL = 60
+
+
+def recorded(model):
+    table = model._meta.db_table
+    return [entry for entry in slow_queries.get_stats() if table in entry["sql"]]
+
+
+class TestFingerprint:
+    def test_ignores_literals_and_list_lengths(self):
+        a = "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"
+        b = "SELECT  *  FROM t WHERE id IN (%s, %s) AND name = %s"
+        assert slow_queries.normalize(a) == (
+            "SELECT * FROM t WHERE id IN (...) AND name = ?"
+        )
+        assert slow_queries.fingerprint(a) == slow_queries.fingerprint(b)
+
+    def test_collapses_rows(self):
+        one = "INSERT INTO t (a, b) VALUES (%s, %s)"
+        many = "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)"
+        assert slow_queries.fingerprint(one) == slow_queries.fingerprint(many)
+
+    def test_keeps_identifiers(self):
+        assert slow_queries.normalize('SELECT "t1"."c2" FROM t1') == (
+            'SELECT "t1"."c2" FROM t1'
+        )
+        assert slow_queries.fingerprint(
+            "SELECT * FROM a WHERE x = 1"
+        ) != slow_queries.fingerprint("SELECT * FROM b WHERE x = 1")
+
+
+class TestRecord:
+    def test_aggregates_per_fingerprint(self, caplog):
+        token = slow_queries.origin.set("task:test")
+        try:
+            with connection.execute_wrapper(slow_queries.record):
+                User.objects.filter(username="a").first()
+                User.objects.filter(username="b").first()
+        finally:
+            slow_queries.origin.reset(token)
+
+        [entry] = recorded(User)
+        assert entry["count"] == 2
+        assert entry["total"] >= entry["max"] > 0
+        assert entry["origins"] == {"task:test": 2}
+        assert "= ?" in entry["sql"]
+        assert entry["fingerprint"] in caplog.text
+
+    def test_under_threshold(self, settings):
+        settings.SLOW_QUERY_THRESHOLD_MS = 60 * 1000
+        with connection.execute_wrapper(slow_queries.record):
+            User.objects.count()
+        assert slow_queries.get_stats() == []
+
+    def test_view_origin(self, client):
+        NewsFactory()
+        with connection.execute_wrapper(slow_queries.record):
+            client.get(reverse("api:news-list"))
+
+        [entry, *_] = recorded(News)
+        assert "view:api:news-list" in entry["origins"]
+
+    def test_async_origin(self, rf):
+        seen = []
+
+        async def get_response(request):
+            # what the handler does between the middleware and the view
+            await origin_middleware.process_view(request, None, (), {})
+            seen.append(slow_queries.origin.get())
+            return HttpResponse()
+
+        origin_middleware = slow_queries.QueryOriginMiddleware(get_response)
+        request = rf.get("/api/news/")
+        request.resolver_match = resolve("/api/news/")
+
+        async_to_sync(origin_middleware)(request)
+
+        assert asyncio.iscoroutinefunction(origin_middleware.process_view)
+        assert seen == ["view:api:news-list"]
+        assert slow_queries.origin.get() == ""
+
+    def test_task_origin(self):
+        task = SimpleNamespace(
+            name="udrems.core.tasks.example", request=SimpleNamespace()
+        )
+        slow_queries.task_started(task=task)
+        assert slow_queries.origin.get() == "task:udrems.core.tasks.example"
+        slow_queries.task_finished(task=task)
+        assert slow_queries.origin.get() == ""
+
+    def test_submits_selects_for_explain(self, settings, monkeypatch):
+        settings.SLOW_QUERY_EXPLAIN = True
+        submitted = []
+        monkeypatch.setattr(
+            slow_queries.explainer, "submit", lambda *args: submitted.append(args)
+        )
+        with connection.execute_wrapper(slow_queries.record):
+            User.objects.count()
+            User.objects.filter(pk=0).update(name="x")
+
+        [(alias, digest, sql, params)] = submitted
+        assert alias == "default"
+        assert sql.startswith("SELECT")
+        assert digest == slow_queries.fingerprint(sql)
+
+
+class TestExplain:
+    def test_falls_back_without_analyze(self):
+        sql, params = User.objects.filter(username="a").query.sql_with_params()
+        plan = slow_queries.explain("default", sql, params, analyze=True)
+        assert plan
+
+    def test_analyzes_plain_selects(self, monkeypatch):
+        analyzed = []
+        prefix = connection.ops.explain_query_prefix
+
+        def explain_query_prefix(format=None, **options):
+            analyzed.append(options.get("analyze", False))
+            return prefix(format)
+
+        monkeypatch.setattr(
+            connection.ops, "explain_query_prefix", explain_query_prefix
+        )
+        table = User._meta.db_table
+
+        slow_queries.explain("default", f"SELECT * FROM {table}", None, True)
+        slow_queries.explain(
+            "default", f"WITH u AS (SELECT * FROM {table}) SELECT * FROM u", None, True
+        )
+
+        assert analyzed == [True, False]
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "WITH d AS (DELETE FROM t RETURNING id) SELECT * FROM d",
+            "SELECT * FROM t WHERE id = 1 FOR UPDATE",
+            "SELECT * FROM t FOR NO KEY UPDATE SKIP LOCKED",
+            "SELECT * FROM t FOR SHARE",
+            "UPDATE t SET a = 1",
+        ],
+    )
+    def test_does_not_analyze_writes_or_locks(self, sql):
+        assert not slow_queries.can_analyze(sql)
+
+    def test_analyzes_selects_mentioning_locks_in_literals(self):
+        assert slow_queries.can_analyze("SELECT * FROM t WHERE a = 'for update'")
+
+    def test_plan_is_stored(self):
+        sql = f"SELECT * FROM {User._meta.db_table} WHERE username = %s"
+        digest = slow_queries.fingerprint(sql)
+        slow_queries.add_to_stats(digest, sql, 0.5, "task:test")
+
+        slow_queries.Explainer().explain("default", digest, sql, ["a"])
+
+        [entry] = slow_queries.get_stats()
+        assert entry["plan"]
+
+    def test_rate_limited(self, monkeypatch):
+        explainer = slow_queries.Explainer()
+        monkeypatch.setattr(explainer, "run", lambda: None)
+        assert explainer.submit("default", "abc", "SELECT 1", None)
+        assert not explainer.submit("default", "abc", "SELECT 1", None)
+        assert explainer.submit("default", "def", "SELECT 2", None)
+        assert explainer.queue.qsize() == 2
+
+
+class TestCommand:
+    def test_lists_worst_offenders(self):
+        slow_queries.add_to_stats("aaa", "SELECT 1", 0.2, "view:a")
+        slow_queries.add_to_stats("bbb", "SELECT 2", 0.9, "task:b")
+        slow_queries.set_plan("bbb", "SCAN t")
+
+        out = StringIO()
+        call_command("slow_queries", "--plans", stdout=out)
+        output = out.getvalue()
+
+        assert output.index("bbb") < output.index("aaa")
+        assert "1x task:b" in output
+        assert "SCAN t" in output
+
+    def test_clear(self):
+        slow_queries.add_to_stats("aaa", "SELECT 1", 0.2, "view:a")
+        call_command("slow_queries", "--clear", stdout=StringIO())
+        assert slow_queries.get_stats() == []
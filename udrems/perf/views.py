@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+from django.utils.crypto import constant_time_compare
+
+from udrems.perf.metrics import registry
+from udrems.utils.transactions import read_only
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def is_allowed(request) -> bool:
+    token = settings.PERF_METRICS_TOKEN
+    keyword, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if token and keyword == "Bearer" and constant_time_compare(credentials, token):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+@read_only
+def metrics(request):
+    """
+    Prometheus scrape target for this worker's request metrics.
+
+    Open to staff users and to ``Authorization: Bearer <PERF_METRICS_TOKEN>``.
+    """
+    if not settings.PERF_METRICS_ENABLED or not is_allowed(request):
+        # hides the endpoint without rendering the HTML 404 page
+        return HttpResponseNotFound()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,20 @@
+"""
+Real-time WebSocket hub.
+
+Connections authenticate with a DRF token or the Django session, are joined
+to per-landlord groups and can subscribe to further groups (e.g. a property).
+Messages published to a group are serialized once and fanned out to every
+subscriber through a per-connection bounded queue; the backend decides
+whether that fan-out stays in-process or goes through Redis pub/sub so that
+every worker delivers to its own subscribers.
+
+From synchronous Django code::
+
+    from udrems.realtime import broadcast, landlord_group
+
+    broadcast(landlord_group(profile.pk), "rent.paid", {"amount": "120.00"})
+"""
+from udrems.realtime.groups import landlord_group, property_group
+from udrems.realtime.hub import broadcast, get_hub
+
+__all__ = ["broadcast", "get_hub", "landlord_group", "property_group"]
@@ -0,0 +1,67 @@
+"""
+Authentication of WebSocket handshakes.
+
+Browsers cannot set headers on a WebSocket, so a DRF token is accepted from the
+``token`` query parameter as well as from ``Authorization: Token <key>``.
+Session authentication relies on the cookie and therefore also checks the
+``Origin`` header against ``ALLOWED_HOSTS`` to rule out cross-site hijacking.
+"""
+from importlib import import_module
+from types import SimpleNamespace
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.http.cookie import parse_cookie
+from django.http.request import split_domain_port, validate_host
+
+
+def get_headers(scope) -> Dict[str, str]:
+    return {
+        name.decode("latin1").lower(): value.decode("latin1")
+        for name, value in scope.get("headers", [])
+    }
+
+
+def get_token(scope, headers: Dict[str, str]) -> Optional[str]:
+    keyword, _, key = headers.get("authorization", "").partition(" ")
+    if keyword == "Token" and key.strip():
+        return key.strip()
+    query = parse_qs(scope.get("query_string", b"").decode("latin1"))
+    tokens = query.get("token")
+    return tokens[0] if tokens else None
+
+
+def is_same_origin(headers: Dict[str, str]) -> bool:
+    origin = headers.get("origin")
+    if not origin:
+        # non-browser clients do not send one, and cannot carry a victim's cookie
+        return True
+    domain, _ = split_domain_port(urlparse(origin).netloc)
+    return bool(domain) and validate_host(domain, settings.ALLOWED_HOSTS)
+
+
+def authenticate(scope):
+    """
+    Return the active user for a handshake ``scope`` or ``None``.
+    """
+    from udrems.users.authentication import get_session_user, get_token_user
+
+    headers = get_headers(scope)
+    key = get_token(scope, headers)
+    if key:
+        user = get_token_user(key)
+        if user is not None and user.is_active:
+            return user
+        return None
+
+    session_key = parse_cookie(headers.get("cookie", "")).get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not session_key or not is_same_origin(headers):
+        return None
+    engine = import_module(settings.SESSION_ENGINE)
+    # ``get_session_user`` only needs ``request.session``
+    request = SimpleNamespace(session=engine.SessionStore(session_key))
+    user = get_session_user(request)
+    return user if user.is_authenticated else None
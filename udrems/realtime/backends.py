@@ -0,0 +1,106 @@
+"""
+Fan-out backends for the real-time hub.
+
+A backend carries already-serialized messages to ``deliver(group, text)`` of
+every hub that may have subscribers: just the local one for ``InMemoryBackend``,
+every worker process for ``RedisBackend``. Neither touches the database.
+"""
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBackend:
+    """
+    Delivers within the current process, e.g. for a single worker or tests.
+    """
+
+    def __init__(self):
+        self.deliver = None
+        self.loop = None
+
+    async def start(self, deliver) -> None:
+        self.deliver = deliver
+        self.loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self.deliver = None
+
+    async def apublish(self, group: str, text: str) -> None:
+        if self.deliver is not None:
+            self.deliver(group, text)
+
+    def publish(self, group: str, text: str) -> None:
+        """Thread-safe publish for synchronous code."""
+        if self.deliver is None:
+            # nobody has connected to this process yet
+            return
+        self.loop.call_soon_threadsafe(self.deliver, group, text)
+
+
+class RedisBackend:
+    """
+    Delivers through Redis pub/sub so every worker reaches its own subscribers.
+
+    ``client`` is a synchronous ``redis.Redis`` (or anything with the same
+    ``publish``/``pubsub`` methods); the subscription is read on a daemon
+    thread and handed back to the event loop.
+    """
+
+    channel_prefix = "realtime:"
+
+    def __init__(self, client, poll_timeout: float = 1.0):
+        self.client = client
+        self.poll_timeout = poll_timeout
+        self._stopping = threading.Event()
+        self._thread = None
+
+    async def start(self, deliver) -> None:
+        loop = asyncio.get_running_loop()
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f"{self.channel_prefix}*")
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._listen,
+            args=(pubsub, loop, deliver),
+            name="realtime-redis",
+            daemon=True,
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+            self._thread = None
+
+    def _listen(self, pubsub, loop, deliver) -> None:
+        prefix_length = len(self.channel_prefix)
+        try:
+            while not self._stopping.is_set():
+                try:
+                    message = pubsub.get_message(timeout=self.poll_timeout)
+                except Exception:
+                    logger.exception("Reading the realtime Redis subscription failed")
+                    self._stopping.wait(self.poll_timeout)
+                    continue
+                if message is None or message["type"] != "pmessage":
+                    continue
+                group = _decode(message["channel"])[prefix_length:]
+                loop.call_soon_threadsafe(deliver, group, _decode(message["data"]))
+        finally:
+            pubsub.close()
+
+    async def apublish(self, group: str, text: str) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.publish, group, text
+        )
+
+    def publish(self, group: str, text: str) -> None:
+        self.client.publish(f"{self.channel_prefix}{group}", text)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
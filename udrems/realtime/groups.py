@@ -0,0 +1,32 @@
+from typing import Set
+
+from django.db.models import Q
+
+
+def landlord_group(landlord_profile_id) -> str:
+    return f"landlord.{landlord_profile_id}"
+
+
+def property_group(property_id) -> str:
+    return f"property.{property_id}"
+
+
+def groups_for_user(user) -> Set[str]:
+    """
+    Landlord groups a user belongs to: their own landlord profile and those of
+    the landlords they rent from or manage for. One query per connection.
+    """
+    from udrems.users.models import LandlordProfile
+
+    landlord_ids = (
+        LandlordProfile.objects.filter(
+            Q(user=user)
+            | Q(tenants__user=user)
+            | Q(tenant_of__user=user)
+            | Q(property_managers__user=user)
+            | Q(property_manager_of__user=user)
+        )
+        .values_list("id", flat=True)
+        .distinct()
+    )
+    return {landlord_group(landlord_id) for landlord_id in landlord_ids}
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Optional, Set
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from udrems.realtime.auth import authenticate
+from udrems.realtime.backends import InMemoryBackend, RedisBackend
+from udrems.realtime.groups import groups_for_user
+
+logger = logging.getLogger(__name__)
+
+# https://www.iana.org/assignments/websocket/websocket.xml#close-code-number
+CLOSE_TRY_AGAIN_LATER = 1013
+# rejects the handshake, the ASGI server answers it with HTTP 403
+CLOSE_UNAUTHORIZED = 4401
+
+
+class Connection:
+    """
+    One accepted WebSocket and its bounded outgoing queue.
+
+    Publishers only ever ``push`` without awaiting; a client that falls
+    ``queue_size`` messages behind is disconnected instead of buffering
+    without bound or slowing the fan-out down for everybody else.
+    """
+
+    def __init__(self, send, user, queue_size: int):
+        self.send = send
+        self.user = user
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.groups: Set[str] = set()
+        self.allowed_groups: Set[str] = set()
+        self.closed = False
+        self.close_code: Optional[int] = None
+
+    def push(self, text: str) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            logger.info("Closing slow realtime client %s", self.user)
+            self.close(CLOSE_TRY_AGAIN_LATER)
+            return False
+        return True
+
+    def close(self, code: Optional[int] = None) -> None:
+        """Stop the writer, sending a close frame if ``code`` is given."""
+        if self.closed:
+            return
+        self.closed = True
+        self.close_code = code
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def write(self) -> None:
+        try:
+            while True:
+                text = await self.queue.get()
+                if text is None:
+                    break
+                await self.send({"type": "websocket.send", "text": text})
+            if self.close_code is not None:
+                await self.send({"type": "websocket.close", "code": self.close_code})
+        except Exception:
+            # the client went away mid-send
+            self.closed = True
+
+
+class Hub:
+    def __init__(self, backend, queue_size: int = 100, authorizer=None):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.authorizer = authorizer
+        self.groups: Dict[str, Set[Connection]] = defaultdict(set)
+        self._started = False
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if not self._started:
+                await self.backend.start(self.deliver)
+                self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self.backend.stop()
+            self._started = False
+
+    def join(self, connection: Connection, group: str) -> None:
+        self.groups[group].add(connection)
+        connection.groups.add(group)
+
+    def leave(self, connection: Connection, group: str) -> None:
+        members = self.groups.get(group)
+        if members is not None:
+            members.discard(connection)
+            if not members:
+                del self.groups[group]
+        connection.groups.discard(group)
+
+    def deliver(self, group: str, text: str) -> int:
+        """Queue ``text`` for every local subscriber of ``group``."""
+        delivered = 0
+        for connection in list(self.groups.get(group, ())):
+            delivered += connection.push(text)
+        return delivered
+
+    @staticmethod
+    def encode(group: str, event: str, data) -> str:
+        return json.dumps({"group": group, "event": event, "data": data})
+
+    async def publish(self, group: str, event: str, data) -> None:
+        await self.backend.apublish(group, self.encode(group, event, data))
+
+    def publish_sync(self, group: str, event: str, data) -> None:
+        self.backend.publish(group, self.encode(group, event, data))
+
+    async def can_join(self, connection: Connection, group: str) -> bool:
+        if group in connection.allowed_groups:
+            return True
+        if self.authorizer is None:
+            return False
+        return await sync_to_async(self.authorizer)(connection.user, group)
+
+    async def handle(self, connection: Connection, text: Optional[str]) -> None:
+        if text == "ping":
+            connection.push("pong!")
+            return
+        try:
+            message = json.loads(text or "")
+            action, group = message["action"], str(message["group"])
+        except (ValueError, TypeError, KeyError):
+            connection.push(json.dumps({"type": "error", "error": "invalid message"}))
+            return
+
+        if action == "subscribe":
+            if await self.can_join(connection, group):
+                self.join(connection, group)
+                reply = {"type": "subscribed", "group": group}
+            else:
+                reply = {"type": "error", "error": "forbidden", "group": group}
+        elif action == "unsubscribe":
+            self.leave(connection, group)
+            reply = {"type": "unsubscribed", "group": group}
+        else:
+            reply = {"type": "error", "error": "unknown action"}
+        connection.push(json.dumps(reply))
+
+    async def serve(self, scope, receive, send) -> None:
+        """ASGI entry point for one WebSocket connection."""
+        event = await receive()
+        if event["type"] != "websocket.connect":
+            return
+        await self.start()
+
+        user = await sync_to_async(authenticate)(scope)
+        if user is None:
+            await send({"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+            return
+        allowed_groups = await sync_to_async(groups_for_user)(user)
+        await send({"type": "websocket.accept"})
+
+        connection = Connection(send, user, self.queue_size)
+        connection.allowed_groups = allowed_groups
+        for group in allowed_groups:
+            self.join(connection, group)
+        writer = asyncio.create_task(connection.write())
+        try:
+            while True:
+                event = await receive()
+                if event["type"] == "websocket.disconnect":
+                    break
+                if event["type"] == "websocket.receive" and not connection.closed:
+                    await self.handle(connection, event.get("text"))
+        finally:
+            for group in list(connection.groups):
+                self.leave(connection, group)
+            connection.close()
+            await writer
+
+
+def build_backend():
+    if settings.REALTIME_BACKEND == "redis":
+        import redis
+
+        return RedisBackend(redis.Redis.from_url(settings.REALTIME_REDIS_URL))
+    return InMemoryBackend()
+
+
+@lru_cache(maxsize=None)
+def get_hub() -> Hub:
+    authorizer = settings.REALTIME_GROUP_AUTHORIZER
+    return Hub(
+        build_backend(),
+        queue_size=settings.REALTIME_QUEUE_SIZE,
+        authorizer=import_string(authorizer) if authorizer else None,
+    )
+
+
+def broadcast(group: str, event: str, data) -> None:
+    """
+    Publish from synchronous code; ``data`` must be JSON serializable.
+    """
+    get_hub().publish_sync(group, event, data)
@@ -0,0 +1,59 @@
+import queue
+from fnmatch import fnmatchcase
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the ``publish``/``pubsub`` part of ``redis.Redis``.
+
+    Several backends sharing one instance behave like workers sharing a server.
+    """
+
+    def __init__(self):
+        self.subscriptions = []
+        self.published = 0
+
+    def publish(self, channel: str, data: str) -> int:
+        self.published += 1
+        receivers = 0
+        for pubsub in list(self.subscriptions):
+            receivers += pubsub.receive(channel.encode(), data.encode())
+        return receivers
+
+    def pubsub(self, ignore_subscribe_messages: bool = False):
+        pubsub = FakePubSub(self)
+        self.subscriptions.append(pubsub)
+        return pubsub
+
+
+class FakePubSub:
+    def __init__(self, server: FakeRedis):
+        self.server = server
+        self.patterns = []
+        self.messages: queue.Queue = queue.Queue()
+
+    def psubscribe(self, pattern: str) -> None:
+        self.patterns.append(pattern.encode())
+
+    def receive(self, channel: bytes, data: bytes) -> int:
+        for pattern in self.patterns:
+            if fnmatchcase(channel.decode(), pattern.decode()):
+                self.messages.put(
+                    {
+                        "type": "pmessage",
+                        "pattern": pattern,
+                        "channel": channel,
+                        "data": data,
+                    }
+                )
+                return 1
+        return 0
+
+    def get_message(self, timeout: float = 0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.server.subscriptions.remove(self)
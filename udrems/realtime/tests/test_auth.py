@@ -0,0 +1,71 @@
+import pytest
+from django.conf import settings
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from udrems.realtime.auth import authenticate
+from udrems.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def scope(headers=(), query_string=b""):
+    return {
+        "type": "websocket",
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "query_string": query_string,
+    }
+
+
+@pytest.fixture
+def session_cookie(user: User) -> str:
+    client = Client()
+    client.force_login(user)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def test_token_header(user: User):
+    token = Token.objects.create(user=user)
+
+    assert authenticate(scope([("authorization", f"Token {token.key}")])) == user
+
+
+def test_token_query_string(user: User):
+    token = Token.objects.create(user=user)
+
+    assert authenticate(scope(query_string=f"token={token.key}".encode())) == user
+
+
+def test_inactive_token_user(user: User):
+    token = Token.objects.create(user=user)
+    user.is_active = False
+    user.save()
+
+    assert authenticate(scope([("authorization", f"Token {token.key}")])) is None
+
+
+def test_session_cookie(user: User, session_cookie: str, settings):
+    settings.ALLOWED_HOSTS = ["udrems.com"]
+
+    assert authenticate(scope([("cookie", session_cookie)])) == user
+    assert (
+        authenticate(
+            scope([("cookie", session_cookie), ("origin", "https://udrems.com")])
+        )
+        == user
+    )
+
+
+def test_session_cookie_from_foreign_origin(session_cookie: str, settings):
+    settings.ALLOWED_HOSTS = ["udrems.com"]
+
+    assert (
+        authenticate(
+            scope([("cookie", session_cookie), ("origin", "https://evil.example")])
+        )
+        is None
+    )
+
+
+def test_anonymous():
+    assert authenticate(scope()) is None
@@ -0,0 +1,238 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.db import connection
+from rest_framework.authtoken.models import Token
+
+from udrems.realtime.backends import InMemoryBackend, RedisBackend
+from udrems.realtime.groups import landlord_group, property_group
+from udrems.realtime.hub import CLOSE_TRY_AGAIN_LATER, CLOSE_UNAUTHORIZED, Hub
+from udrems.realtime.tests.fakes import FakeRedis
+from udrems.users.models import LandlordProfile, TenantProfile
+from udrems.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def scope(token=None, query_token=None):
+    headers = []
+    if token:
+        headers.append((b"authorization", f"Token {token}".encode()))
+    return {
+        "type": "websocket",
+        "path": "/ws/",
+        "headers": headers,
+        "query_string": f"token={query_token}".encode() if query_token else b"",
+    }
+
+
+async def connect(hub: Hub, websocket_scope) -> ApplicationCommunicator:
+    communicator = ApplicationCommunicator(hub.serve, websocket_scope)
+    await communicator.send_input({"type": "websocket.connect"})
+    return communicator
+
+
+async def receive_json(communicator: ApplicationCommunicator):
+    event = await communicator.receive_output(timeout=1)
+    assert event["type"] == "websocket.send", event
+    return json.loads(event["text"])
+
+
+async def disconnect(communicator: ApplicationCommunicator):
+    await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+    await communicator.wait(timeout=1)
+
+
+@pytest.fixture
+def landlord():
+    user = UserFactory(account_type="landlord")
+    return user, Token.objects.create(user=user).key
+
+
+@pytest.fixture
+def tenant(landlord):
+    user = UserFactory(account_type="tenant")
+    TenantProfile.objects.get(user=user).landlords.add(
+        LandlordProfile.objects.get(user=landlord[0])
+    )
+    return user, Token.objects.create(user=user).key
+
+
+class TestHandshake:
+    def test_rejects_anonymous(self):
+        @async_to_sync
+        async def run():
+            communicator = await connect(Hub(InMemoryBackend()), scope())
+            return await communicator.receive_output(timeout=1)
+
+        assert run() == {"type": "websocket.close", "code": CLOSE_UNAUTHORIZED}
+
+    def test_rejects_unknown_token(self):
+        @async_to_sync
+        async def run():
+            communicator = await connect(Hub(InMemoryBackend()), scope("nope"))
+            return await communicator.receive_output(timeout=1)
+
+        assert run()["code"] == CLOSE_UNAUTHORIZED
+
+    def test_ping(self, landlord):
+        @async_to_sync
+        async def run():
+            communicator = await connect(
+                Hub(InMemoryBackend()), scope(query_token=landlord[1])
+            )
+            assert await communicator.receive_output(timeout=1) == {
+                "type": "websocket.accept"
+            }
+            await communicator.send_input({"type": "websocket.receive", "text": "ping"})
+            reply = await communicator.receive_output(timeout=1)
+            await disconnect(communicator)
+            return reply
+
+        assert run() == {"type": "websocket.send", "text": "pong!"}
+
+
+class TestGroups:
+    def test_landlord_and_tenants_share_the_landlord_group(self, landlord, tenant):
+        group = landlord_group(LandlordProfile.objects.get(user=landlord[0]).pk)
+        hub = Hub(InMemoryBackend())
+
+        @async_to_sync
+        async def run():
+            clients = [
+                await connect(hub, scope(landlord[1])),
+                await connect(hub, scope(tenant[1])),
+            ]
+            for client in clients:
+                await client.receive_output(timeout=1)
+            await hub.publish(group, "rent.due", {"amount": "100.00"})
+            messages = [await receive_json(client) for client in clients]
+            for client in clients:
+                await disconnect(client)
+            return messages
+
+        assert (
+            run()
+            == [{"group": group, "event": "rent.due", "data": {"amount": "100.00"}}] * 2
+        )
+        assert hub.groups == {}
+
+    def test_subscribe_needs_authorizer(self, landlord):
+        allowed = property_group(1)
+        hub = Hub(InMemoryBackend(), authorizer=lambda user, group: group == allowed)
+
+        @async_to_sync
+        async def run():
+            client = await connect(hub, scope(landlord[1]))
+            await client.receive_output(timeout=1)
+            replies = []
+            for group in (allowed, property_group(2)):
+                await client.send_input(
+                    {
+                        "type": "websocket.receive",
+                        "text": json.dumps({"action": "subscribe", "group": group}),
+                    }
+                )
+                replies.append(await receive_json(client))
+            await hub.publish(allowed, "viewing.booked", {})
+            replies.append(await receive_json(client))
+            await disconnect(client)
+            return replies
+
+        assert run() == [
+            {"type": "subscribed", "group": allowed},
+            {"type": "error", "error": "forbidden", "group": property_group(2)},
+            {"group": allowed, "event": "viewing.booked", "data": {}},
+        ]
+
+    def test_publish_does_not_query(self, landlord):
+        group = landlord_group(LandlordProfile.objects.get(user=landlord[0]).pk)
+        hub = Hub(InMemoryBackend())
+        publishing = []
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            if publishing:
+                queries.append(sql)
+            return execute(sql, params, many, context)
+
+        @async_to_sync
+        async def run():
+            client = await connect(hub, scope(landlord[1]))
+            await client.receive_output(timeout=1)
+            publishing.append(True)
+            for i in range(10):
+                await hub.publish(group, "tick", i)
+            messages = [await receive_json(client) for _ in range(10)]
+            publishing.clear()
+            await disconnect(client)
+            return messages
+
+        # sync_to_async runs the ORM on this thread, i.e. on this connection
+        with connection.execute_wrapper(record):
+            messages = run()
+
+        assert [message["data"] for message in messages] == list(range(10))
+        assert queries == []
+
+
+class TestBackpressure:
+    def test_slow_client_is_closed(self, landlord):
+        group = landlord_group(LandlordProfile.objects.get(user=landlord[0]).pk)
+        hub = Hub(InMemoryBackend(), queue_size=2)
+
+        @async_to_sync
+        async def run():
+            client = await connect(hub, scope(landlord[1]))
+            await client.receive_output(timeout=1)
+            (connection,) = hub.groups[group]
+            # the writer task has not had a chance to run between these
+            results = [hub.deliver(group, str(i)) for i in range(4)]
+            outputs = []
+            while not outputs or outputs[-1]["type"] != "websocket.close":
+                outputs.append(await client.receive_output(timeout=1))
+            await disconnect(client)
+            return results, connection, outputs
+
+        results, connection, outputs = run()
+        assert results == [1, 1, 0, 0]
+        assert connection.closed
+        assert outputs == [{"type": "websocket.close", "code": CLOSE_TRY_AGAIN_LATER}]
+
+
+class TestRedisBackend:
+    def test_fans_out_across_hubs(self, landlord):
+        group = landlord_group(LandlordProfile.objects.get(user=landlord[0]).pk)
+        server = FakeRedis()
+        publisher = Hub(RedisBackend(server, poll_timeout=0.01))
+        subscriber = Hub(RedisBackend(server, poll_timeout=0.01))
+
+        @async_to_sync
+        async def run():
+            await publisher.start()
+            client = await connect(subscriber, scope(landlord[1]))
+            await client.receive_output(timeout=1)
+            await publisher.publish(group, "maintenance.scheduled", {"day": "Mon"})
+            message = await receive_json(client)
+            await disconnect(client)
+            await asyncio.gather(publisher.stop(), subscriber.stop())
+            return message
+
+        assert run() == {
+            "group": group,
+            "event": "maintenance.scheduled",
+            "data": {"day": "Mon"},
+        }
+        assert server.published == 1
+        assert server.subscriptions == []
+
+    def test_publish_sync(self):
+        server = FakeRedis()
+        backend = RedisBackend(server)
+
+        Hub(backend).publish_sync("landlord.1", "ping", None)
+
+        assert server.published == 1
@@ -1,16 +1,30 @@
 from django.contrib.auth import get_user_model
 from rest_framework import status
+from rest_framework.authtoken.views import obtain_auth_token
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from udrems.users.models import ACCOUNT_TYPE_PROFILES
+from udrems.utils.conditional import make_etag, not_modified, set_validators
+from udrems.utils.threadpool import pooled_view
+from udrems.utils.transactions import AtomicWritesMixin
+from udrems.utils.uploads import CompleteUploadView, StartUploadView
+
 from .serializers import UserSerializer
 
 User = get_user_model()
 
 
-class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericViewSet):
+class UserViewSet(
+    AtomicWritesMixin,
+    RetrieveModelMixin,
+    ListModelMixin,
+    UpdateModelMixin,
+    GenericViewSet,
+):
     serializer_class = UserSerializer
     queryset = User.objects.all()
     lookup_field = "username"
@@ -21,5 +35,54 @@ class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericV
 
     @action(detail=False)
     def me(self, request):
-        serializer = UserSerializer(request.user, context={"request": request})
-        return Response(status=status.HTTP_200_OK, data=serializer.data)
+        user = request.user
+        # ``updated`` moves on every save of the user, and the host is part of
+        # the payload's ``url``
+        etag = make_etag(user.pk, user.updated, request.get_host())
+        response = not_modified(request, etag, user.updated)
+        if response is None:
+            serializer = UserSerializer(user, context={"request": request})
+            response = Response(status=status.HTTP_200_OK, data=serializer.data)
+        return set_validators(response, etag, user.updated)
+
+
+class ProfilePictureMixin:
+    def get_field(self):
+        profile_model = ACCOUNT_TYPE_PROFILES.get(self.request.user.account_type)
+        if profile_model is None:
+            raise ValidationError({"upload": "Staff users have no profile picture."})
+        return profile_model._meta.get_field("profile_picture")
+
+
+class ProfilePictureUploadView(ProfilePictureMixin, StartUploadView):
+    """``users/me/profile-picture/``: a presigned upload of a profile picture."""
+
+
+class ProfilePictureUploadCompleteView(ProfilePictureMixin, CompleteUploadView):
+    """``users/me/profile-picture/complete/``: sets the uploaded picture."""
+
+    def complete(self, request, name, data):
+        profile, _ = self.get_field().model.objects.get_or_create(user=request.user)
+        profile.profile_picture = name
+        profile.save(update_fields=["profile_picture"])
+        return Response({"profile_picture": profile.profile_picture.url})
+
+
+# Async variants served instead of the router's views when
+# ``USE_ASYNC_USER_VIEWS`` is set, see ``config.api_router``.
+async_user_list_view = pooled_view(
+    UserViewSet.as_view({"get": "list"}, basename="user", detail=False)
+)
+async_user_detail_view = pooled_view(
+    UserViewSet.as_view(
+        {"get": "retrieve", "put": "update", "patch": "partial_update"},
+        basename="user",
+        detail=True,
+    )
+)
+async_user_me_view = pooled_view(
+    UserViewSet.as_view({"get": "me"}, basename="user", detail=False)
+)
+# Argon2 logins hold their thread until the hash is done, keep them off the
+# shared sync thread, see ``udrems.users.hashers``
+async_obtain_auth_token = pooled_view(obtain_auth_token)
@@ -0,0 +1,135 @@
+"""
+Authentication that reads users and tokens from the cache.
+
+An authenticated request normally costs a token query joined to the user
+(``TokenAuthentication``) or a session query plus a user query
+(``AuthenticationMiddleware``). Here token keys map to user ids and users are
+kept by id in the default cache (Redis in production), so a warm request
+authenticates without touching the database. Sessions themselves use the
+``cached_db`` engine.
+
+``udrems.users.signals`` drops a cached user on every save or delete, which
+covers password and ``is_active`` changes, and a token mapping when the
+token is deleted. ``QuerySet.update()`` sends no signals: code updating users
+that way must call ``forget_user`` itself, or live with ``AUTH_CACHE_TIMEOUT``.
+"""
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from udrems.users.models import User
+
+KEY_PREFIX = "auth"
+
+
+def get_timeout() -> int:
+    return settings.AUTH_CACHE_TIMEOUT
+
+
+def user_key(user_id) -> str:
+    return f"{KEY_PREFIX}:user:{user_id}"
+
+
+def token_key(key: str) -> str:
+    # keys are credentials, keep them out of the cache in clear
+    return f"{KEY_PREFIX}:token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def forget_user(user_id) -> None:
+    cache.delete(user_key(user_id))
+
+
+def forget_token(key: str) -> None:
+    cache.delete(token_key(key))
+
+
+def remember_user(user: User) -> None:
+    cache.set(user_key(user.pk), user, get_timeout())
+
+
+def get_user(user_id) -> Optional[User]:
+    """The user with ``user_id``, active or not, or ``None``."""
+    user = cache.get(user_key(user_id))
+    if user is None:
+        user = User._default_manager.filter(pk=user_id).first()
+        if user is not None:
+            remember_user(user)
+    return user
+
+
+def get_token_user(key: str) -> Optional[User]:
+    """The user owning token ``key``, active or not, or ``None``."""
+    user_id = cache.get(token_key(key))
+    if user_id is not None:
+        return get_user(user_id)
+    token = Token.objects.select_related("user").filter(key=key).first()
+    if token is None:
+        return None
+    cache.set(token_key(key), token.user_id, get_timeout())
+    remember_user(token.user)
+    return token.user
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` answered from the cache when warm."""
+
+    def authenticate_credentials(self, key):
+        user = get_token_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        # stands in for the row, ``request.auth.key`` and ``.user`` still work
+        return user, Token(key=key, user=user)
+
+
+def get_session_user(request):
+    """
+    ``django.contrib.auth.get_user`` with the user read from the cache.
+
+    A cached user is only returned while the session still carries its
+    password hash and the user is active; anything else goes through
+    ``auth.get_user``, which also flushes sessions that no longer verify.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    if backend_path in settings.AUTHENTICATION_BACKENDS:
+        user = cache.get(user_key(user_id))
+        session_hash = request.session.get(auth.HASH_SESSION_KEY)
+        if (
+            user is not None
+            and user.is_active
+            and session_hash
+            and constant_time_compare(session_hash, user.get_session_auth_hash())
+        ):
+            return user
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        remember_user(user)
+    return user
+
+
+def get_request_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = get_session_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """``AuthenticationMiddleware`` resolving ``request.user`` via the cache."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_request_user(request))
@@ -27,8 +27,6 @@ class CustomUserCreationForm(UserCreationForm):
             "email",
             "first_name",
             "last_name",
-            "password1",
-            "password2",
         )
 
 
@@ -40,8 +38,6 @@ class CustomUserChangeForm(UserChangeForm):
             "email",
             "first_name",
             "last_name",
-            "password1",
-            "password2",
         )
 
 
@@ -53,8 +49,6 @@ class LandlordProfileForm(UserCreationForm):
             "email",
             "first_name",
             "last_name",
-            "password1",
-            "password2",
         )
 
 
@@ -66,8 +60,6 @@ class TenantProfileForm(UserCreationForm):
             "email",
             "first_name",
             "last_name",
-            "password1",
-            "password2",
         )
 
 
@@ -79,6 +71,4 @@ class PropertyManagerProfileForm(UserCreationForm):
             "email",
             "first_name",
             "last_name",
-            "password1",
-            "password2",
         )
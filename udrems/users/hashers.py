@@ -0,0 +1,189 @@
+"""
+Argon2 password hashing on a bounded pool of processes.
+
+Argon2 is slow on purpose: a hash costs a few hundred milliseconds of CPU and
+~100 MiB of memory. Hashed inline, a burst of logins through ``auth-token/``
+or allauth's ``account_login`` keeps a web worker's CPU busy and, under ASGI,
+the one thread Django 3.2 runs sync views on, so every other request waits.
+
+``PooledArgon2PasswordHasher`` hands ``encode`` and ``verify`` to
+``PASSWORD_HASHER_PROCESSES`` worker processes instead. At most
+``PASSWORD_HASHER_QUEUE`` more hashes wait for a free process; past that a
+hash fails at once with ``PasswordHasherBusy`` and
+``PasswordHasherBusyMiddleware`` answers ``503`` with ``Retry-After``, rather
+than letting the backlog grow until clients time out. The processes run at
+``PASSWORD_HASHER_NICE``, so requests get the CPU first. The calling thread
+still blocks until its hash is done, so with ``USE_ASYNC_USER_VIEWS`` the
+login views run on ``udrems.utils.threadpool``, off the shared sync thread;
+keep ``PASSWORD_HASHER_PROCESSES + PASSWORD_HASHER_QUEUE`` below
+``ASYNC_VIEW_THREADS`` so logins cannot take every pool thread.
+
+``PASSWORD_HASHER_PROCESSES = 0`` hashes inline, as Django does. Hashes keep
+the ``argon2`` algorithm name, existing ones verify unchanged.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from udrems.perf.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER_SECONDS = 1
+
+pending_gauge = registry.gauge(
+    "udrems_password_hasher_pending",
+    "Password hashes running or waiting for a process.",
+)
+rejected = registry.counter(
+    "udrems_password_hasher_rejected",
+    "Password hashes refused because the queue was full.",
+)
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _start_worker() -> None:
+    # hashes yield the CPU to the web workers serving everything else
+    os.nice(settings.PASSWORD_HASHER_NICE)
+    django.setup()
+
+
+class HashingPool:
+    """
+    Runs functions on ``processes`` worker processes, with at most
+    ``queue`` calls waiting for one.
+    """
+
+    def __init__(self, processes: int, queue: int):
+        if processes < 1 or queue < 0:
+            raise ValueError(f"Bad hashing pool sizes: {processes}, {queue}")
+        self.processes = processes
+        self.queue = queue
+        self.pid = os.getpid()
+        self.pending = 0
+        self._lock = threading.Lock()
+        # forking a worker that runs threads can copy a held lock into the
+        # child, the fork server starts processes from a clean one
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("forkserver"),
+            # hashers may be defined in, and configured by, installed apps
+            initializer=_start_worker,
+        )
+
+    def submit(self, func, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.processes + self.queue:
+                rejected.inc()
+                raise PasswordHasherBusy(
+                    f"{self.pending} password hashes pending, try again later"
+                )
+            self.pending += 1
+            pending_gauge.set(self.pending)
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, func, *args):
+        return self.submit(func, *args).result()
+
+    def _done(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self.pending -= 1
+            pending_gauge.set(self.pending)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[HashingPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[HashingPool]:
+    """This process's pool, ``None`` when hashing runs inline."""
+    global _pool
+    if not settings.PASSWORD_HASHER_PROCESSES:
+        return None
+    pool = _pool
+    if pool is None or pool.pid != os.getpid():
+        with _pool_lock:
+            # a pool inherited through a fork has no processes of its own
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = HashingPool(
+                    settings.PASSWORD_HASHER_PROCESSES, settings.PASSWORD_HASHER_QUEUE
+                )
+            pool = _pool
+    return pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and pool.pid == os.getpid():
+        pool.close()
+
+
+def _run(hasher: "PooledArgon2PasswordHasher", method: str, *args):
+    # in the worker process: the plain Argon2 implementation, with the
+    # parameters of the hasher's class
+    return getattr(super(PooledArgon2PasswordHasher, hasher), method)(*args)
+
+
+class PooledArgon2PasswordHasher(Argon2PasswordHasher):
+    """``Argon2PasswordHasher`` computing hashes on the hashing pool."""
+
+    def _call(self, method: str, *args):
+        pool = get_pool()
+        if pool is None:
+            return _run(self, method, *args)
+        try:
+            return pool.run(_run, self, method, *args)
+        except BrokenProcessPool:
+            # a worker died (e.g. killed for memory), start over next time
+            logger.exception("Password hashing pool broke")
+            close_pool()
+            raise
+
+    def encode(self, password, salt):
+        return self._call("encode", password, salt)
+
+    def verify(self, password, encoded):
+        return self._call("verify", password, encoded)
+
+
+class PasswordHasherBusyMiddleware(MiddlewareMixin):
+    """Answers ``503`` when the hashing pool refused a password hash."""
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, PasswordHasherBusy):
+            return None
+        response = HttpResponse(
+            "Too many logins at the moment, please try again.",
+            status=503,
+            content_type="text/plain",
+        )
+        response["Retry-After"] = str(RETRY_AFTER_SECONDS)
+        # expected under load: keep a storm of these out of the error log
+        # (and Sentry), the rejected counter tracks them
+        logger.warning("Refused a password hash for %s: %s", request.path, exception)
+        response._has_been_logged = True
+        return response
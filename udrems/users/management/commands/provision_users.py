@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from udrems.users.provisioning import (
+    ACCOUNT_TYPES,
+    ProvisioningResult,
+    provision_users,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk create users and their profiles from a CSV or JSON Lines file. "
+        "Expects a username column and optionally email, name, first_name, "
+        "last_name, password, account_type and the profile address fields."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file, '-' for stdin")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="Input format, guessed from the file extension by default",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--account-type",
+            default="tenant",
+            choices=sorted(ACCOUNT_TYPES),
+            help="Account type for rows without one",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or Path(path).suffix.lstrip(".").lower()
+        if fmt not in ("csv", "jsonl"):
+            raise CommandError("Cannot guess the input format, pass --format")
+
+        if path == "-":
+            result = self.provision(sys.stdin, fmt, options)
+        else:
+            with open(path, newline="", encoding="utf-8") as stream:
+                result = self.provision(stream, fmt, options)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created} users, skipped {result.skipped} "
+                f"in {result.elapsed:.1f}s ({result.rows_per_second:.0f} rows/s)"
+            )
+        )
+
+    def provision(self, stream, fmt, options) -> ProvisioningResult:
+        try:
+            return provision_users(
+                read_rows(stream, fmt),
+                batch_size=options["batch_size"],
+                default_account_type=options["account_type"],
+                progress=self.report_progress,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def report_progress(self, result: ProvisioningResult) -> None:
+        self.stdout.write(
+            f"{result.created + result.skipped} rows "
+            f"({result.rows_per_second:.0f} rows/s)"
+        )
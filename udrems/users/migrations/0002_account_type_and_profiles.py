@@ -0,0 +1,113 @@
+# Generated by Django 3.2.11 on 2026-10-18 11:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LandlordProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(blank=True, max_length=20)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('city', models.CharField(blank=True, max_length=255)),
+                ('state', models.CharField(blank=True, max_length=255)),
+                ('zip_code', models.CharField(blank=True, max_length=255)),
+                ('country', models.CharField(blank=True, max_length=255)),
+                ('profile_picture', models.ImageField(blank=True, upload_to='profile_pics')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertyManagerProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(blank=True, max_length=20)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('city', models.CharField(blank=True, max_length=255)),
+                ('state', models.CharField(blank=True, max_length=255)),
+                ('zip_code', models.CharField(blank=True, max_length=255)),
+                ('country', models.CharField(blank=True, max_length=255)),
+                ('profile_picture', models.ImageField(blank=True, upload_to='profile_pics')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('landlords', models.ManyToManyField(related_name='property_manager_of', to='users.LandlordProfile')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='account_type',
+            field=models.CharField(choices=[('landlord', 'Landlord'), ('tenant', 'Tenants'), ('property_manager', 'Property Managers'), ('staff', 'Staffs')], default='tenant', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='first_name',
+            field=models.CharField(blank=True, max_length=150, verbose_name='first name'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='last_name',
+            field=models.CharField(blank=True, max_length=150, verbose_name='last name'),
+        ),
+        migrations.CreateModel(
+            name='TenantProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(blank=True, max_length=20)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('city', models.CharField(blank=True, max_length=255)),
+                ('state', models.CharField(blank=True, max_length=255)),
+                ('zip_code', models.CharField(blank=True, max_length=255)),
+                ('country', models.CharField(blank=True, max_length=255)),
+                ('profile_picture', models.ImageField(blank=True, upload_to='profile_pics')),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('landlords', models.ManyToManyField(related_name='tenant_of', to='users.LandlordProfile')),
+                ('property_managers', models.ManyToManyField(related_name='managed_tenants', to='users.PropertyManagerProfile')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tenant_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='propertymanagerprofile',
+            name='tenants',
+            field=models.ManyToManyField(related_name='property_manager_of', to='users.TenantProfile'),
+        ),
+        migrations.AddField(
+            model_name='propertymanagerprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='property_manager_profile', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='landlordprofile',
+            name='property_managers',
+            field=models.ManyToManyField(related_name='managed_landlords', to='users.PropertyManagerProfile'),
+        ),
+        migrations.AddField(
+            model_name='landlordprofile',
+            name='tenants',
+            field=models.ManyToManyField(related_name='rented_from', to='users.TenantProfile'),
+        ),
+        migrations.AddField(
+            model_name='landlordprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='landlord_profile', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -18,6 +18,35 @@ class User(AbstractUser):
     account_type = models.CharField(
         choices=ACCOUNT_TYPE, default="tenant", max_length=20
     )
+    #: Validator for conditional requests on the user API
+    updated = models.DateTimeField(auto_now=True)
+
+    #: Shown wherever the user is nested, e.g. as the author of core content
+    PUBLIC_FIELDS = ("username", "name")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # remember the stored account type so saves can tell when it changed
+        if "account_type" in field_names:
+            user._loaded_account_type = user.account_type
+        if all(name in field_names for name in cls.PUBLIC_FIELDS):
+            user._loaded_public_fields = user.public_fields
+        return user
+
+    @property
+    def account_type_changed(self) -> bool:
+        """Whether ``account_type`` differs from the last loaded or saved value."""
+        return self.account_type != getattr(self, "_loaded_account_type", None)
+
+    @property
+    def public_fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.PUBLIC_FIELDS)
+
+    @property
+    def public_fields_changed(self) -> bool:
+        """Whether a public field differs from the last loaded or saved value."""
+        return self.public_fields != getattr(self, "_loaded_public_fields", None)
 
     def get_absolute_url(self):
         """Get url for user's detail view.
@@ -82,11 +111,13 @@ class LandlordProfile(Profile):
     3. Can have many staffs
     """
 
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="landlord_profile"
+    )
     property_managers = models.ManyToManyField(
-        "PropertyManager", related_name="property_managers"
+        "PropertyManagerProfile", related_name="managed_landlords"
     )
-    tenants = models.ManyToManyField("Tenant", related_name="tenants")
+    tenants = models.ManyToManyField("TenantProfile", related_name="rented_from")
     # staffs = models.ManyToManyField("users.Staff", related_name="staffs")
 
 
@@ -98,10 +129,12 @@ class TenantProfile(Profile):
     3. Can have many staffs
     """
 
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
-    landlords = models.ManyToManyField(LandlordProfile, related_name="landlords")
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="tenant_profile"
+    )
+    landlords = models.ManyToManyField(LandlordProfile, related_name="tenant_of")
     property_managers = models.ManyToManyField(
-        "PropertyManager", related_name="property_managers"
+        "PropertyManagerProfile", related_name="managed_tenants"
     )
 
 
@@ -113,7 +146,19 @@ class PropertyManagerProfile(Profile):
     3. Can have many staffs
     """
 
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
-    landlords = models.ManyToManyField(LandlordProfile, related_name="landlords")
-    tenants = models.ManyToManyField(TenantProfile, related_name="tenants")
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="property_manager_profile"
+    )
+    landlords = models.ManyToManyField(
+        LandlordProfile, related_name="property_manager_of"
+    )
+    tenants = models.ManyToManyField(TenantProfile, related_name="property_manager_of")
     # staffs = models.ManyToManyField("users.Staff", related_name="staffs")
+
+
+# profile model created for each account type, staff have none
+ACCOUNT_TYPE_PROFILES = {
+    "landlord": LandlordProfile,
+    "tenant": TenantProfile,
+    "property_manager": PropertyManagerProfile,
+}
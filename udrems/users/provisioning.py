@@ -0,0 +1,154 @@
+"""
+Bulk provisioning of users and their account-type profiles.
+
+Rows are streamed from CSV or JSON Lines and written with ``bulk_create`` in
+fixed-size batches, so memory stays flat however large the input is. Unlike
+``User.objects.create`` this never sends ``pre_save``/``post_save``: the
+profile rows the signals in ``udrems.users.signals`` would create one by one
+are bulk created here instead.
+"""
+import csv
+import json
+import secrets
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.db import transaction
+
+from udrems.users.models import ACCOUNT_TYPE_PROFILES, User
+
+ACCOUNT_TYPES = {account_type for account_type, _ in User.ACCOUNT_TYPE}
+USER_FIELDS = ("email", "name", "first_name", "last_name")
+PROFILE_FIELDS = ("phone_number", "address", "city", "state", "zip_code", "country")
+
+
+@dataclass
+class ProvisioningResult:
+    created: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.elapsed:
+            return 0.0
+        return (self.created + self.skipped) / self.elapsed
+
+
+def read_rows(stream: IO[str], format: str) -> Iterator[Dict[str, str]]:
+    """
+    Lazily yield one dict per CSV row or JSON line.
+    """
+    if format == "csv":
+        yield from csv.DictReader(stream)
+    elif format == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported format {format!r}, expected csv or jsonl")
+
+
+def build_user(row: Dict[str, str], default_account_type: str) -> User:
+    username = (row.get("username") or "").strip()
+    if not username:
+        raise ValueError(f"Missing username in row {row!r}")
+    account_type = row.get("account_type") or default_account_type
+    if account_type not in ACCOUNT_TYPES:
+        raise ValueError(f"Unknown account_type {account_type!r} for {username!r}")
+    user = User(
+        username=username,
+        account_type=account_type,
+        **{field: row.get(field) or "" for field in USER_FIELDS},
+    )
+    # Hashing is the expensive part of an import, so rows without a password
+    # get an unusable one and go through the password reset flow. Same format
+    # as ``make_password(None)`` with one ``urandom`` call instead of 40.
+    password = row.get("password")
+    if password:
+        user.password = make_password(password)
+    else:
+        user.password = UNUSABLE_PASSWORD_PREFIX + secrets.token_hex(20)
+    return user
+
+
+def build_profile(user: User, row: Dict[str, str]):
+    profile_model = ACCOUNT_TYPE_PROFILES.get(user.account_type)
+    if profile_model is None:
+        return None
+    return profile_model(
+        user=user, **{field: row.get(field) or "" for field in PROFILE_FIELDS}
+    )
+
+
+def _provision_batch(
+    rows: List[Dict[str, str]], default_account_type: str, result: ProvisioningResult
+) -> None:
+    users = {}
+    for row in rows:
+        user = build_user(row, default_account_type)
+        if user.username in users:
+            result.skipped += 1
+            continue
+        users[user.username] = (user, row)
+
+    existing = set(
+        User.objects.filter(username__in=users).values_list("username", flat=True)
+    )
+    result.skipped += len(existing)
+    new = [users[username] for username in users if username not in existing]
+    if not new:
+        return
+
+    with transaction.atomic():
+        created = User.objects.bulk_create([user for user, _ in new])
+        if any(user.pk is None for user in created):
+            # backends that cannot return ids from a bulk insert (SQLite)
+            ids = dict(
+                User.objects.filter(
+                    username__in=[user.username for user in created]
+                ).values_list("username", "id")
+            )
+            for user in created:
+                user.pk = ids[user.username]
+
+        profiles: Dict[type, list] = {}
+        for user, row in new:
+            profile = build_profile(user, row)
+            if profile is not None:
+                profiles.setdefault(type(profile), []).append(profile)
+        for profile_model, objs in profiles.items():
+            profile_model.objects.bulk_create(objs)
+
+    result.created += len(created)
+
+
+def provision_users(
+    rows: Iterable[Dict[str, str]],
+    batch_size: int = 1000,
+    default_account_type: str = "tenant",
+    progress=None,
+) -> ProvisioningResult:
+    """
+    Create a ``User`` and its matching profile for every row.
+
+    Usernames that already exist are skipped. Each batch is its own
+    transaction, costs a fixed number of queries and is reported to
+    ``progress(result)`` when given.
+    """
+    result = ProvisioningResult()
+    started = time.perf_counter()
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        _provision_batch(batch, default_account_type, result)
+        result.elapsed = time.perf_counter() - started
+        if progress is not None:
+            progress(result)
+    result.elapsed = time.perf_counter() - started
+    return result
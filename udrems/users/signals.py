@@ -3,57 +3,46 @@ Signals for creating and updating users.
 
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
 
-from udrems.users.models import (
-    LandlordProfile,
-    PropertyManagerProfile,
-    TenantProfile,
-    User,
-)
+from udrems.users.authentication import forget_token, forget_user
+from udrems.users.models import ACCOUNT_TYPE_PROFILES, User
 
 
 @receiver(post_save, sender=User)
-def create_and_update_user_profile(sender, instance, created, **kwargs):
+def create_profile_for_account_type(sender, instance, created, update_fields, **kwargs):
     """
-    Create a profile for a new user.
+    Create the profile for a new user, or for an existing user whose
+    account type changed. Any other save, e.g. ``last_login`` on every
+    login, costs no queries here.
     """
-    if created:
-        if instance.account_type == "landlord":
-            LandlordProfile.objects.create(user=instance)
-        elif instance.account_type == "tenant":
-            TenantProfile.objects.create(user=instance)
-        elif instance.account_type == "property_managers":
-            PropertyManagerProfile.objects.create(user=instance)
+    if update_fields is not None and "account_type" not in update_fields:
+        return
+    if not created and not instance.account_type_changed:
+        return
+
+    profile_model = ACCOUNT_TYPE_PROFILES.get(instance.account_type)
+    if profile_model is not None:
+        if created:
+            profile_model.objects.create(user=instance)
+        else:
+            # switching back to an earlier account type keeps its profile
+            profile_model.objects.get_or_create(user=instance)
+    instance._loaded_account_type = instance.account_type
 
 
-# update profile
 @receiver(post_save, sender=User)
-def update_user_profile(sender, instance, **kwargs):
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
     """
-    Update a profile for a user.
+    Drop the user cached for authentication, so a new password, a
+    deactivation or a deletion applies from the next request on.
     """
-    if instance.account_type == "landlord":
-        instance.landlord.save()
-    elif instance.account_type == "tenant":
-        instance.tenant.save()
-    elif instance.account_type == "property_managers":
-        instance.property_manager.save()
+    forget_user(instance.pk)
 
 
-# signal for switching account type and created profile
-@receiver(pre_save, sender=User)
-def create_profile_on_account_type_change(sender, instance, **kwargs):
-    """
-    Create a profile for a new user.
-    """
-    if instance.account_type == "landlord":
-        if not instance.landlord_profile:
-            LandlordProfile.objects.create(user=instance)
-    elif instance.account_type == "tenant":
-        if not instance.tenant_profile:
-            TenantProfile.objects.create(user=instance)
-    elif instance.account_type == "property_manager":
-        if not instance.property_manager_profile:
-            PropertyManagerProfile.objects.create(user=instance)
+@receiver(post_delete, sender=Token)
+def forget_cached_token(sender, instance, **kwargs):
+    forget_token(instance.key)
@@ -1,11 +1,11 @@
 from django.contrib.auth import get_user_model
 
-from config import celery_app
+from config.celery_app import fire_and_forget
 
 User = get_user_model()
 
 
-@celery_app.task()
+@fire_and_forget()
 def get_users_count():
     """A pointless Celery task to demonstrate usage."""
     return User.objects.count()
@@ -0,0 +1,89 @@
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from udrems.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def token(user: User) -> Token:
+    return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def token_client(token: Token) -> APIClient:
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+class TestCachedTokenAuthentication:
+    def test_warm_request_skips_the_token_query(
+        self, token_client: APIClient, django_assert_num_queries
+    ):
+        assert token_client.get(reverse("api:user-me")).status_code == 200
+
+        with django_assert_num_queries(0):
+            response = token_client.get(reverse("api:user-me"))
+
+        assert response.status_code == 200
+
+    def test_deleted_token(self, token: Token, token_client: APIClient):
+        token_client.get(reverse("api:user-me"))
+        token.delete()
+
+        assert token_client.get(reverse("api:user-me")).status_code == 403
+
+    def test_deactivated_user(self, user: User, token_client: APIClient):
+        token_client.get(reverse("api:user-me"))
+        user.is_active = False
+        user.save()
+
+        assert token_client.get(reverse("api:user-me")).status_code == 403
+
+    def test_sees_updates(self, user: User, token_client: APIClient):
+        token_client.get(reverse("api:user-me"))
+        user.name = "Renamed"
+        user.save()
+
+        assert token_client.get(reverse("api:user-me")).data["name"] == "Renamed"
+
+    def test_unknown_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token nope")
+
+        assert client.get(reverse("api:user-me")).status_code == 403
+
+
+class TestCachedSessionUser:
+    @pytest.fixture
+    def client(self, client, user: User):
+        client.force_login(user)
+        return client
+
+    def test_warm_request_skips_session_and_user_queries(
+        self, client, django_assert_num_queries
+    ):
+        assert client.get(reverse("api:user-me")).status_code == 200
+
+        with django_assert_num_queries(0):
+            response = client.get(reverse("api:user-me"))
+
+        assert response.status_code == 200
+
+    def test_password_change_logs_out(self, client, user: User):
+        client.get(reverse("api:user-me"))
+        user.set_password("a new password")
+        user.save()
+
+        assert client.get(reverse("api:user-me")).status_code == 403
+
+    def test_deactivated_user(self, client, user: User):
+        client.get(reverse("api:user-me"))
+        user.is_active = False
+        user.save()
+
+        assert client.get(reverse("api:user-me")).status_code == 403
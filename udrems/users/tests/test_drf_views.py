@@ -1,8 +1,26 @@
+import json
+import threading
+from io import BytesIO
+
 import pytest
+import requests
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.http import HttpResponse
 from django.test import RequestFactory
+from django.urls import reverse
+from PIL import Image as PILImage
+from rest_framework.test import APIClient
 
-from udrems.users.api.views import UserViewSet
-from udrems.users.models import User
+from udrems.users.api.views import (
+    UserViewSet,
+    async_user_detail_view,
+    async_user_list_view,
+    async_user_me_view,
+)
+from udrems.users.models import TenantProfile, User
+from udrems.users.tests.factories import UserFactory
+from udrems.utils.threadpool import pooled_view
 
 pytestmark = pytest.mark.django_db
 
@@ -31,3 +49,112 @@ class TestUserViewSet:
             "name": user.name,
             "url": f"http://testserver/api/users/{user.username}/",
         }
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncUserViews:
+    def test_me(self, user: User, rf: RequestFactory):
+        request = rf.get("/api/users/me/")
+        request.user = user
+
+        response = async_to_sync(async_user_me_view)(request)
+
+        assert response.status_code == 200
+        assert json.loads(response.content)["username"] == user.username
+
+    def test_retrieve(self, user: User, rf: RequestFactory):
+        request = rf.get(f"/api/users/{user.username}/")
+        request.user = user
+
+        response = async_to_sync(async_user_detail_view)(
+            request, username=user.username
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.content)["name"] == user.name
+
+    def test_list_only_contains_self(self, user: User, rf: RequestFactory):
+        UserFactory()
+        request = rf.get("/api/users/")
+        request.user = user
+
+        response = async_to_sync(async_user_list_view)(request)
+
+        assert [row["username"] for row in json.loads(response.content)] == [
+            user.username
+        ]
+
+    def test_runs_on_pool_in_atomic_block(self, rf: RequestFactory):
+        seen = {}
+
+        def view(request):
+            seen["thread"] = threading.current_thread().name
+            seen["atomic"] = connection.in_atomic_block
+            return HttpResponse()
+
+        async_to_sync(pooled_view(view))(rf.get("/"))
+
+        assert seen["thread"].startswith("async-view")
+        assert seen["atomic"] == connection.settings_dict["ATOMIC_REQUESTS"]
+
+
+class TestMeConditional:
+    def test_not_modified(self, user: User):
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("api:user-me")
+        etag = client.get(url)["ETag"]
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+
+    def test_changes_when_user_is_saved(self, user: User):
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("api:user-me")
+        etag = client.get(url)["ETag"]
+
+        user.name = "Renamed"
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data["name"] == "Renamed"
+
+
+class TestProfilePictureUpload:
+    def start(self, client: APIClient, content: bytes):
+        return client.post(
+            reverse("api:profile-picture-upload"),
+            {"filename": "me.png", "content_type": "image/png", "size": len(content)},
+            format="json",
+        )
+
+    def test_staff_have_no_profile(self):
+        client = APIClient()
+        client.force_authenticate(UserFactory(account_type="staff"))
+
+        response = self.start(client, b"\x89PNG")
+
+        assert response.status_code == 400
+        assert "Staff" in response.data["upload"]
+
+    def test_sets_the_profile_picture(self, user: User, media_bucket):
+        client = APIClient()
+        client.force_authenticate(user)
+        buffer = BytesIO()
+        PILImage.new("RGB", (40, 30)).save(buffer, "PNG")
+        upload = self.start(client, buffer.getvalue()).data
+        requests.put(upload["url"], data=buffer.getvalue(), headers=upload["headers"])
+
+        response = client.post(
+            reverse("api:profile-picture-upload-complete"),
+            {"upload": upload["upload"]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        profile = TenantProfile.objects.get(user=user)
+        assert profile.profile_picture.name.startswith("profile_pics/")
+        assert response.data["profile_picture"] == profile.profile_picture.url
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    check_password,
+    make_password,
+)
+from rest_framework.test import APIClient
+
+from udrems.users import hashers
+from udrems.users.hashers import (
+    HashingPool,
+    PasswordHasherBusy,
+    PooledArgon2PasswordHasher,
+)
+from udrems.users.models import User
+
+
+class CheapArgon2PasswordHasher(PooledArgon2PasswordHasher):
+    time_cost = 1
+    memory_cost = 64
+    parallelism = 1
+
+
+HASHER = "udrems.users.tests.test_hashers.CheapArgon2PasswordHasher"
+
+
+@pytest.fixture
+def pooled(settings):
+    settings.PASSWORD_HASHERS = [HASHER]
+    settings.PASSWORD_HASHER_PROCESSES = 1
+    settings.PASSWORD_HASHER_QUEUE = 1
+    hashers.close_pool()
+    yield
+    hashers.close_pool()
+
+
+@pytest.mark.usefixtures("pooled")
+class TestPooledArgon2PasswordHasher:
+    def test_hashes_on_the_pool(self):
+        encoded = make_password("secret")
+
+        assert encoded.startswith("argon2$argon2id$v=19$m=64,t=1,p=1$")
+        assert check_password("secret", encoded)
+        assert not check_password("wrong", encoded)
+        assert hashers.get_pool().pending == 0
+
+    def test_verifies_inline_hashes(self):
+        encoded = Argon2PasswordHasher().encode("secret", "saltsaltsalt")
+
+        assert CheapArgon2PasswordHasher().verify("secret", encoded)
+
+    def test_inline_without_processes(self, settings):
+        settings.PASSWORD_HASHER_PROCESSES = 0
+
+        assert hashers.get_pool() is None
+        assert check_password("secret", make_password("secret"))
+
+    def test_fails_fast_when_full(self):
+        pool = hashers.get_pool()
+        running = [pool.submit(time.sleep, 0.5), pool.submit(time.sleep, 0.5)]
+        before = hashers.rejected.value()
+
+        with pytest.raises(PasswordHasherBusy):
+            make_password("secret")
+
+        assert hashers.rejected.value() == before + 1
+        for future in running:
+            future.result()
+        assert pool.pending == 0
+        assert check_password("secret", make_password("secret"))
+
+
+def test_bad_sizes():
+    with pytest.raises(ValueError):
+        HashingPool(0, 4)
+
+
+@pytest.mark.django_db
+def test_busy_logins_get_503(user: User, settings, monkeypatch):
+    settings.PASSWORD_HASHERS = [HASHER]
+    settings.PASSWORD_HASHER_PROCESSES = 0
+
+    def busy(self, password, encoded):
+        raise PasswordHasherBusy
+
+    monkeypatch.setattr(CheapArgon2PasswordHasher, "verify", busy)
+    user.set_password("secret")
+    user.save()
+
+    response = APIClient().post(
+        "/auth-token/",
+        {"username": user.username, "password": "secret"},
+    )
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == "1"
@@ -0,0 +1,115 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from udrems.users.models import (
+    LandlordProfile,
+    PropertyManagerProfile,
+    TenantProfile,
+    User,
+)
+from udrems.users.provisioning import provision_users, read_rows
+from udrems.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+CSV = """username,email,account_type,city,password
+ada,ada@example.com,landlord,Lagos,
+bola,bola@example.com,tenant,Abuja,s3cret-pass
+chi,chi@example.com,property_manager,,
+dayo,dayo@example.com,staff,,
+"""
+
+
+class TestReadRows:
+    def test_csv(self):
+        rows = list(read_rows(io.StringIO(CSV), "csv"))
+
+        assert [row["username"] for row in rows] == ["ada", "bola", "chi", "dayo"]
+
+    def test_jsonl_skips_blank_lines(self):
+        stream = io.StringIO('{"username": "ada"}\n\n{"username": "bola"}\n')
+
+        assert [row["username"] for row in read_rows(stream, "jsonl")] == [
+            "ada",
+            "bola",
+        ]
+
+    def test_is_lazy(self):
+        def lines():
+            yield '{"username": "ada"}\n'
+            raise AssertionError("read past the first row")
+
+        assert next(read_rows(lines(), "jsonl")) == {"username": "ada"}
+
+
+class TestProvisionUsers:
+    def test_creates_users_and_profiles(self):
+        result = provision_users(read_rows(io.StringIO(CSV), "csv"), batch_size=3)
+
+        assert result.created == 4
+        assert LandlordProfile.objects.get(user__username="ada").city == "Lagos"
+        assert TenantProfile.objects.filter(user__username="bola").exists()
+        assert PropertyManagerProfile.objects.filter(user__username="chi").exists()
+        assert User.objects.get(username="dayo").account_type == "staff"
+
+    def test_passwords(self):
+        provision_users(read_rows(io.StringIO(CSV), "csv"))
+
+        assert User.objects.get(username="bola").check_password("s3cret-pass")
+        assert not User.objects.get(username="ada").has_usable_password()
+
+    def test_skips_existing_and_duplicate_usernames(self):
+        UserFactory(username="ada")
+        rows = [{"username": "ada"}, {"username": "bola"}, {"username": "bola"}]
+
+        result = provision_users(rows)
+
+        assert (result.created, result.skipped) == (1, 2)
+        assert TenantProfile.objects.filter(user__username="bola").count() == 1
+
+    def test_queries_per_batch_are_constant(self, django_assert_max_num_queries):
+        rows = [
+            {"username": f"user{i}", "account_type": account_type}
+            for i, account_type in enumerate(["landlord", "tenant"] * 25)
+        ]
+
+        # existing usernames, savepoint, users, id lookup, two profile
+        # inserts and release; no per-row queries. Kept under SQLite's bound
+        # parameter limit so the user insert is not split.
+        with django_assert_max_num_queries(7):
+            result = provision_users(rows, batch_size=50)
+
+        assert result.created == 50
+        assert LandlordProfile.objects.count() == TenantProfile.objects.count() == 25
+
+    def test_rejects_unknown_account_type(self):
+        with pytest.raises(ValueError):
+            provision_users([{"username": "ada", "account_type": "owner"}])
+
+
+class TestProvisionUsersCommand:
+    def test_jsonl_file(self, tmp_path):
+        path = tmp_path / "users.jsonl"
+        path.write_text(
+            "\n".join(
+                json.dumps({"username": f"tenant{i}", "email": f"t{i}@example.com"})
+                for i in range(5)
+            )
+        )
+        out = io.StringIO()
+
+        call_command("provision_users", str(path), "--batch-size", "2", stdout=out)
+
+        assert TenantProfile.objects.count() == 5
+        assert "Created 5 users, skipped 0" in out.getvalue()
+        assert "rows/s" in out.getvalue()
+
+    def test_unknown_format(self, tmp_path):
+        path = tmp_path / "users.xlsx"
+        path.write_text("")
+
+        with pytest.raises(CommandError):
+            call_command("provision_users", str(path))
@@ -0,0 +1,97 @@
+"""
+Query cost of the profile lifecycle in ``udrems.users.signals``.
+"""
+import pytest
+from django.contrib.auth.models import update_last_login
+
+from udrems.users.models import (
+    LandlordProfile,
+    PropertyManagerProfile,
+    TenantProfile,
+    User,
+)
+from udrems.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    "account_type, profile_model",
+    [
+        ("landlord", LandlordProfile),
+        ("tenant", TenantProfile),
+        ("property_manager", PropertyManagerProfile),
+    ],
+)
+def test_create_user_creates_profile(
+    account_type: str, profile_model, django_assert_num_queries
+):
+    # INSERT user, INSERT profile
+    with django_assert_num_queries(2):
+        user = User.objects.create(username="new", account_type=account_type)
+
+    assert profile_model.objects.filter(user=user).exists()
+
+
+def test_create_staff_has_no_profile(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        User.objects.create(username="staff", account_type="staff")
+
+
+def test_login_is_a_single_update(user: User, django_assert_num_queries):
+    user = User.objects.get(pk=user.pk)
+
+    with django_assert_num_queries(1):
+        update_last_login(None, user)
+
+
+@pytest.mark.parametrize("reload", [True, False])
+def test_save_without_account_type_change(
+    user: User, reload: bool, django_assert_num_queries
+):
+    if reload:
+        user = User.objects.get(pk=user.pk)
+    user.name = "Renamed"
+
+    with django_assert_num_queries(1):
+        user.save()
+
+
+def test_account_type_change_creates_profile(user: User):
+    user = User.objects.get(pk=user.pk)
+    user.account_type = "landlord"
+    user.save()
+
+    assert LandlordProfile.objects.filter(user=user).exists()
+    # the tenant profile and its data are kept
+    assert TenantProfile.objects.filter(user=user).exists()
+    assert not user.account_type_changed
+
+
+def test_account_type_change_back_reuses_profile(user: User, django_assert_num_queries):
+    user.account_type = "landlord"
+    user.save()
+    user.account_type = "tenant"
+
+    # UPDATE user, SELECT existing tenant profile
+    with django_assert_num_queries(2):
+        user.save()
+
+    assert TenantProfile.objects.filter(user=user).count() == 1
+
+
+def test_update_fields_without_account_type_is_free(
+    user: User, django_assert_num_queries
+):
+    user.account_type = "landlord"
+
+    with django_assert_num_queries(1):
+        user.save(update_fields=["name"])
+
+    assert not LandlordProfile.objects.filter(user=user).exists()
+
+
+def test_factory_user_has_one_profile():
+    user = UserFactory()
+
+    assert TenantProfile.objects.filter(user=user).count() == 1
@@ -1,6 +1,9 @@
+import time
+
 import pytest
 from celery.result import EagerResult
 
+from config.celery_app import batched_task, flush_batches
 from udrems.users.tasks import get_users_count
 from udrems.users.tests.factories import UserFactory
 
@@ -14,3 +17,44 @@ def test_user_count(settings):
     task_result = get_users_count.delay()
     assert isinstance(task_result, EagerResult)
     assert task_result.result == 3
+
+
+def test_user_count_ignores_result():
+    assert get_users_count.ignore_result is True
+
+
+@batched_task(batch_size=3, batch_interval=0.05)
+def collect(items):
+    return items
+
+
+class TestBatchedTask:
+    @pytest.fixture
+    def sent(self, monkeypatch):
+        sent = []
+        monkeypatch.setattr(collect, "delay", sent.append)
+        yield sent
+        collect.batcher.flush()
+
+    def test_sends_full_batches(self, sent):
+        for item in range(7):
+            collect.enqueue(item)
+
+        assert sent == [[0, 1, 2], [3, 4, 5]]
+
+    def test_sends_partial_batch_after_interval(self, sent):
+        collect.enqueue("a")
+        collect.enqueue("b")
+
+        deadline = time.monotonic() + 2
+        while not sent and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert sent == [["a", "b"]]
+
+    def test_flush(self, sent):
+        collect.enqueue(1)
+        flush_batches()
+
+        assert sent == [[1]]
+        assert collect.ignore_result is True
@@ -1,10 +1,22 @@
+from django.conf import settings
 from django.urls import path
 
-from udrems.users.views import user_detail_view, user_redirect_view, user_update_view
+from udrems.users.views import (
+    async_user_detail_view,
+    user_detail_view,
+    user_redirect_view,
+    user_update_view,
+)
 
 app_name = "users"
 urlpatterns = [
     path("~redirect/", view=user_redirect_view, name="redirect"),
     path("~update/", view=user_update_view, name="update"),
-    path("<str:username>/", view=user_detail_view, name="detail"),
+    path(
+        "<str:username>/",
+        view=async_user_detail_view
+        if settings.USE_ASYNC_USER_VIEWS
+        else user_detail_view,
+        name="detail",
+    ),
 ]
@@ -1,3 +1,4 @@
+from allauth.account.views import login
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
@@ -5,6 +6,9 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import DetailView, RedirectView, UpdateView
 
+from udrems.utils.threadpool import pooled_view
+from udrems.utils.transactions import read_only
+
 User = get_user_model()
 
 
@@ -15,7 +19,8 @@ class UserDetailView(LoginRequiredMixin, DetailView):
     slug_url_kwarg = "username"
 
 
-user_detail_view = UserDetailView.as_view()
+user_detail_view = read_only(UserDetailView.as_view())
+async_user_detail_view = pooled_view(user_detail_view)
 
 
 class UserUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
@@ -45,4 +50,8 @@ class UserRedirectView(LoginRequiredMixin, RedirectView):
         return reverse("users:detail", kwargs={"username": self.request.user.username})
 
 
-user_redirect_view = UserRedirectView.as_view()
+user_redirect_view = read_only(UserRedirectView.as_view())
+
+# allauth's login page, served instead of it when ``USE_ASYNC_USER_VIEWS`` is
+# set so password hashes do not block the shared sync thread
+async_login_view = pooled_view(login)
@@ -0,0 +1,43 @@
+"""
+Helpers for answering conditional GETs from DRF views.
+
+Views work out an ETag and a last-modified time from cheap sources (an
+``updated`` column, an aggregate, a cached counter) and check them *before*
+serializing, so a client holding a fresh copy gets an empty 304.
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts: Any) -> str:
+    """A quoted strong ETag over ``parts``."""
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(
+    request, etag: Optional[str] = None, last_modified: Optional[datetime] = None
+):
+    """
+    The 304 (or 412) response ``request``'s preconditions call for, else ``None``.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(
+        request, etag=etag, last_modified=timestamp, response=None
+    )
+
+
+def set_validators(
+    response, etag: Optional[str] = None, last_modified: Optional[datetime] = None
+):
+    if etag and not response.has_header("ETag"):
+        response["ETag"] = etag
+    if last_modified and not response.has_header("Last-Modified"):
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,347 @@
+"""
+Process-wide database connection pools.
+
+With ``CONN_MAX_AGE`` every thread keeps a connection of its own. Under the
+async workers many threads run views: the ``sync_to_async`` executor and
+``udrems.utils.threadpool``. Connections then grow with the number of
+threads, not with the work. The pooled engines
+
+* ``udrems.utils.db_pool.postgresql``
+* ``udrems.utils.db_pool.sqlite3``
+
+share one ``ConnectionPool`` per database alias and process instead. Django
+opens a connection by borrowing one from the pool. It closes one at the end
+of every request (with ``CONN_MAX_AGE = 0``) by handing it back. The number
+of open connections never exceeds ``MAX_SIZE``. When all of them are busy a
+thread waits up to ``TIMEOUT`` seconds and then gets ``PoolTimeout``.
+
+Options are read from the database's ``POOL`` dict:
+
+``MIN_SIZE``
+    connections opened when the pool is first used
+``MAX_SIZE``
+    open connections, borrowed or idle, at most
+``TIMEOUT``
+    seconds to wait for a connection
+``MAX_LIFETIME``
+    seconds after which a connection is closed instead of reused
+``CHECK_AFTER``
+    a connection idle for this many seconds is checked with a ``SELECT 1``
+    before it is handed out; ``0`` checks on every borrow
+
+A connection comes back rolled back to a clean transaction state, but keeps
+any session state: ``SET`` parameters, temporary tables and advisory locks
+survive into the next borrower.
+
+Pool state is published to ``udrems.perf.metrics``: connections in use and
+idle, threads waiting, wait times, timeouts and discarded connections.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+from django.db.utils import OperationalError
+
+from udrems.perf.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MIN_SIZE": 0,
+    "MAX_SIZE": 10,
+    "TIMEOUT": 10.0,
+    "MAX_LIFETIME": 1800.0,
+    "CHECK_AFTER": 30.0,
+}
+
+connections_gauge = registry.gauge(
+    "udrems_db_pool_connections",
+    "Open pooled database connections by state.",
+    ("alias", "state"),
+)
+waiting_gauge = registry.gauge(
+    "udrems_db_pool_waiting", "Threads waiting for a connection.", ("alias",)
+)
+wait_seconds = registry.histogram(
+    "udrems_db_pool_wait_seconds",
+    "Time spent waiting to borrow a connection.",
+    ("alias",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+timeouts = registry.counter(
+    "udrems_db_pool_timeouts",
+    "Borrows that gave up after the pool timeout.",
+    ("alias",),
+)
+discarded = registry.counter(
+    "udrems_db_pool_discarded",
+    "Connections closed instead of reused, by reason.",
+    ("alias", "reason"),
+)
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+@dataclass
+class Entry:
+    connection: object
+    created: float
+    last_used: float
+
+
+class ConnectionPool:
+    """
+    A bounded set of DB-API connections shared by the threads of a process.
+
+    ``connect()`` opens a new connection, ``check(connection)`` raises if it
+    is broken and ``reset(connection)`` returns whether it can be reused.
+    """
+
+    def __init__(
+        self,
+        alias: str,
+        connect: Callable[[], object],
+        check: Callable[[object], None],
+        reset: Callable[[object], bool],
+        options: Dict = None,
+    ):
+        options = {**DEFAULTS, **(options or {})}
+        self.alias = alias
+        self.connect = connect
+        self.check = check
+        self.reset = reset
+        self.min_size = options["MIN_SIZE"]
+        self.max_size = options["MAX_SIZE"]
+        self.timeout = options["TIMEOUT"]
+        self.max_lifetime = options["MAX_LIFETIME"]
+        self.check_after = options["CHECK_AFTER"]
+        if not 0 <= self.min_size <= self.max_size or self.max_size < 1:
+            raise ValueError(f"Bad pool sizes for {alias!r}: {options}")
+
+        # most recently returned last, handed out first while still warm
+        self._idle: Deque[Entry] = deque()
+        self._in_use: Dict[int, Entry] = {}
+        self._opening = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+        self.pid = os.getpid()
+        self.closed = False
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    @property
+    def in_use(self) -> int:
+        return len(self._in_use)
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def _publish(self) -> None:
+        connections_gauge.set(len(self._in_use), alias=self.alias, state="in_use")
+        connections_gauge.set(len(self._idle), alias=self.alias, state="idle")
+        waiting_gauge.set(self.waiting, alias=self.alias)
+
+    def fill(self) -> None:
+        """Open connections until ``MIN_SIZE`` are idle or in use."""
+        while True:
+            with self._condition:
+                if self.size >= self.min_size:
+                    return
+                self._opening += 1
+            entry = self._open()
+            with self._condition:
+                self._opening -= 1
+                self._idle.append(entry)
+                self._publish()
+                self._condition.notify()
+
+    def _open(self) -> Entry:
+        """Open a connection in a slot reserved through ``_opening``."""
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        now = time.monotonic()
+        return Entry(connection, created=now, last_used=now)
+
+    def _take(self, deadline: float) -> Optional[Entry]:
+        """An idle entry, or ``None`` and a slot reserved to open one in."""
+        with self._condition:
+            waited = False
+            try:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        self._in_use[id(entry.connection)] = entry
+                        self._publish()
+                        return entry
+                    if self.size < self.max_size:
+                        self._opening += 1
+                        return None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        timeouts.inc(alias=self.alias)
+                        raise PoolTimeout(
+                            f"No connection to {self.alias!r} available within "
+                            f"{self.timeout}s ({self.max_size} in use)"
+                        )
+                    if not waited:
+                        waited = True
+                        self.waiting += 1
+                        self._publish()
+                    self._condition.wait(remaining)
+            finally:
+                if waited:
+                    self.waiting -= 1
+                    self._publish()
+
+    def _usable(self, entry: Entry) -> bool:
+        now = time.monotonic()
+        if now - entry.created >= self.max_lifetime:
+            discarded.inc(alias=self.alias, reason="lifetime")
+            return False
+        if now - entry.last_used >= self.check_after:
+            try:
+                self.check(entry.connection)
+            except Exception:
+                logger.warning("Dropping a broken %s connection", self.alias)
+                discarded.inc(alias=self.alias, reason="check")
+                return False
+        return True
+
+    def borrow(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            entry = self._take(deadline)
+            if entry is None:
+                entry = self._open()
+                with self._condition:
+                    self._opening -= 1
+                    self._in_use[id(entry.connection)] = entry
+                    self._publish()
+            elif not self._usable(entry):
+                self._discard(entry)
+                continue
+            wait_seconds.observe(time.monotonic() - started, alias=self.alias)
+            return entry.connection
+
+    def release(self, connection, reusable: bool = True) -> None:
+        entry = self._in_use.get(id(connection))
+        if entry is None:
+            # borrowed before a fork: closing it would also close the
+            # parent's session on the shared socket
+            return
+        if self.closed:
+            reusable = False
+        elif not reusable:
+            discarded.inc(alias=self.alias, reason="unusable")
+        elif not self._reset(connection):
+            discarded.inc(alias=self.alias, reason="reset")
+            reusable = False
+        if not reusable:
+            self._discard(entry)
+            return
+        entry.last_used = time.monotonic()
+        with self._condition:
+            del self._in_use[id(connection)]
+            self._idle.append(entry)
+            self._publish()
+            self._condition.notify()
+
+    def _discard(self, entry: Entry) -> None:
+        self._close(entry.connection)
+        with self._condition:
+            del self._in_use[id(entry.connection)]
+            self._publish()
+            self._condition.notify()
+
+    def _reset(self, connection) -> bool:
+        try:
+            return self.reset(connection)
+        except Exception:
+            return False
+
+    def _close(self, connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Close the idle connections, borrowed ones close on release."""
+        with self._condition:
+            self.closed = True
+            idle, self._idle = self._idle, deque()
+            self._publish()
+        for entry in idle:
+            self._close(entry.connection)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(wrapper) -> ConnectionPool:
+    """The pool of ``wrapper``'s alias in this process, created on first use."""
+    pool = _pools.get(wrapper.alias)
+    if pool is None or pool.pid != os.getpid():
+        with _pools_lock:
+            pool = _pools.get(wrapper.alias)
+            # connections inherited through a fork belong to the parent
+            if pool is None or pool.pid != os.getpid():
+                pool = ConnectionPool(
+                    wrapper.alias,
+                    connect=wrapper.pool_connect,
+                    check=wrapper.pool_check,
+                    reset=wrapper.pool_reset,
+                    options=wrapper.settings_dict.get("POOL"),
+                )
+                _pools[wrapper.alias] = pool
+        pool.fill()
+    return pool
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class PooledDatabaseWrapperMixin:
+    """Borrows connections from the alias's pool instead of opening them."""
+
+    def get_new_connection(self, conn_params):
+        return get_pool(self).borrow()
+
+    def pool_connect(self):
+        return super().get_new_connection(self.get_connection_params())
+
+    def pool_check(self, connection) -> None:
+        raise NotImplementedError
+
+    def pool_reset(self, connection) -> bool:
+        raise NotImplementedError
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Django keeps a connection closed inside a transaction around until
+        # the block exits, so it cannot go back to the pool
+        reusable = not self.in_atomic_block and not self.errors_occurred
+        with self.wrap_database_errors:
+            get_pool(self).release(self.connection, reusable=reusable)
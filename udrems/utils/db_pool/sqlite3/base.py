@@ -0,0 +1,14 @@
+"""``django.db.backends.sqlite3`` with pooled connections, for local use and tests."""
+from django.db.backends.sqlite3 import base
+
+from udrems.utils.db_pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def pool_check(self, connection) -> None:
+        connection.execute("SELECT 1")
+
+    def pool_reset(self, connection) -> bool:
+        if connection.in_transaction:
+            connection.rollback()
+        return True
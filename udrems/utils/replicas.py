@@ -0,0 +1,269 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+``ReplicaRouter`` sends reads of the apps in ``DATABASE_REPLICA_APPS``
+(content listings and user lookups) to a healthy alias of
+``DATABASE_REPLICAS``, and everything else to ``default``. Reads stay on
+``default`` while:
+
+* a transaction is open on ``default``, so a transaction never mixes views
+  of the data (with ``ATOMIC_REQUESTS`` that is every view)
+* the current request or task has written anything
+* the client wrote less than ``REPLICA_STICKY_SECONDS`` ago:
+  ``ReplicaPinningMiddleware`` remembers writes in a signed cookie, and for
+  authenticated users in the cache, so token clients without cookies stick too
+* no replica is healthy
+
+Every ``REPLICA_CHECK_INTERVAL`` seconds each process asks every replica for
+its replication lag. Replicas that do not answer, or lag more than
+``REPLICA_MAX_LAG_SECONDS``, leave the rotation until a later check passes.
+
+Outside requests only the first two rules apply. Tasks that read their own
+writes outside a transaction should wrap the work in ``primary()``.
+
+Locally, a copy of the SQLite database listed in ``DATABASE_REPLICA_URLS``
+makes a replica that never catches up, which shows the stickiness nicely.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+COOKIE_NAME = "primary_until"
+COOKIE_SALT = "udrems.utils.replicas"
+
+# seconds of replay lag, 0 when caught up, NULL on a primary
+POSTGRESQL_LAG = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+@dataclass
+class Pinning:
+    """Whether reads of the current request or task must use ``default``."""
+
+    pinned: bool = False
+    wrote: bool = False
+    request: Optional[object] = None
+    checked_user: Optional[int] = None
+
+
+state: ContextVar[Optional[Pinning]] = ContextVar("replica_pinning", default=None)
+
+
+@contextmanager
+def primary():
+    """Read everything from ``default`` inside the block."""
+    token = state.set(Pinning(pinned=True))
+    try:
+        yield
+    finally:
+        state.reset(token)
+
+
+def user_key(user_id) -> str:
+    return f"replicas:pinned:user:{user_id}"
+
+
+def resolved_user(request):
+    """``request.user`` if authentication already ran, without running it."""
+    user = request.__dict__.get("user")
+    if isinstance(user, SimpleLazyObject):
+        user = None if user._wrapped is empty else user._wrapped
+    return user
+
+
+# health
+# ------------------------------------------------------------------------------
+@dataclass
+class ReplicaStatus:
+    healthy: bool = True
+    lag: Optional[float] = None
+    checked: float = field(default=-float("inf"))
+
+
+class ReplicaMonitor:
+    """Per-process view of replica health, refreshed at most every interval."""
+
+    def __init__(self):
+        self.statuses: Dict[str, ReplicaStatus] = {}
+        self._lock = threading.Lock()
+
+    def measure_lag(self, alias: str) -> float:
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(POSTGRESQL_LAG)
+            else:
+                # nothing to ask, reachable is all we can tell
+                cursor.execute("SELECT 0")
+            lag = cursor.fetchone()[0]
+        return float(lag or 0)
+
+    def check(self, alias: str) -> ReplicaStatus:
+        status = ReplicaStatus(checked=time.monotonic())
+        try:
+            status.lag = self.measure_lag(alias)
+        except DatabaseError:
+            logger.warning("Replica %s is unreachable", alias, exc_info=True)
+            status.healthy = False
+        else:
+            status.healthy = status.lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not status.healthy:
+                logger.warning("Replica %s lags %.1fs behind", alias, status.lag)
+        self.statuses[alias] = status
+        return status
+
+    def healthy(self, aliases: List[str]) -> List[str]:
+        now = time.monotonic()
+        stale = [
+            alias
+            for alias in aliases
+            if now - self.statuses.get(alias, ReplicaStatus()).checked
+            >= settings.REPLICA_CHECK_INTERVAL
+        ]
+        # one thread checks, the others route on the previous results
+        if stale and self._lock.acquire(blocking=False):
+            try:
+                for alias in stale:
+                    self.check(alias)
+            finally:
+                self._lock.release()
+        return [
+            alias
+            for alias in aliases
+            if self.statuses.get(alias, ReplicaStatus()).healthy
+        ]
+
+    def reset(self) -> None:
+        self.statuses.clear()
+
+
+monitor = ReplicaMonitor()
+
+
+# routing
+# ------------------------------------------------------------------------------
+class ReplicaRouter:
+    def is_pinned(self) -> bool:
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return True
+        pinning = state.get()
+        if pinning is None:
+            return False
+        if pinning.pinned or pinning.wrote:
+            return True
+        if pinning.request is not None:
+            user = resolved_user(pinning.request)
+            if user is not None and user.pk and user.pk != pinning.checked_user:
+                pinning.checked_user = user.pk
+                pinning.pinned = cache.get(user_key(user.pk)) is not None
+        return pinning.pinned
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.app_label not in settings.DATABASE_REPLICA_APPS:
+            return None
+        if self.is_pinned():
+            return DEFAULT_DB_ALIAS
+        healthy = monitor.healthy(replicas)
+        if not healthy:
+            return DEFAULT_DB_ALIAS
+        return random.choice(healthy)
+
+    def db_for_write(self, model, **hints):
+        pinning = state.get()
+        if pinning is not None:
+            pinning.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema from the primary
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Keeps a client's reads on ``default`` for a while after it wrote."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        pinning = Pinning(request=request, pinned=self.has_cookie(request))
+        token = state.set(pinning)
+        try:
+            response = self.get_response(request)
+        finally:
+            state.reset(token)
+        if pinning.wrote and settings.DATABASE_REPLICAS:
+            self.stick(request, response)
+        return response
+
+    async def __acall__(self, request):
+        # views run on threads with a copy of this context, which shares the
+        # Pinning object, so their writes show up here
+        pinning = Pinning(request=request, pinned=self.has_cookie(request))
+        token = state.set(pinning)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state.reset(token)
+        if pinning.wrote and settings.DATABASE_REPLICAS:
+            self.stick(request, response)
+        return response
+
+    def has_cookie(self, request) -> bool:
+        value = request.COOKIES.get(COOKIE_NAME)
+        if not value:
+            return False
+        try:
+            until = signing.get_cookie_signer(salt=COOKIE_SALT).unsign(value)
+            return float(until) > time.time()
+        except (signing.BadSignature, ValueError):
+            return False
+
+    def stick(self, request, response) -> None:
+        seconds = settings.REPLICA_STICKY_SECONDS
+        until = str(time.time() + seconds)
+        response.set_cookie(
+            COOKIE_NAME,
+            signing.get_cookie_signer(salt=COOKIE_SALT).sign(until),
+            max_age=seconds,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+        user = resolved_user(request)
+        if user is not None and user.pk:
+            cache.set(user_key(user.pk), until, seconds)
@@ -0,0 +1,91 @@
+"""
+Static files: built ahead of time, served precompressed and cached forever.
+
+``manage.py build_static`` collects the static files and renders the
+``{% compress %}`` blocks of ``udrems/templates`` offline. After that a
+request looks files up in manifests and never hashes or compresses them:
+
+* ``CompressedManifestStaticFilesStorage`` names every collected file after
+  its content and writes ``staticfiles.json``
+* django-compressor minifies each block into ``CACHE/css|js/output.<hash>``
+  and lists it in ``CACHE/manifest.json``
+* both write ``.gz`` variants, and ``.br`` ones with ``Brotli`` installed,
+  next to the files
+
+``WhiteNoiseMiddleware`` serves the variant a client accepts. Names with a
+content hash, collected files and compressor bundles alike, go out with
+``Cache-Control: max-age=315360000, public, immutable``.
+
+WhiteNoise 5's own middleware only runs synchronously. Under ASGI, Django
+3.2 then runs the whole rest of the request, views included, on the one
+thread it keeps for sync code, so async views (``udrems.utils.threadpool``)
+block each other anyway. The middleware here awaits the rest of the request
+when it is async.
+"""
+import asyncio
+import re
+
+from compressor.conf import settings as compressor_settings
+from compressor.storage import CompressorFileStorage
+from whitenoise.compress import Compressor
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+# django-compressor's output names, e.g. CACHE/css/output.1a2b3c4d5e6f.css
+BUNDLE_NAME = re.compile(r"^(?:css|js)/[^/]+\.[0-9a-f]{12}\.(?:css|js)$")
+
+
+def is_bundle(name: str) -> bool:
+    """Whether ``name``, relative to ``STATIC_ROOT``, is a compressor bundle."""
+    directory, _, rest = name.partition("/")
+    return directory == compressor_settings.COMPRESS_OUTPUT_DIR.strip("/") and bool(
+        BUNDLE_NAME.match(rest)
+    )
+
+
+class PrecompressedCompressorFileStorage(CompressorFileStorage):
+    """Writes ``.br`` and ``.gz`` variants of every file compressor saves."""
+
+    def save(self, name, content, max_length=None):
+        name = super().save(name, content, max_length)
+        # the same rules as collectstatic: skip images and archives, and
+        # variants that would not be smaller
+        list(Compressor(quiet=True).compress(self.path(name)))
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        for suffix in (".br", ".gz"):
+            if self.exists(name + suffix):
+                super().delete(name + suffix)
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if asyncio.iscoroutinefunction(get_response):
+            # what MiddlewareMixin does to be awaited by the handler
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # a dict lookup, and a file response for static paths only
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
+    def immutable_file_test(self, path, url):
+        # bundles are named after their content but missing from the
+        # staticfiles manifest the default test checks against
+        if url.startswith(self.static_prefix) and is_bundle(
+            url.replace(self.static_prefix, "", 1)
+        ):
+            return True
+        return super().immutable_file_test(path, url)
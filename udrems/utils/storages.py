@@ -1,4 +1,6 @@
+from botocore.exceptions import ClientError
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
 
 
 class StaticRootS3Boto3Storage(S3Boto3Storage):
@@ -7,5 +9,63 @@ class StaticRootS3Boto3Storage(S3Boto3Storage):
 
 
 class MediaRootS3Boto3Storage(S3Boto3Storage):
+    """Media files, which clients may upload directly, see ``udrems.utils.uploads``."""
+
     location = "media"
     file_overwrite = False
+
+    def _key(self, name: str) -> str:
+        return self._normalize_name(clean_name(name))
+
+    def presigned_upload(
+        self, name: str, content_type: str, max_size: int, expires: int, method: str
+    ) -> dict:
+        """
+        A presigned ``POST`` or ``PUT`` storing ``content_type`` at ``name``.
+
+        S3 enforces ``max_size`` on ``POST`` only, completing the upload
+        checks the size either way.
+        """
+        client = self.bucket.meta.client
+        headers = {"Content-Type": content_type}
+        # the cache headers of files saved through the storage
+        cache_control = self.get_object_parameters(name).get("CacheControl")
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        if method == "PUT":
+            params = {"Bucket": self.bucket_name, "Key": self._key(name)}
+            params["ContentType"] = content_type
+            if cache_control:
+                params["CacheControl"] = cache_control
+            url = client.generate_presigned_url(
+                "put_object", Params=params, ExpiresIn=expires, HttpMethod="PUT"
+            )
+            return {"method": "PUT", "url": url, "headers": headers}
+        post = client.generate_presigned_post(
+            self.bucket_name,
+            self._key(name),
+            Fields=dict(headers),
+            Conditions=[
+                *({field: value} for field, value in headers.items()),
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires,
+        )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"]}
+
+    def uploaded(self, name: str):
+        """``(size, content_type)`` of the object at ``name``, ``None`` if missing."""
+        try:
+            head = self.bucket.meta.client.head_object(
+                Bucket=self.bucket_name, Key=self._key(name)
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise
+        return head["ContentLength"], head.get("ContentType", "")
+
+    def read_header(self, name: str, length: int) -> bytes:
+        """The first ``length`` bytes of the object at ``name``."""
+        body = self.bucket.Object(self._key(name)).get(Range=f"bytes=0-{length - 1}")
+        return body["Body"].read()
@@ -0,0 +1,88 @@
+"""
+Bounded thread pool for blocking Django code called from async views.
+
+Under ASGI, Django 3.2 runs every synchronous view through
+``sync_to_async(thread_sensitive=True)``, i.e. on one shared thread per
+process, so concurrent requests queue behind each other. There is no async
+ORM yet either, so async views hand their blocking work to this pool instead:
+up to ``ASYNC_VIEW_THREADS`` run at once, which also bounds the number of
+database connections a worker holds.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ASYNC_VIEW_THREADS,
+                    thread_name_prefix="async-view",
+                )
+    return _executor
+
+
+def _call(func, args, kwargs):
+    # Pool threads never see request_started/request_finished, so expire
+    # connections here the way those signals would (honours CONN_MAX_AGE).
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """Run ``func`` on the pool, keeping the caller's context variables."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(context.run, _call, func, args, kwargs)
+    )
+
+
+def _atomic_aliases(view):
+    non_atomic = getattr(view, "_non_atomic_requests", set())
+    return [
+        alias
+        for alias in connections
+        if connections.settings[alias].get("ATOMIC_REQUESTS")
+        and alias not in non_atomic
+    ]
+
+
+def _call_view(view, request, args, kwargs):
+    for alias in _atomic_aliases(view):
+        view = transaction.atomic(using=alias)(view)
+    response = view(request, *args, **kwargs)
+    if hasattr(response, "render") and callable(response.render):
+        # render here rather than on the handler's shared thread
+        response.render()
+    return response
+
+
+def pooled_view(view):
+    """
+    Turn a synchronous view into an async one that runs on the pool.
+
+    ``ATOMIC_REQUESTS`` is honoured inside the pool thread, as Django refuses
+    to apply it to async views itself.
+    """
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await run_in_pool(_call_view, view, request, args, kwargs)
+
+    async_view._non_atomic_requests = set(connections)
+    return async_view
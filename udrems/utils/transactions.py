@@ -0,0 +1,59 @@
+"""
+Per-view transactions on top of ``ATOMIC_REQUESTS``.
+
+``ATOMIC_REQUESTS`` stays on as the default, so a view that says nothing
+still runs in one transaction. Views that only read can say so and skip it.
+They then run in autocommit, without BEGIN and COMMIT on PostgreSQL, and
+without the SAVEPOINT and RELEASE the test suite wraps around them. That also
+lets ``udrems.utils.replicas`` send their reads to a replica.
+
+* ``read_only(view)`` takes a view function, e.g. ``TemplateView.as_view()``
+* ``transactional(view)`` runs a view function in a transaction whatever
+  ``ATOMIC_REQUESTS`` says
+* ``AtomicWritesMixin`` is for DRF views and viewsets. Safe methods run in
+  autocommit and the others in a transaction, so a viewset with both reads
+  and writes only pays for the writes. Error responses roll it back.
+
+A read-only view that turns out to write still works. Each statement then
+commits on its own.
+"""
+import functools
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.permissions import SAFE_METHODS
+
+
+def read_only(view):
+    """Keep ``view`` out of ``ATOMIC_REQUESTS`` on every database."""
+    view._non_atomic_requests = set(settings.DATABASES)
+    return view
+
+
+def transactional(view):
+    """Run ``view`` in a transaction on ``default``."""
+
+    @functools.wraps(view)
+    def atomic_view(request, *args, **kwargs):
+        with transaction.atomic():
+            return view(request, *args, **kwargs)
+
+    return read_only(atomic_view)
+
+
+class AtomicWritesMixin:
+    """Reads in autocommit, writes in one transaction on ``default``."""
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        return read_only(super().as_view(*args, **kwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super().dispatch(request, *args, **kwargs)
+            if getattr(response, "exception", False):
+                # handled by DRF, which only rolls back under ATOMIC_REQUESTS
+                transaction.set_rollback(True)
+        return response
@@ -0,0 +1,211 @@
+"""
+Direct uploads: clients send files to the media bucket, not through Django.
+
+Saving an upload through ``MediaRootS3Boto3Storage`` keeps a web worker busy
+for as long as the client takes to send the file, and again while the worker
+pushes it on to S3. Instead:
+
+1. the client posts the file's ``filename``, ``content_type`` and ``size`` to
+   an upload endpoint, e.g. ``api:image-upload``, and gets a presigned
+   ``POST`` (``url`` and form ``fields``, the file goes last as ``file``) or,
+   with ``"method": "PUT"``, a presigned ``PUT`` (``url`` and ``headers``),
+   plus a signed ``upload`` ticket
+2. it sends the file straight to the bucket
+3. it posts the ``upload`` ticket to the matching ``complete`` endpoint. That
+   checks the object, its size, content type and that Pillow reads it as an
+   image of that type, and only then saves the model row pointing at it.
+   Objects failing the checks are deleted.
+
+Tickets name a fresh key under the field's ``upload_to``, belong to the user
+who asked for them and expire an hour after the upload URL does.
+
+The storage presigns, see ``MediaRootS3Boto3Storage``. With any other
+``DEFAULT_FILE_STORAGE``, ``FileSystemStorage`` in development, the upload
+endpoints answer ``400`` and files go through forms as before. Set
+``DJANGO_AWS_S3_ENDPOINT_URL`` to use MinIO or another S3 stand-in; browsers
+also need a CORS rule on the bucket allowing ``POST`` and ``PUT``.
+"""
+import posixpath
+from io import BytesIO
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import FileField
+from django.utils.text import get_valid_filename
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from udrems.utils.transactions import read_only
+
+SALT = "udrems.utils.uploads"
+METHODS = ("POST", "PUT")
+# an upload started just before its URL expired may still be running
+COMPLETE_WITHIN_SECONDS = 60 * 60
+# enough for Pillow to find the size of a JPEG behind large EXIF blocks
+HEADER_BYTES = 256 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+def supports_direct_uploads(storage) -> bool:
+    return hasattr(storage, "presigned_upload")
+
+
+def upload_name(field: FileField, filename: str) -> str:
+    """A name no other upload to ``field`` has, ending in ``filename``."""
+    try:
+        filename = get_valid_filename(posixpath.basename(filename.replace("\\", "/")))
+    except SuspiciousFileOperation:
+        raise UploadError(f"Could not derive a file name from {filename!r}.")
+    name = field.generate_filename(None, posixpath.join(uuid4().hex, filename))
+    directory, filename = posixpath.split(name)
+    stem, extension = posixpath.splitext(filename)
+    # what is left of the column for the stem
+    room = max(field.max_length - len(directory) - len(extension) - 1, 1)
+    return posixpath.join(directory, stem[:room] + extension)
+
+
+def start_upload(
+    field: FileField,
+    user,
+    filename: str,
+    content_type: str,
+    size: int,
+    method: str = "POST",
+) -> dict:
+    """A presigned upload of one file into ``field`` for ``user``."""
+    if content_type not in settings.UPLOAD_CONTENT_TYPES:
+        raise UploadError(f"Content type {content_type} is not allowed.")
+    if not 0 < size <= settings.UPLOAD_MAX_SIZE:
+        raise UploadError(f"Files may have up to {settings.UPLOAD_MAX_SIZE} bytes.")
+    if method not in METHODS:
+        raise UploadError(f"Method must be one of {', '.join(METHODS)}.")
+    if not supports_direct_uploads(field.storage):
+        raise UploadError("Direct uploads need the S3 media storage.")
+
+    name = upload_name(field, filename)
+    expires = settings.UPLOAD_URL_EXPIRY
+    upload = field.storage.presigned_upload(name, content_type, size, expires, method)
+    upload["upload"] = signing.dumps(
+        {
+            "field": str(field),
+            "name": name,
+            "content_type": content_type,
+            "size": size,
+            "user": user.pk,
+        },
+        salt=SALT,
+    )
+    upload["expires_in"] = expires
+    return upload
+
+
+def finish_upload(field: FileField, user, ticket: str) -> str:
+    """
+    The name of the object uploaded with ``ticket``, once it passed the
+    checks, for ``user`` to save in ``field``.
+    """
+    try:
+        upload = signing.loads(
+            ticket,
+            salt=SALT,
+            max_age=settings.UPLOAD_URL_EXPIRY + COMPLETE_WITHIN_SECONDS,
+        )
+    except signing.BadSignature:
+        raise UploadError("The upload ticket is invalid or expired.")
+    if upload["field"] != str(field) or upload["user"] != user.pk:
+        raise UploadError("The upload ticket is not for this upload.")
+    if not supports_direct_uploads(field.storage):
+        raise UploadError("Direct uploads need the S3 media storage.")
+
+    name = upload["name"]
+    stored = field.storage.uploaded(name)
+    if stored is None:
+        raise UploadError("The file has not been uploaded.")
+    try:
+        check_upload(field.storage, name, stored, upload)
+    except UploadError:
+        field.storage.delete(name)
+        raise
+    return name
+
+
+def check_upload(storage, name: str, stored, upload: dict) -> None:
+    size, content_type = stored
+    if not 0 < size <= upload["size"]:
+        raise UploadError(f"The file has {size} bytes, not {upload['size']}.")
+    if content_type != upload["content_type"]:
+        raise UploadError(f"The file was stored as {content_type}.")
+    try:
+        # parses the header only, the pixels stay in the bucket
+        image = Image.open(BytesIO(storage.read_header(name, HEADER_BYTES)))
+    except (Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        raise UploadError("The file is not an image.")
+    if image.get_format_mimetype() != content_type:
+        raise UploadError(f"The file is not of type {content_type}.")
+
+
+class UploadRequestSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
+    method = serializers.ChoiceField(METHODS, default="POST")
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    upload = serializers.CharField()
+
+
+class UploadView(APIView):
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # out of ATOMIC_REQUESTS: no transaction stays open while the bucket
+        # answers, the one row written commits on its own
+        return read_only(super().as_view(**initkwargs))
+
+    def get_field(self) -> FileField:
+        raise NotImplementedError
+
+
+class StartUploadView(UploadView):
+    """``POST``: a presigned upload into ``get_field()``."""
+
+    def post(self, request):
+        field = self.get_field()
+        serializer = UploadRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = start_upload(field, request.user, **serializer.validated_data)
+        except UploadError as error:
+            raise ValidationError({"upload": str(error)})
+        return Response(upload)
+
+
+class CompleteUploadView(UploadView):
+    """
+    ``POST``: checks the file uploaded with the ``upload`` ticket and hands
+    its name, with the other fields of ``serializer_class``, to ``complete``.
+    """
+
+    serializer_class = UploadCompleteSerializer
+
+    def complete(self, request, name: str, data: dict) -> Response:
+        raise NotImplementedError
+
+    def post(self, request):
+        field = self.get_field()
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        try:
+            name = finish_upload(field, request.user, data.pop("upload"))
+        except UploadError as error:
+            raise ValidationError({"upload": str(error)})
+        return self.complete(request, name, data)